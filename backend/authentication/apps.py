@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
 
 
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from .backends import invalidate_cached_user
+        User = get_user_model()
+        post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='invalidate_cached_user_on_save')
+        post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='invalidate_cached_user_on_delete')
@@ -0,0 +1,209 @@
+"""
+JWT authentication without a ``users_user`` lookup on every request.
+
+``CachedJWTAuthentication`` resolves the token's user through a small
+per-process LRU (a few seconds TTL) in front of the shared Django cache, and
+only falls back to the database on a miss. Only the fields authentication and
+permission checks need (``AUTH_FIELDS``) are cached, never the password hash;
+other attributes of a cached user load lazily from the database. Entries are
+dropped whenever a ``User`` is saved or deleted, so deactivations and
+permission changes apply on the next request in this process and within
+``LOCAL_TTL`` everywhere else. Queryset ``update()``/``bulk_update()`` send no
+signals: code that changes users that way must call ``invalidate_cached_users``
+with their ids, or the old values live on for up to ``TIMEOUT``.
+
+With ``JWT_AUTH_CACHE['STATELESS'] = True`` the user is built straight from the
+token claims instead. That object is a read-only stand-in: it works for
+``user=request.user`` filters and ``is_seller`` checks, but must never be saved.
+Tokens carry no personal data, and staff and superuser flags are never taken
+from them, so a stateless user is never staff; admin endpoints need the
+database-backed mode.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+    'LOCAL_TTL': 5,
+    'LOCAL_MAXSIZE': 1024,
+    'STATELESS': False,
+}
+
+# Copied into tokens for stateless mode: nothing personal, nothing that grants
+# privileges if a leaked or stale token is trusted.
+CLAIM_FIELDS = ('is_seller',)
+
+AUTH_FIELDS = ('id', 'is_active', 'is_staff', 'is_superuser', 'is_seller')
+
+
+def auth_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'JWT_AUTH_CACHE', {})}
+
+
+class LocalTTLCache:
+    """Thread-safe LRU whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class UserCache:
+    """
+    ``AUTH_FIELDS`` of users keyed by id, in the local LRU and the shared cache,
+    plus a digest of the password hash for ``CHECK_REVOKE_TOKEN``.
+    """
+
+    def __init__(self):
+        options = auth_cache_settings()
+        self.timeout = options['TIMEOUT']
+        self.shared = caches[options['CACHE']]
+        self.local = LocalTTLCache(options['LOCAL_MAXSIZE'], options['LOCAL_TTL'])
+
+    @staticmethod
+    def key(user_id):
+        return f'auth:user:{user_id}'
+
+    def get(self, user_id):
+        key = self.key(user_id)
+        data = self.local.get(key)
+        if data is None:
+            data = self.shared.get(key)
+            if data is None:
+                return None
+            self.local.set(key, data)
+        # Every request gets its own instance, so nothing leaks between them;
+        # fields that were not cached are deferred.
+        data = dict(data)
+        password_digest = data.pop('password_digest')
+        User = get_user_model()
+        # from_db() expects the values in model field order.
+        names = [f.attname for f in User._meta.concrete_fields if f.attname in data]
+        user = User.from_db(router.db_for_read(User), names, [data[name] for name in names])
+        user.password_digest = password_digest
+        return user
+
+    def set(self, user):
+        key = self.key(user.pk)
+        data = {field: getattr(user, field) for field in AUTH_FIELDS}
+        data['password_digest'] = get_md5_hash_password(user.password)
+        self.shared.set(key, data, self.timeout)
+        self.local.set(key, data)
+
+    def delete(self, user_id):
+        key = self.key(user_id)
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def delete_many(self, user_ids):
+        keys = [self.key(user_id) for user_id in user_ids]
+        for key in keys:
+            self.local.delete(key)
+        self.shared.delete_many(keys)
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserCache()
+    return _user_cache
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    get_user_cache().delete(instance.pk)
+
+
+def invalidate_cached_users(user_ids):
+    """
+    Drop cached users changed without ``post_save``, e.g. by
+    ``User.objects.filter(...).update(is_active=False)``. Other processes still
+    serve their local copy for up to ``LOCAL_TTL``.
+    """
+    get_user_cache().delete_many(user_ids)
+
+
+def user_from_claims(validated_token):
+    User = get_user_model()
+    user = User(**{
+        User._meta.pk.attname: validated_token[api_settings.USER_ID_CLAIM],
+        'is_active': True,
+        'is_staff': False,
+        'is_superuser': False,
+        **{field: validated_token[field] for field in CLAIM_FIELDS if field in validated_token},
+    })
+    user._state.adding = False
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        if auth_cache_settings()['STATELESS']:
+            return user_from_claims(validated_token)
+
+        user_cache = get_user_cache()
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != user.password_digest:
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
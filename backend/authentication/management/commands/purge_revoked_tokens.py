@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from authentication.revocation import get_revocation_store
+
+class Command(BaseCommand):
+    help = 'Delete revoked-token rows whose tokens have already expired.'
+
+    def handle(self, *args, **kwargs):
+        deleted = get_revocation_store().purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired revoked tokens'))
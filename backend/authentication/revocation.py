@@ -0,0 +1,178 @@
+"""
+Refresh-token revocation backed by the ``RevokedToken`` table.
+
+Every process keeps a Bloom filter of revoked JTIs. A token the filter has
+never seen is definitely not revoked, so the common case costs a few hash
+probes and one cache GET; only filter hits (real revocations plus roughly
+``ERROR_RATE`` false positives) go on to the shared cache and then the
+database. The filter is built from the table when the WSGI/ASGI application
+starts (``warm_up``), or on first use by other entry points, and topped up
+incrementally: every ``revoke`` bumps a generation counter in the shared
+cache, and the other processes pull recent rows when they notice the counter
+has moved.
+
+Ids are allocated before commit, so a row can become visible after rows with
+higher ids have been read. Each incremental sync therefore re-reads the last
+``SYNC_ID_OVERLAP`` ids below the highest one seen; adding a JTI the filter
+already holds changes nothing.
+"""
+import hashlib
+import logging
+import math
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+DEFAULTS = {
+    'CAPACITY': 1_000_000,
+    'ERROR_RATE': 0.001,
+    'CACHE': 'default',
+    'CACHE_TIMEOUT': 300,
+    'SYNC_ID_OVERLAP': 1000,
+}
+
+GENERATION_KEY = 'auth:revoked:generation'
+
+logger = logging.getLogger(__name__)
+
+
+def revocation_settings():
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_REVOCATION', {})}
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    def __init__(self):
+        options = revocation_settings()
+        self.capacity = options['CAPACITY']
+        self.error_rate = options['ERROR_RATE']
+        self.cache = caches[options['CACHE']]
+        self.cache_timeout = options['CACHE_TIMEOUT']
+        self.sync_id_overlap = options['SYNC_ID_OVERLAP']
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._generation = None
+
+    @staticmethod
+    def key(jti):
+        return f'auth:revoked:{jti}'
+
+    def _load(self, since_id):
+        rows = (
+            RevokedToken.objects.filter(id__gt=since_id, expires_at__gt=timezone.now())
+            .order_by('id')
+            .values_list('id', 'jti')
+        )
+        for row_id, jti in rows.iterator(chunk_size=10000):
+            if jti not in self._filter:
+                self._filter.add(jti)
+            self._last_id = max(self._last_id, row_id)
+
+    def rebuild(self):
+        with self._lock:
+            live = RevokedToken.objects.filter(expires_at__gt=timezone.now()).count()
+            self._filter = BloomFilter(max(self.capacity, live * 2), self.error_rate)
+            self._last_id = 0
+            self._generation = self.cache.get(GENERATION_KEY)
+            self._load(0)
+
+    def sync(self):
+        """Pull revocations made by other processes since the last sync."""
+        generation = self.cache.get(GENERATION_KEY)
+        if self._filter is None or self._filter.count >= self._filter.capacity:
+            self.rebuild()
+        elif generation != self._generation:
+            with self._lock:
+                self._generation = generation
+                self._load(max(0, self._last_id - self.sync_id_overlap))
+
+    def is_revoked(self, jti):
+        self.sync()
+        if jti not in self._filter:
+            return False
+        cached = self.cache.get(self.key(jti))
+        if cached is not None:
+            return cached
+        revoked = RevokedToken.objects.filter(jti=jti).exists()
+        self.cache.set(self.key(jti), revoked, self.cache_timeout)
+        return revoked
+
+    def revoke(self, jti, expires_at):
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=jti, expires_at=expires_at)], ignore_conflicts=True
+        )
+        self.cache.set(self.key(jti), True, self.cache_timeout)
+        try:
+            self.cache.incr(GENERATION_KEY)
+        except ValueError:
+            self.cache.set(GENERATION_KEY, 1, None)
+        if self._filter is not None:
+            with self._lock:
+                self._filter.add(jti)
+
+    def purge_expired(self):
+        """Drop rows for tokens that have expired anyway; returns the number deleted."""
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+    def revoke_token(self, token):
+        expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+        self.revoke(token[api_settings.JTI_CLAIM], expires_at)
+
+    def is_token_revoked(self, token):
+        return self.is_revoked(token[api_settings.JTI_CLAIM])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_revocation_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RevocationStore()
+    return _store
+
+
+def warm_up():
+    """Build this process's filter now rather than on its first refresh request."""
+    try:
+        get_revocation_store().rebuild()
+    except DatabaseError:
+        # Not migrated yet, or the database is down: build on first use instead.
+        logger.warning('Could not build the token revocation filter at startup', exc_info=True)
+    finally:
+        # Workers forked after this must not share the connection.
+        connections.close_all()
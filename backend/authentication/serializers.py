@@ -1,6 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .backends import CLAIM_FIELDS
+from .revocation import get_revocation_store
 
 User = get_user_model()
 
@@ -30,6 +35,14 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        # Lets CachedJWTAuthentication build the user from the token in stateless mode
+        for claim in CLAIM_FIELDS:
+            token[claim] = getattr(user, claim, None)
+        return token
+
     def validate(self, attrs):
         data = super().validate(attrs)
         refresh = self.get_token(self.user)
@@ -41,3 +54,25 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
             'name': self.user.get_full_name()
         }
         return data
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        store = get_revocation_store()
+        if store.is_token_revoked(refresh):
+            raise InvalidToken('Token is revoked')
+        data = super().validate(attrs)
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            store.revoke_token(refresh)
+        return data
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+    def validate(self, attrs):
+        try:
+            refresh = RefreshToken(attrs['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        get_revocation_store().revoke_token(refresh)
+        return {}
@@ -1,23 +1,32 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.permissions import AllowAny
 from django.contrib.auth import get_user_model
-from .serializers import UserRegistrationSerializer, CustomTokenObtainPairSerializer
+from cart.guest import guest_token, merge_guest_cart
+from .serializers import (
+    CustomTokenObtainPairSerializer,
+    LogoutSerializer,
+    RevocableTokenRefreshSerializer,
+    UserRegistrationSerializer,
+)
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 class UserRegistrationView(APIView):
     permission_classes = [AllowAny]
+    throttle_scope = 'auth'
     
     def post(self, request):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
             if user:
-                refresh = RefreshToken.for_user(user)
+                refresh = CustomTokenObtainPairSerializer.get_token(user)
                 return Response({
                     'refresh': str(refresh),
                     'access': str(refresh.access_token),
@@ -32,5 +41,31 @@ class UserRegistrationView(APIView):
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
     permission_classes = [AllowAny]
+    throttle_scope = 'auth'
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            # Fold the X-Guest-Cart cart into the user's with one upsert. The
+            # user is authenticated by now: a failed merge must not cost them
+            # their tokens, the guest cart is simply kept for another try.
+            try:
+                merge_guest_cart(response.data['user']['id'], guest_token(request))
+            except Exception:
+                logger.exception('Could not merge guest cart for user %s', response.data['user']['id'])
+        return response
+
+class RevocableTokenRefreshView(TokenRefreshView):
+    serializer_class = RevocableTokenRefreshSerializer
+    # Limits replaying a stolen refresh token as well as guessing.
+    throttle_scope = 'auth'
+
+class LogoutView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(status=status.HTTP_205_RESET_CONTENT)
 
 # Create your views here.
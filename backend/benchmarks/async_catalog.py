@@ -0,0 +1,130 @@
+"""
+Concurrent throughput of the catalog reads: sync views under WSGI threads vs
+the async views under a single ASGI event loop.
+
+Every simulated client is slow: after its response is produced it takes
+``--latency`` seconds to drain, like a phone on a poor connection. A WSGI
+worker thread is stuck for that time; the ASGI worker just awaits ``send``.
+Both paths go through Django's full handler and middleware stack.
+
+    cd backend && python -m benchmarks.async_catalog --clients 500 --threads 16 --latency 0.2
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'farmfresh_backend.settings')
+
+import django
+
+django.setup()
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+ENDPOINTS = {
+    'products': ('/api/v1/products/products/', '/api/v1/products/async/products/'),
+    'directory': ('/api/v1/users/directory/', '/api/v1/users/async/directory/'),
+}
+
+
+def seed(products):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from products.models import Category, Product
+    from users.models import SellerProfile, User
+
+    seller = User.objects.create_user(username='farmer', password='benchmark', is_seller=True)
+    profile = SellerProfile.objects.create(user=seller, farm_name='Green Acres', region='Pune')
+    category = Category.objects.create(name='Fruit')
+    Product.objects.bulk_create(
+        Product(seller=profile, category=category, name=f'Mango {i}', description='Alphonso',
+                price='5.50', quantity=i)
+        for i in range(products)
+    )
+    buyer = User.objects.create_user(username='buyer', password='benchmark')
+    return f'Bearer {RefreshToken.for_user(buyer).access_token}'
+
+
+def run_wsgi(path, auth, clients, threads, latency):
+    handler = WSGIHandler()
+    environ = RequestFactory().get(path, HTTP_AUTHORIZATION=auth).environ
+    statuses = []
+
+    def client():
+        response = handler(dict(environ), lambda status, headers: statuses.append(status))
+        b''.join(response)
+        time.sleep(latency)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for future in [pool.submit(client) for _ in range(clients)]:
+            future.result()
+    return time.perf_counter() - started, statuses
+
+
+def run_asgi(path, auth, clients, latency):
+    handler = ASGIHandler()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(b'host', b'testserver'), (b'authorization', auth.encode())],
+    }
+    statuses = []
+
+    async def client():
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Django listens for a disconnect until the response is done.
+            await asyncio.Future()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif not message.get('more_body'):
+                await asyncio.sleep(latency)
+
+        await handler(dict(scope), receive, send)
+
+    async def main():
+        await asyncio.gather(*(client() for _ in range(clients)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - started, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', choices=ENDPOINTS, default='products')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=16, help='WSGI worker threads')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds each client takes to drain')
+    parser.add_argument('--products', type=int, default=50)
+    args = parser.parse_args()
+    # Every request here is "slow" by design; keep the slow-request log quiet.
+    logging.getLogger('farmfresh.requests').setLevel(logging.ERROR)
+    connection.creation.create_test_db(verbosity=0)
+    auth = seed(args.products)
+    sync_path, async_path = ENDPOINTS[args.endpoint]
+    with override_settings(ALLOWED_HOSTS=['testserver'], DEBUG=False):
+        for label, (elapsed, statuses) in (
+            (f'WSGI, {args.threads} threads', run_wsgi(sync_path, auth, args.clients, args.threads, args.latency)),
+            ('ASGI, async views', run_asgi(async_path, auth, args.clients, args.latency)),
+        ):
+            ok = sum(1 for status in statuses if str(status).startswith('200'))
+            print(f'{label:<22} {args.clients / elapsed:8.1f} req/s  ({ok}/{args.clients} OK, {elapsed:.2f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Read/write concurrency of SQLite with Django's defaults vs the tuned profile.
+
+Runs reader and writer threads against a scratch database file for a fixed
+time, first with the stock connection settings (rollback journal,
+synchronous=FULL, deferred transactions) and then in WAL mode (as set up by
+``manage.py enable_sqlite_wal``) with SQLITE_PRAGMAS and IMMEDIATE
+transactions from farmfresh_backend.database.
+
+    cd backend && python -m benchmarks.database_concurrency --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from farmfresh_backend.database import SQLITE_PRAGMAS, sqlite_init_command
+
+ROWS = 20000
+
+
+def connect(path, tuned):
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+    if tuned:
+        connection.executescript(sqlite_init_command())
+    return connection
+
+
+def prepare(path, tuned):
+    connection = connect(path, tuned)
+    if tuned:
+        connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('CREATE TABLE product (id INTEGER PRIMARY KEY, name TEXT, price REAL, quantity INTEGER)')
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO product (name, price, quantity) VALUES (?, ?, ?)',
+        ((f'product {i}', random.random() * 100, random.randint(0, 500)) for i in range(ROWS)),
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def reader(path, tuned, deadline, counts):
+    connection = connect(path, tuned)
+    done = errors = 0
+    while time.monotonic() < deadline:
+        start = random.randint(1, ROWS - 100)
+        try:
+            connection.execute(
+                'SELECT id, name, price FROM product WHERE id BETWEEN ? AND ?', (start, start + 50)
+            ).fetchall()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+    counts.append(('read', done, errors))
+    connection.close()
+
+
+def writer(path, tuned, deadline, counts):
+    connection = connect(path, tuned)
+    begin = 'BEGIN IMMEDIATE' if tuned else 'BEGIN'
+    done = errors = 0
+    while time.monotonic() < deadline:
+        try:
+            connection.execute(begin)
+            product_id = random.randint(1, ROWS)
+            connection.execute('SELECT quantity FROM product WHERE id = ?', (product_id,)).fetchone()
+            connection.execute('UPDATE product SET quantity = quantity - 1 WHERE id = ?', (product_id,))
+            connection.execute('COMMIT')
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+    counts.append(('write', done, errors))
+    connection.close()
+
+
+def run(tuned, readers, writers, seconds):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        prepare(path, tuned)
+        counts = []
+        deadline = time.monotonic() + seconds
+        threads = [threading.Thread(target=reader, args=(path, tuned, deadline, counts)) for _ in range(readers)]
+        threads += [threading.Thread(target=writer, args=(path, tuned, deadline, counts)) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    totals = {}
+    for kind, done, errors in counts:
+        ok, failed = totals.get(kind, (0, 0))
+        totals[kind] = (ok + done, failed + errors)
+    return {kind: (ok / seconds, failed) for kind, (ok, failed) in totals.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    print(f'pragmas: {SQLITE_PRAGMAS}')
+    for label, tuned in (('default', False), ('tuned', True)):
+        result = run(tuned, args.readers, args.writers, args.seconds)
+        reads, read_errors = result.get('read', (0, 0))
+        writes, write_errors = result.get('write', (0, 0))
+        print(f'{label:8} reads {reads:10.0f}/s ({read_errors} errors)   '
+              f'writes {writes:8.0f}/s ({write_errors} errors)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-request overhead of the middleware stack on an API route.
+
+Compares the old flat stack (session, CSRF, auth and messages on every request)
+with the BrowserOnlyMiddleware arrangement from settings, replaying the same
+authenticated GET through Django's full request handler.
+
+    cd backend && python -m benchmarks.middleware_overhead --requests 5000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'farmfresh_backend.settings')
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import path
+
+FLAT_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+def ping(request):
+    # Touch request.user like a view would, so lazy auth work is not skipped.
+    getattr(request, 'user', None)
+    return HttpResponse(b'{}', content_type='application/json')
+
+
+urlpatterns = [path('api/v1/ping/', ping)]
+
+
+def run(middleware, requests):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__, ALLOWED_HOSTS=['testserver']):
+        handler = WSGIHandler()
+        factory = RequestFactory()
+        environ = factory.get('/api/v1/ping/', HTTP_COOKIE='sessionid=abc; csrftoken=def').environ
+        start_response = lambda status, headers: None
+        for _ in range(200):
+            handler(dict(environ), start_response)
+        started = time.perf_counter()
+        for _ in range(requests):
+            handler(dict(environ), start_response)
+        return (time.perf_counter() - started) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+    # Session lookups need the tables; use a throwaway test database.
+    connection.creation.create_test_db(verbosity=0)
+    flat = run(FLAT_MIDDLEWARE, args.requests)
+    lean = run(settings.MIDDLEWARE, args.requests)
+    print(f'flat stack:   {flat * 1e6:8.1f} us/request')
+    print(f'browser-only: {lean * 1e6:8.1f} us/request')
+    print(f'saved:        {(flat - lean) * 1e6:8.1f} us/request ({(1 - lean / flat) * 100:.0f}%)')
+
+
+if __name__ == '__main__':
+    main()
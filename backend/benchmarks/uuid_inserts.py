@@ -0,0 +1,76 @@
+"""
+Insert throughput and primary-key index size with UUIDv4 vs UUIDv7 keys.
+
+Fills a scratch table shaped like Django's UUID primary key on SQLite
+(``id char(32) NOT NULL PRIMARY KEY``) in committed batches, once with random
+version 4 keys and once with farmfresh_backend.ids.uuid7, and reports rows/s
+and the size of the primary-key index. The page cache is capped so the index
+outgrows it, as a busy production table does.
+
+    cd backend && python -m benchmarks.uuid_inserts --rows 1000000 --batch 1000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+
+from farmfresh_backend.database import SQLITE_PRAGMAS, sqlite_init_command
+from farmfresh_backend.ids import uuid7
+
+GENERATORS = {'uuid4': uuid.uuid4, 'uuid7': uuid7}
+
+
+def index_size(connection):
+    """Pages and bytes used by the primary-key index, or None without dbstat."""
+    try:
+        pages, size = connection.execute(
+            "SELECT count(*), sum(pgsize) FROM dbstat WHERE name LIKE 'sqlite_autoindex_bench_%'"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return pages, size
+
+
+def run(generator, rows, batch, cache_kib):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.sqlite3')
+        connection = sqlite3.connect(path, isolation_level=None)
+        connection.executescript(
+            sqlite_init_command({'journal_mode': 'WAL', **SQLITE_PRAGMAS, 'cache_size': -cache_kib, 'mmap_size': 0})
+        )
+        connection.execute(
+            'CREATE TABLE bench (id char(32) NOT NULL PRIMARY KEY, created_at datetime NOT NULL)'
+        )
+        started = time.perf_counter()
+        for offset in range(0, rows, batch):
+            count = min(batch, rows - offset)
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany(
+                'INSERT INTO bench (id, created_at) VALUES (?, CURRENT_TIMESTAMP)',
+                ((generator().hex,) for _ in range(count)),
+            )
+            connection.execute('COMMIT')
+        elapsed = time.perf_counter() - started
+        connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        size = index_size(connection)
+        file_size = os.path.getsize(path)
+        connection.close()
+    return rows / elapsed, size, file_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--cache-kib', type=int, default=8192, help='SQLite page cache per connection')
+    args = parser.parse_args()
+    for label, generator in GENERATORS.items():
+        rate, size, file_size = run(generator, args.rows, args.batch, args.cache_kib)
+        index = f'index {size[1] / 2**20:7.1f} MiB ({size[0]} pages)' if size else 'index n/a (no dbstat)'
+        print(f'{label:6} {rate:10.0f} rows/s   {index}   file {file_size / 2**20:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Checkout revalidation of cart lines against the catalogue.
+
+``revalidate`` checks every line's price and stock with one ``IN`` query over
+``Product``, however many lines there are, and reports per-line issues for the
+final review screen:
+
+* ``product_removed``: the product no longer exists.
+* ``price_changed``: it costs something else than when it was put in the cart.
+* ``insufficient_stock``: fewer units are left than the lines for that
+  product ask for between them.
+
+Totals are at current prices, for the lines whose product still exists.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from products.models import Product
+
+PRODUCT_REMOVED = 'product_removed'
+PRICE_CHANGED = 'price_changed'
+INSUFFICIENT_STOCK = 'insufficient_stock'
+
+
+@dataclass
+class LineCheck:
+    product_id: object
+    quantity: int
+    unit_price: Decimal = None
+    name: str = None
+    price: Decimal = None
+    available: int = 0
+    issues: list = field(default_factory=list)
+
+    @property
+    def line_total(self):
+        return self.price * self.quantity if self.price is not None else Decimal('0')
+
+
+@dataclass
+class CheckoutPreview:
+    lines: list
+
+    @property
+    def count(self):
+        return sum(line.quantity for line in self.lines if line.price is not None)
+
+    @property
+    def total(self):
+        return sum((line.line_total for line in self.lines), Decimal('0'))
+
+    @property
+    def ok(self):
+        return bool(self.lines) and not any(line.issues for line in self.lines)
+
+
+def revalidate(lines):
+    """
+    Check ``(product_id, quantity, unit_price)`` lines; ``unit_price`` is the
+    price the shopper saw, or None to skip the price check for that line.
+    """
+    checks = [LineCheck(product_id, quantity, unit_price) for product_id, quantity, unit_price in lines]
+    # A product listed twice draws both lines from the same stock.
+    wanted = Counter()
+    for check in checks:
+        wanted[check.product_id] += check.quantity
+    products = {
+        product.id: product
+        for product in Product.objects.filter(id__in={check.product_id for check in checks})
+        .only('id', 'name', 'price', 'quantity')
+    }
+    for check in checks:
+        product = products.get(check.product_id)
+        if product is None:
+            check.issues.append(PRODUCT_REMOVED)
+            continue
+        check.name, check.price, check.available = product.name, product.price, product.quantity
+        if check.unit_price is not None and check.unit_price != product.price:
+            check.issues.append(PRICE_CHANGED)
+        if product.quantity < wanted[check.product_id]:
+            check.issues.append(INSUFFICIENT_STOCK)
+    return CheckoutPreview(checks)
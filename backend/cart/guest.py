@@ -0,0 +1,95 @@
+"""
+Carts for shoppers who have not signed in yet.
+
+A guest cart is a server-side session (``SESSION_ENGINE``, the database by
+default) whose session key is the guest token. API requests carry no session
+cookie, so the client keeps the token and sends it back in the
+``X-Guest-Cart`` header. When the shopper obtains a JWT with that header set,
+``merge_guest_cart`` folds the guest lines into their cart with one
+``add_to_cart`` upsert and deletes the session, so logging in costs the same
+handful of queries whatever the size of the guest cart.
+"""
+import uuid
+from importlib import import_module
+
+from django.conf import settings
+from django.db import transaction
+
+from products.models import Product
+
+from .models import MAX_LINE_QUANTITY, CartItem
+from .serializers import MAX_CHECKOUT_LINES
+from .upsert import add_to_cart
+
+GUEST_CART_HEADER = 'X-Guest-Cart'
+SESSION_KEY = 'cart'
+
+
+def guest_token(request):
+    return request.headers.get(GUEST_CART_HEADER) or None
+
+
+def guest_session(token):
+    """The session for ``token``; an unknown or expired token gets a new, empty one."""
+    return import_module(settings.SESSION_ENGINE).SessionStore(session_key=token)
+
+
+def guest_lines(session):
+    """
+    ``{product_id: quantity}`` with product ids as strings. Entries that are
+    not a product id and a positive quantity are dropped and quantities are
+    capped at ``MAX_LINE_QUANTITY``, whatever was stored in the session.
+    """
+    lines = session.get(SESSION_KEY)
+    if not isinstance(lines, dict):
+        return {}
+    clean = {}
+    for product_id, quantity in lines.items():
+        try:
+            product_id = str(uuid.UUID(str(product_id)))
+        except ValueError:
+            continue
+        if isinstance(quantity, int) and not isinstance(quantity, bool) and quantity > 0:
+            clean[product_id] = min(quantity, MAX_LINE_QUANTITY)
+    return clean
+
+
+def save_guest_lines(session, lines):
+    session[SESSION_KEY] = {product_id: min(quantity, MAX_LINE_QUANTITY) for product_id, quantity in lines.items()}
+    session.save()
+    return session.session_key
+
+
+def merge_guest_cart(user_id, token):
+    """
+    Add the guest cart behind ``token`` to the user's cart and discard it.
+    Products deleted or sold out since they were added are dropped, as are new
+    lines past ``MAX_CHECKOUT_LINES`` (in the order they were added to the
+    guest cart). Returns the number of merged lines.
+    """
+    if not token:
+        return 0
+    session = guest_session(token)
+    lines = guest_lines(session)
+    if not lines:
+        return 0
+    with transaction.atomic():
+        available = {
+            str(product_id): product_id
+            for product_id in Product.objects.filter(id__in=list(lines), quantity__gte=1).values_list('id', flat=True)
+        }
+        in_cart = set(CartItem.objects.filter(user_id=user_id).values_list('product_id', flat=True))
+        room = MAX_CHECKOUT_LINES - len(in_cart)
+        quantities = {}
+        for key, quantity in lines.items():
+            product_id = available.get(key)
+            if product_id is None:
+                continue
+            if product_id not in in_cart:
+                if room <= 0:
+                    continue
+                room -= 1
+            quantities[product_id] = quantity
+        merged = add_to_cart(user_id, quantities)
+    session.delete()
+    return len(merged)
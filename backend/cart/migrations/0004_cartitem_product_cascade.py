@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 00:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_orphaned_lines(apps, schema_editor):
+    # Lines whose product was deleted while they did not cascade; the foreign
+    # key constraint added below would reject them.
+    CartItem = apps.get_model('cart', 'CartItem')
+    Product = apps.get_model('products', 'Product')
+    CartItem.objects.exclude(product_id__in=Product.objects.values('id')).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_cartitem_product_outlives_product'),
+        ('products', '0003_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_orphaned_lines, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='cartitem',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product'),
+        ),
+    ]
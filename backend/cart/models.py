@@ -0,0 +1,30 @@
+from django.db import models
+from users.models import User
+from products.models import Product
+from farmfresh_backend.ids import uuid7
+
+# Upper bound on one line's quantity, enforced by the input serializers and by
+# the add_to_cart() increment; keeps line totals inside their DecimalFields.
+MAX_LINE_QUANTITY = 999
+
+class CartItem(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # Lookups by user are served by the unique constraint below.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cart_items', db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    quantity = models.PositiveIntegerField(default=1)
+    # Product price when the line was last added to or set; checkout flags
+    # lines whose product has been repriced since.
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    added_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # One line per product; also the conflict target of add_to_cart().
+            models.UniqueConstraint(fields=['user', 'product'], name='unique_cart_item_per_user_product'),
+        ]
+
+    @property
+    def line_total(self):
+        return self.product.price * self.quantity
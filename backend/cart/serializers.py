@@ -0,0 +1,71 @@
+from rest_framework import serializers
+from products.models import Product
+from .models import MAX_LINE_QUANTITY, CartItem
+
+class CartProductSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ['id', 'seller', 'name', 'price', 'quantity', 'image', 'region']
+
+class CartItemSerializer(serializers.ModelSerializer):
+    product_id = serializers.UUIDField(read_only=True)
+    product = CartProductSerializer(read_only=True)
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = CartItem
+        fields = ['id', 'product_id', 'product', 'quantity', 'line_total']
+
+class GuestCartItemSerializer(CartItemSerializer):
+    class Meta(CartItemSerializer.Meta):
+        fields = ['product_id', 'product', 'quantity', 'line_total']
+
+class CartTotalsSerializer(serializers.Serializer):
+    lines = serializers.IntegerField()
+    count = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+class CartLineInputSerializer(serializers.Serializer):
+    product_id = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+    quantity = serializers.IntegerField(min_value=1, max_value=MAX_LINE_QUANTITY, default=1)
+
+    def validate_product_id(self, product):
+        if product.quantity < 1:
+            raise serializers.ValidationError('Product is not available.')
+        return product
+
+class CartQuantityInputSerializer(serializers.Serializer):
+    product_id = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+    # Zero removes the line.
+    quantity = serializers.IntegerField(min_value=0, max_value=MAX_LINE_QUANTITY)
+
+# Keeps the IN (...) list under SQLite's bound-parameter limit.
+MAX_CHECKOUT_LINES = 500
+
+class CheckoutLineInputSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1, max_value=MAX_LINE_QUANTITY)
+    # The price the shopper saw; omitted skips the price check.
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+
+class CheckoutPreviewInputSerializer(serializers.Serializer):
+    # Omitted: preview the user's server-side cart.
+    lines = serializers.ListField(
+        child=CheckoutLineInputSerializer(), allow_empty=False, max_length=MAX_CHECKOUT_LINES, required=False,
+    )
+
+class CheckoutLineSerializer(serializers.Serializer):
+    product_id = serializers.UUIDField()
+    name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    available = serializers.IntegerField()
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    issues = serializers.ListField(child=serializers.CharField())
+
+class CheckoutPreviewSerializer(serializers.Serializer):
+    lines = CheckoutLineSerializer(many=True)
+    count = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    ok = serializers.BooleanField()
@@ -0,0 +1,110 @@
+"""
+Single-statement writes to cart lines.
+
+Adding a product has to increment an existing line or create a new one, and two
+tabs (or a double-clicked button) do it concurrently. ``add_to_cart`` does both
+in one ``INSERT ... ON CONFLICT (user, product) DO UPDATE SET quantity =
+quantity + excluded.quantity`` against the unique constraint on ``CartItem``,
+so there is no read-modify-write window and no IntegrityError retry, however
+many products are added at once. ``set_quantity`` runs the same statement but
+overwrites the quantity. Both read the line back with ``RETURNING``: ids are
+generated client-side, so an existing line keeps its stored id rather than the
+one sent, which ``bulk_create(update_conflicts=True)`` would hand back instead.
+SQLite (3.35+) and PostgreSQL both support this syntax. The increment saturates
+at ``MAX_LINE_QUANTITY``, so repeated adds can't push a line past what the rest
+of the cart code can total. Both functions also record the product's current
+price on the line through a subquery, so each stays a single statement.
+"""
+from django.db import connections, router
+from django.utils import timezone
+
+from farmfresh_backend.ids import uuid7
+
+from .models import MAX_LINE_QUANTITY, CartItem
+
+COLUMNS = ('id', 'user', 'product', 'quantity', 'unit_price', 'added_at', 'updated_at')
+
+
+def add_to_cart(user_id, quantities):
+    """
+    Add ``{product_id: quantity}`` (quantities >= 1) to the user's cart; each
+    line is capped at ``MAX_LINE_QUANTITY``.
+
+    Returns ``{product_id: (item, created)}``: each ``item`` carries the line's
+    id and resulting quantity.
+    """
+    return _upsert(user_id, quantities, increment=True)
+
+
+def _upsert(user_id, quantities, increment):
+    product_field = CartItem._meta.get_field('product')
+    unit_price_field = CartItem._meta.get_field('unit_price')
+    quantities = {
+        product_field.to_python(product_id): min(int(quantity), MAX_LINE_QUANTITY)
+        for product_id, quantity in quantities.items()
+    }
+    if not quantities:
+        return {}
+    connection = connections[router.db_for_write(CartItem)]
+    fields = [CartItem._meta.get_field(name) for name in COLUMNS]
+    # unit_price is looked up from the product id bound in its place.
+    prep_fields = [product_field if field.name == 'unit_price' else field for field in fields]
+    items = list(quantities.items())
+    batch_size = connection.ops.bulk_batch_size(fields, items)
+    now = timezone.now()
+    result = {}
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            params = []
+            new_ids = set()
+            for product_id, quantity in batch:
+                new_id = uuid7()
+                new_ids.add(new_id)
+                values = (new_id, user_id, product_id, quantity, product_id, now, now)
+                params.extend(field.get_db_prep_save(value, connection) for field, value in zip(prep_fields, values))
+            cursor.execute(_upsert_sql(connection, fields, len(batch), increment), params)
+            for pk, product_id, quantity, unit_price in cursor.fetchall():
+                product_id = product_field.to_python(product_id)
+                pk = CartItem._meta.pk.to_python(pk)
+                item = CartItem(
+                    id=pk, user_id=user_id, product_id=product_id,
+                    quantity=quantity, unit_price=unit_price_field.to_python(unit_price), updated_at=now,
+                )
+                item._state.adding = False
+                # An updated line keeps its id, so only new rows return ours.
+                result[product_id] = (item, pk in new_ids)
+    return result
+
+
+def _upsert_sql(connection, fields, rows, increment):
+    qn = connection.ops.quote_name
+    table = qn(CartItem._meta.db_table)
+    columns = {field.name: qn(field.column) for field in fields}
+    product = CartItem._meta.get_field('product').related_model._meta
+    price = (
+        f'(SELECT {qn(product.get_field("price").column)} FROM {qn(product.db_table)} '
+        f'WHERE {qn(product.pk.column)} = %s)'
+    )
+    row = '(%s)' % ', '.join(price if field.name == 'unit_price' else '%s' for field in fields)
+    quantity = columns['quantity']
+    if increment:
+        total = f'{table}.{quantity} + EXCLUDED.{quantity}'
+        new_quantity = f'CASE WHEN {total} > {MAX_LINE_QUANTITY:d} THEN {MAX_LINE_QUANTITY:d} ELSE {total} END'
+    else:
+        new_quantity = f'EXCLUDED.{quantity}'
+    return (
+        f'INSERT INTO {table} ({", ".join(columns.values())}) VALUES {", ".join([row] * rows)} '
+        f'ON CONFLICT ({columns["user"]}, {columns["product"]}) DO UPDATE SET '
+        f'{quantity} = {new_quantity}, '
+        f'{columns["unit_price"]} = EXCLUDED.{columns["unit_price"]}, '
+        f'{columns["updated_at"]} = EXCLUDED.{columns["updated_at"]} '
+        f'RETURNING {columns["id"]}, {columns["product"]}, {columns["quantity"]}, {columns["unit_price"]}'
+    )
+
+
+def set_quantity(user_id, product, quantity):
+    """Create or overwrite the user's line for ``product`` in one statement."""
+    item, _ = _upsert(user_id, {product.id: quantity}, increment=False)[product.id]
+    item.product = product
+    return item
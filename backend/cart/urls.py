@@ -0,0 +1,11 @@
+from django.urls import path
+from rest_framework.routers import SimpleRouter
+from .views import CartViewSet, GuestCartView
+
+# The cart is a single resource per user, mounted at the prefix root.
+router = SimpleRouter()
+router.register(r'', CartViewSet, basename='cart')
+
+urlpatterns = [
+    path('guest/', GuestCartView.as_view(), name='cart-guest'),
+] + router.urls
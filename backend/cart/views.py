@@ -0,0 +1,174 @@
+from decimal import Decimal
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from products.models import Product
+from . import guest
+from .checkout import revalidate
+from .models import MAX_LINE_QUANTITY, CartItem
+from .serializers import (
+    CartItemSerializer, CartLineInputSerializer, CartQuantityInputSerializer, CartTotalsSerializer,
+    CheckoutPreviewInputSerializer, CheckoutPreviewSerializer, GuestCartItemSerializer, MAX_CHECKOUT_LINES,
+)
+from .upsert import add_to_cart, set_quantity
+
+UUID_PATTERN = r'[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}'
+
+def cart_totals(items):
+    return {
+        'lines': len(items),
+        'count': sum(item.quantity for item in items),
+        'total': sum((item.line_total for item in items), Decimal('0')),
+    }
+
+class CartViewSet(viewsets.GenericViewSet):
+    """
+    The signed-in user's cart, one line per product. Lines are addressed by
+    product id; the list returns the lines with their products and the cart
+    totals, all from one query.
+    """
+    serializer_class = CartItemSerializer
+
+    def get_queryset(self):
+        return CartItem.objects.filter(user=self.request.user).select_related('product').order_by('added_at')
+
+    def _is_full(self, product):
+        # Lines for other products; re-adding an existing line never counts.
+        others = CartItem.objects.filter(user=self.request.user).exclude(product=product)
+        return others.count() >= MAX_CHECKOUT_LINES
+
+    def list(self, request):
+        items = list(self.get_queryset())
+        return Response({
+            'lines': self.get_serializer(items, many=True).data,
+            'totals': CartTotalsSerializer(cart_totals(items)).data,
+        })
+
+    @action(detail=False, methods=['get'])
+    def total(self, request):
+        return Response(CartTotalsSerializer(cart_totals(list(self.get_queryset()))).data)
+
+    @action(detail=False, methods=['post'])
+    def add(self, request):
+        serializer = CartLineInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product = serializer.validated_data['product_id']
+        if self._is_full(product):
+            return Response({'detail': 'Cart is full.'}, status=status.HTTP_400_BAD_REQUEST)
+        item, created = add_to_cart(request.user.id, {product.id: serializer.validated_data['quantity']})[product.id]
+        item.product = product
+        return Response(
+            self.get_serializer(item).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=['put', 'patch'], url_path='update', url_name='update')
+    def update_quantity(self, request):
+        serializer = CartQuantityInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product = serializer.validated_data['product_id']
+        quantity = serializer.validated_data['quantity']
+        if quantity == 0:
+            self.get_queryset().filter(product=product).delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        if self._is_full(product):
+            return Response({'detail': 'Cart is full.'}, status=status.HTTP_400_BAD_REQUEST)
+        item = set_quantity(request.user.id, product, quantity)
+        return Response(self.get_serializer(item).data)
+
+    @action(detail=False, methods=['delete'], url_path=f'remove/(?P<product_id>{UUID_PATTERN})', url_name='remove')
+    def remove(self, request, product_id):
+        deleted, _ = self.get_queryset().filter(product_id=product_id).delete()
+        if not deleted:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['delete'])
+    def clear(self, request):
+        self.get_queryset().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['get', 'post'], url_path='checkout-preview', url_name='checkout-preview')
+    def checkout_preview(self, request):
+        """
+        Revalidate prices and stock before checkout: the ``lines`` posted by a
+        client-side cart, or the user's server-side cart.
+        """
+        serializer = CheckoutPreviewInputSerializer(data=request.data if request.method == 'POST' else {})
+        serializer.is_valid(raise_exception=True)
+        if 'lines' in serializer.validated_data:
+            lines = [
+                (line['product_id'], line['quantity'], line.get('price'))
+                for line in serializer.validated_data['lines']
+            ]
+        else:
+            lines = CartItem.objects.filter(user=request.user).order_by('added_at').values_list(
+                'product_id', 'quantity', 'unit_price',
+            )
+        return Response(CheckoutPreviewSerializer(revalidate(lines)).data)
+
+
+class GuestCartView(APIView):
+    """
+    Cart of a shopper who has not signed in, kept server-side under the guest
+    token returned in the body and the ``X-Guest-Cart`` header. It is merged
+    into the user's cart when they obtain a token (see ``guest``).
+    """
+    permission_classes = [AllowAny]
+
+    def _response(self, session, lines, code=status.HTTP_200_OK):
+        products = {str(pk): product for pk, product in Product.objects.in_bulk(list(lines)).items()}
+        items = [
+            CartItem(product=products[product_id], quantity=quantity)
+            for product_id, quantity in lines.items() if product_id in products
+        ]
+        response = Response(
+            {'token': session.session_key, 'lines': GuestCartItemSerializer(items, many=True).data},
+            status=code,
+        )
+        response[guest.GUEST_CART_HEADER] = session.session_key
+        return response
+
+    def _session(self, request):
+        session = guest.guest_session(guest.guest_token(request))
+        return session, guest.guest_lines(session)
+
+    def get(self, request):
+        session, lines = self._session(request)
+        if not lines:
+            return Response({'token': None, 'lines': []})
+        return self._response(session, lines)
+
+    def post(self, request):
+        serializer = CartLineInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session, lines = self._session(request)
+        product_id = str(serializer.validated_data['product_id'].id)
+        created = product_id not in lines
+        if created and len(lines) >= MAX_CHECKOUT_LINES:
+            return Response({'detail': 'Cart is full.'}, status=status.HTTP_400_BAD_REQUEST)
+        lines[product_id] = min(lines.get(product_id, 0) + serializer.validated_data['quantity'], MAX_LINE_QUANTITY)
+        guest.save_guest_lines(session, lines)
+        return self._response(session, lines, status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def put(self, request):
+        serializer = CartQuantityInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session, lines = self._session(request)
+        product_id = str(serializer.validated_data['product_id'].id)
+        if serializer.validated_data['quantity']:
+            if product_id not in lines and len(lines) >= MAX_CHECKOUT_LINES:
+                return Response({'detail': 'Cart is full.'}, status=status.HTTP_400_BAD_REQUEST)
+            lines[product_id] = serializer.validated_data['quantity']
+        else:
+            lines.pop(product_id, None)
+        guest.save_guest_lines(session, lines)
+        return self._response(session, lines)
+
+    def delete(self, request):
+        token = guest.guest_token(request)
+        if token:
+            guest.guest_session(token).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class FarmfreshBackendConfig(AppConfig):
+    name = 'farmfresh_backend'
+
+    def ready(self):
+        from . import checks  # noqa: F401
@@ -0,0 +1,11 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'farmfresh_backend.settings')
+
+application = get_asgi_application()
+
+# Load revoked refresh tokens before the first request needs them.
+from authentication.revocation import warm_up  # noqa: E402
+
+warm_up()
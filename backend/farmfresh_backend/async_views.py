@@ -0,0 +1,103 @@
+"""
+Helpers for plain Django ``async def`` API views.
+
+DRF 3.14 views are synchronous, so under ASGI each one holds a worker thread
+for the whole request. The hot catalog reads are also served by async views
+that stay on the event loop while they wait on the database or cache; these
+helpers give them the same JWT authentication, throttling, content
+negotiation and ``?fields=``/``?expand=`` handling as the DRF endpoints.
+"""
+import math
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from authentication.backends import CachedJWTAuthentication
+
+from .dynamic_fields import shape_queryset
+from .renderers import FastJSONRenderer, MessagePackRenderer, msgpack
+
+_json = FastJSONRenderer()
+_msgpack = MessagePackRenderer()
+
+
+def _authenticate(request):
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+async def authenticate(request):
+    """Return the JWT user for ``request`` (also set as ``request.user``), or None."""
+    user = await sync_to_async(_authenticate)(request)
+    if user is not None:
+        request.user = user
+    return user
+
+
+def _throttle_wait(request, scope):
+    drf_request = Request(request)
+    drf_request.user = getattr(request, 'user', None) or AnonymousUser()
+    view = SimpleNamespace(throttle_scope=scope)
+    waits = [
+        throttle.wait()
+        for throttle in (throttle_class() for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES)
+        if not throttle.allow_request(drf_request, view)
+    ]
+    if not waits:
+        return None
+    return max((wait for wait in waits if wait is not None), default=0)
+
+
+async def throttle(request, scope=None):
+    """Apply the DRF throttle classes (and ``scope``); return a 429 response or None."""
+    wait = await sync_to_async(_throttle_wait)(request, scope)
+    if wait is None:
+        return None
+    response = api_response(request, {'detail': 'Request was throttled.'}, status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def api_response(request, data, status=200):
+    if msgpack is not None and _msgpack.media_type in request.headers.get('Accept', ''):
+        renderer = _msgpack
+    else:
+        renderer = _json
+    return HttpResponse(renderer.render(data), status=status, content_type=renderer.media_type)
+
+
+def not_authenticated(request):
+    return api_response(request, {'detail': 'Authentication credentials were not provided.'}, status=401)
+
+
+def not_found(request):
+    return api_response(request, {'detail': 'Not found.'}, status=404)
+
+
+def read_serializer(request, serializer_class, **kwargs):
+    """An unbound serializer whose context carries ``request`` for dynamic fields."""
+    return serializer_class(context={'request': Request(request)}, **kwargs)
+
+
+async def serialize_list(request, serializer_class, queryset):
+    serializer = read_serializer(request, serializer_class, many=True)
+    queryset = shape_queryset(queryset, serializer.child)
+    serializer.instance = [obj async for obj in queryset]
+    return serializer.data
+
+
+async def serialize_object(request, serializer_class, queryset):
+    serializer = read_serializer(request, serializer_class)
+    queryset = shape_queryset(queryset, serializer)
+    serializer.instance = await queryset.afirst()
+    if serializer.instance is None:
+        return None
+    return serializer.data
@@ -0,0 +1,42 @@
+"""
+Cache backends that report hits and misses to ``farmfresh_backend.metrics``.
+
+``CacheMetricsMixin`` works on top of any Django cache backend; combine it
+with the production backend (Redis, Memcached) the same way
+``InstrumentedLocMemCache`` does with the local-memory one.
+"""
+from django.core.cache.backends.locmem import LocMemCache
+
+from .metrics import registry
+
+_MISSING = object()
+
+
+class CacheMetricsMixin:
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        label = params.get('KEY_PREFIX') or (location if isinstance(location, str) else '') or 'default'
+        self._hit = ('farmfresh_cache_requests_total', (('cache', label), ('result', 'hit')))
+        self._miss = ('farmfresh_cache_requests_total', (('cache', label), ('result', 'miss')))
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            registry.inc(*self._miss)
+            return default
+        registry.inc(*self._hit)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        if found:
+            registry.inc(*self._hit, len(found))
+        if len(keys) > len(found):
+            registry.inc(*self._miss, len(keys) - len(found))
+        return found
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
@@ -0,0 +1,26 @@
+"""
+System checks for settings that are only wrong once there are several workers.
+
+Run with ``manage.py check --deploy``.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    # Throttle counters, stream tickets and broadcast job state must be visible
+    # to every worker.
+    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+        return [Error(
+            "CACHES['default'] is local to one process.",
+            hint=(
+                'API throttles count per worker, multiplying every limit by the number of '
+                'workers; notification stream tickets and broadcast job status only work '
+                'on the worker that created them. Use a shared backend such as Redis or Memcached.'
+            ),
+            id='farmfresh.E001',
+        )]
+    return []
@@ -0,0 +1,122 @@
+"""
+Sparse fieldsets (``?fields=``) and opt-in expansion (``?expand=``) for the API.
+
+``DynamicFieldsMixin`` goes on a ``ModelSerializer``. For the top-level
+serializer of a request it keeps only the fields listed in ``?fields=id,name``
+and swaps each relation listed in ``?expand=seller`` for the nested serializer
+named in ``Meta.expandable_fields``. Nested serializers always render in full.
+
+``DynamicFieldsViewMixin`` goes on the matching viewset and shapes the read
+queryset to the serializer that will actually render it: ``select_related`` for
+nested single relations, ``prefetch_related`` for nested lists, and ``.only()``
+for the selected columns whenever every field maps onto a concrete model field.
+"""
+import time
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+from .instrumentation import record_serializer_time
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _param_set(request, name):
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+
+class DynamicFieldsMixin:
+
+    def _is_request_root(self):
+        root = self.root
+        return root is self or (isinstance(root, serializers.ListSerializer) and self.parent is root)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_request_root():
+            return fields
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+        expand = _param_set(request, 'expand') or set()
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in expand & expandable.keys():
+            serializer_class, options = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = import_string(serializer_class)
+            fields[name] = serializer_class(read_only=True, **options)
+        requested = _param_set(request, 'fields')
+        if requested:
+            for name in set(fields) - requested:
+                fields.pop(name)
+        return fields
+
+    def to_representation(self, instance):
+        if not self._is_request_root():
+            return super().to_representation(instance)
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            record_serializer_time(time.perf_counter() - started)
+
+
+def _model_field(model, source):
+    if not source:
+        return None
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+
+
+def _shape(model, fields, prefix=''):
+    """Return the (only, select_related, prefetch_related) paths needed to render ``fields``."""
+    only, select, prefetch = [], [], []
+    narrowable = True
+    for field in fields.values():
+        if field.write_only:
+            continue
+        source = field.source_attrs[0] if field.source_attrs else None
+        model_field = _model_field(model, source)
+        if model_field is None:
+            # source='*', properties and methods may read any column.
+            narrowable = False
+            continue
+        path = prefix + source
+        if isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            prefetch.append(path)
+            continue
+        if model_field.concrete:
+            only.append(path)
+        if isinstance(field, serializers.BaseSerializer) and model_field.is_relation:
+            select.append(path)
+            _, nested_select, nested_prefetch = _shape(model_field.related_model, field.fields, prefix=path + '__')
+            select.extend(nested_select)
+            prefetch.extend(nested_prefetch)
+    return (only if narrowable else None), select, prefetch
+
+
+def shape_queryset(queryset, serializer):
+    """Narrow ``queryset`` to what ``serializer`` (an unbound instance) will render."""
+    only, select, prefetch = _shape(queryset.model, serializer.fields)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if only:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+class DynamicFieldsViewMixin:
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return shape_queryset(queryset, self.get_serializer())
@@ -0,0 +1,160 @@
+"""
+Per-request query and timing instrumentation.
+
+``RequestInstrumentationMiddleware`` installs a ``connection.execute_wrapper``
+on every database alias for the duration of a request, counting queries and
+summing their time, while root API serializers report their rendering time
+through ``record_serializer_time``. The totals go out in a ``Server-Timing``
+header; requests above ``SLOW_QUERY_COUNT`` queries or ``SLOW_REQUEST_MS``
+milliseconds also get one structured log line with their most frequent SQL
+fingerprints. The per-query cost is a dict increment and two clock reads, so
+it is meant to stay on in production.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('farmfresh.requests')
+
+DEFAULTS = {
+    'SERVER_TIMING': True,
+    'SLOW_QUERY_COUNT': 20,
+    'SLOW_REQUEST_MS': 500,
+    'TOP_FINGERPRINTS': 5,
+}
+
+_current = ContextVar('request_metrics', default=None)
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Collapse a SQL statement to its shape: literals and IN lists removed."""
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'serializer_time', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def top_fingerprints(self, limit):
+        counts = Counter()
+        for sql, count in self.statements.items():
+            counts[fingerprint(sql)] += count
+        return counts.most_common(limit)
+
+
+def current_metrics():
+    return _current.get()
+
+
+def record_serializer_time(seconds):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.serializer_time += seconds
+
+
+def instrumentation_settings():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_INSTRUMENTATION', {})}
+
+
+class RequestInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = instrumentation_settings()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def install_wrappers(stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.install_wrappers(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        # Connections are per thread: under ASGI the ORM runs in the request's
+        # thread-sensitive executor, so the wrappers have to be installed there.
+        stack = ExitStack()
+        await sync_to_async(self.install_wrappers)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        total = time.perf_counter() - started
+        if self.options['SERVER_TIMING']:
+            response['Server-Timing'] = (
+                f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries", '
+                f'ser;dur={metrics.serializer_time * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        if metrics.queries > self.options['SLOW_QUERY_COUNT'] or total * 1000 > self.options['SLOW_REQUEST_MS']:
+            self.log_slow(request, response, metrics, total)
+        return response
+
+    def log_slow(self, request, response, metrics, total):
+        resolver_match = getattr(request, 'resolver_match', None)
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'view': resolver_match.view_name if resolver_match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'serializer_ms': round(metrics.serializer_time * 1000, 1),
+            'queries': metrics.queries,
+            'top_sql': [
+                {'sql': sql, 'count': count}
+                for sql, count in metrics.top_fingerprints(self.options['TOP_FINGERPRINTS'])
+            ],
+        }))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from farmfresh_backend.query_audit import SUPPORTED_VENDORS, audit, hot_queries, logged_queries
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot query patterns (and optionally logged slow queries) and flag full table scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--log', help='Also replay SELECTs from a farmfresh.requests slow-request log file.')
+        parser.add_argument('--only-logged', action='store_true', help='Skip the built-in patterns.')
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='Exit with an error if any query needs a full table scan.')
+
+    def handle(self, *args, **options):
+        vendor = connections[options['database']].vendor
+        if vendor not in SUPPORTED_VENDORS:
+            raise CommandError(f'No plan analysis for {vendor}')
+        queries = {} if options['only_logged'] else hot_queries()
+        if options['log']:
+            with open(options['log'], encoding='utf-8') as log:
+                queries.update(logged_queries(log))
+        reports = audit(queries, using=options['database'])
+
+        for report in reports:
+            if report.flagged:
+                status = self.style.ERROR(f'SEQ SCAN {", ".join(report.seq_scans)}')
+            elif report.sorts:
+                status = self.style.WARNING('index, sorted in memory')
+            else:
+                status = self.style.SUCCESS('index')
+            self.stdout.write(f'{report.name:<32} {status}')
+            if options['verbosity'] > 1 or report.flagged:
+                self.stdout.write(f'    {report.sql}')
+                for line in report.plan.splitlines():
+                    self.stdout.write(f'      {line}')
+
+        flagged = [report.name for report in reports if report.flagged]
+        self.stdout.write(f'\n{len(reports)} queries, {len(flagged)} with full table scans')
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f'Full table scans in: {", ".join(flagged)}')
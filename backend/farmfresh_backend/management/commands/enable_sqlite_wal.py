@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+class Command(BaseCommand):
+    help = ('Switch a SQLite database to write-ahead logging. The mode is stored in the database file, '
+            'so this is a one-off setup step per deployed database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'{options["database"]!r} is not a SQLite database.')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            mode, = cursor.fetchone()
+        if mode.lower() != 'wal':
+            raise CommandError(f'SQLite kept journal_mode={mode}; in-memory databases cannot use WAL.')
+        self.stdout.write(self.style.SUCCESS(f'{connection.settings_dict["NAME"]} now uses journal_mode=wal'))
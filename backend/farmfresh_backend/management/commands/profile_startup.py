@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from farmfresh_backend.startup import profile_startup, startup_settings
+
+class Command(BaseCommand):
+    help = 'Boot the project in a fresh interpreter and report import times and time to first request.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Path of the first request (default: STARTUP_PROFILE["PROBE_PATH"]).')
+        parser.add_argument('--top', type=int, default=25, help='Number of slowest imports to list.')
+        parser.add_argument('--budget', type=float,
+                            help='Fail if time to first request exceeds this many seconds.')
+
+    def handle(self, *args, **options):
+        try:
+            profile = profile_startup(options['path'])
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(f'Slowest imports (cumulative, of {len(profile.imports)} modules):')
+        for item in profile.slowest_imports(options['top']):
+            self.stdout.write(f'{item.cumulative_us / 1000:9.1f} ms  {"  " * item.depth}{item.module}')
+        self.stdout.write('\nSelf import time by package:')
+        for package, self_us in profile.by_package()[:options['top']]:
+            self.stdout.write(f'{self_us / 1000:9.1f} ms  {package}')
+
+        self.stdout.write('\nStartup (with -X importtime overhead):')
+        self.stdout.write(f'  django.setup()   {profile.setup * 1000:8.1f} ms')
+        self.stdout.write(f'  WSGI handler     {profile.handler * 1000:8.1f} ms')
+        self.stdout.write(f'  first request    {profile.first_request * 1000:8.1f} ms  ({profile.status})')
+        self.stdout.write(f'  total            {profile.total * 1000:8.1f} ms  (process: {profile.process * 1000:.1f} ms)')
+
+        budget = options['budget']
+        if budget is None and options['path'] is None:
+            budget = startup_settings()['BUDGET_SECONDS']
+        if budget is not None and profile.total > budget:
+            raise CommandError(f'Time to first request {profile.total:.2f}s exceeds the {budget:.2f}s budget')
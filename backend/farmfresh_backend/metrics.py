@@ -0,0 +1,315 @@
+"""
+In-process metrics with a Prometheus text endpoint at ``/metrics``.
+
+Every thread records into its own shard, so the request path never takes a
+lock; a scrape merges the shards (plain dict copies, atomic under the GIL).
+Shards of threads that have exited are folded into a base shard, so thread
+churn doesn't grow the list. With ``METRICS['MULTIPROCESS_DIR']`` set, each
+worker process also dumps its merged totals to ``<dir>/metrics_<pid>.json``
+every ``FLUSH_SECONDS``, and a scrape served by any worker adds up every file
+in the directory, deleting those of processes that no longer exist.
+
+The endpoint requires ``Authorization: Bearer <TOKEN>`` when ``TOKEN`` is set;
+without one it only answers loopback and private addresses, unless ``DEBUG``.
+
+Gauges such as queue depths are computed at scrape time by callbacks
+registered with ``register_gauge``.
+"""
+import ipaddress
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+from .instrumentation import current_metrics
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULTS = {
+    'MULTIPROCESS_DIR': None,
+    'FLUSH_SECONDS': 5,
+    'TOKEN': None,
+}
+
+HELP = {
+    'farmfresh_http_requests_total': ('counter', 'HTTP requests by view, action, method and status.'),
+    'farmfresh_http_request_errors_total': ('counter', 'HTTP requests that ended in a 5xx response.'),
+    'farmfresh_http_request_duration_seconds': ('histogram', 'HTTP request latency by view and action.'),
+    'farmfresh_db_queries_total': ('counter', 'Database queries issued while serving requests.'),
+    'farmfresh_cache_requests_total': ('counter', 'Cache lookups by cache alias and result (hit or miss).'),
+}
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, 'METRICS', {})}
+
+
+class _Shard:
+    __slots__ = ('counters', 'histograms')
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+    def merge(self, other, buckets):
+        for key, value in other.counters.copy().items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, (counts, total, count) in other.histograms.copy().items():
+            merged = self.histograms.setdefault(key, [[0] * buckets, 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+
+
+class Registry:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._local = threading.local()
+        # (thread, shard) pairs; _base holds what exited threads recorded.
+        self._shards = []
+        self._base = _Shard()
+        self._shards_lock = threading.Lock()
+        self._gauges = {}
+        self._last_flush = 0.0
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._fold_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _fold_dead_shards(self):
+        # Called with _shards_lock held; a dead thread no longer writes to its shard.
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._base.merge(shard, len(self.buckets))
+        self._shards = live
+
+    def inc(self, name, labels, value=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                histogram[0][index] += 1
+                break
+        histogram[1] += value
+        histogram[2] += 1
+
+    def register_gauge(self, name, help_text, callback):
+        """``callback()`` returns ``{labels_tuple: value}`` and is called at scrape time."""
+        self._gauges[name] = (help_text, callback)
+
+    def snapshot(self):
+        total = _Shard()
+        with self._shards_lock:
+            self._fold_dead_shards()
+            total.merge(self._base, len(self.buckets))
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            total.merge(shard, len(self.buckets))
+        return {'counters': total.counters, 'histograms': total.histograms}
+
+    # Multi-process support
+
+    def flush(self, directory, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_flush < metrics_settings()['FLUSH_SECONDS']:
+            return
+        self._last_flush = now
+        snapshot = self.snapshot()
+        payload = {
+            'counters': [[name, list(labels), value] for (name, labels), value in snapshot['counters'].items()],
+            'histograms': [[name, list(labels), data] for (name, labels), data in snapshot['histograms'].items()],
+        }
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics_')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, os.path.join(directory, f'metrics_{os.getpid()}.json'))
+
+    def collect(self):
+        options = metrics_settings()
+        directory = options['MULTIPROCESS_DIR']
+        if not directory:
+            return self.snapshot()
+        self.flush(directory, force=True)
+        counters = defaultdict(float)
+        histograms = {}
+        for filename in os.listdir(directory):
+            if not (filename.startswith('metrics_') and filename.endswith('.json')):
+                continue
+            path = os.path.join(directory, filename)
+            if not _pid_alive(filename[len('metrics_'):-len('.json')]):
+                # Left behind by a worker that exited or was recycled.
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    payload = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in payload['counters']:
+                counters[(name, tuple(map(tuple, labels)))] += value
+            for name, labels, (buckets, total, count) in payload['histograms']:
+                merged = histograms.setdefault((name, tuple(map(tuple, labels))), [[0] * len(self.buckets), 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+                merged[2] += count
+        return {'counters': dict(counters), 'histograms': histograms}
+
+    # Exposition
+
+    def render(self):
+        data = self.collect()
+        families = defaultdict(list)
+        for (name, labels), value in data['counters'].items():
+            families[name].append(f'{name}{_labels(labels)} {_number(value)}')
+        for (name, labels), (buckets, total, count) in data['histograms'].items():
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, buckets):
+                cumulative += bucket
+                families[name].append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {cumulative}')
+            families[name].append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {count}')
+            families[name].append(f'{name}_sum{_labels(labels)} {_number(total)}')
+            families[name].append(f'{name}_count{_labels(labels)} {count}')
+        lines = []
+        for name in sorted(families):
+            kind, help_text = HELP.get(name, ('untyped', name))
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(sorted(families[name]))
+        for name, (help_text, callback) in sorted(self._gauges.items()):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for labels, value in sorted(callback().items()):
+                lines.append(f'{name}{_labels(labels)} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user.
+        return True
+    return True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+register_gauge = registry.register_gauge
+
+
+def view_labels(request):
+    """(view, action) for the resolved view, e.g. ('ProductViewSet', 'list')."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched', ''
+    func = match.func
+    cls = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    if cls is None:
+        return getattr(func, '__name__', 'unknown'), ''
+    actions = getattr(func, 'actions', None)
+    if actions:
+        return cls.__name__, actions.get(request.method.lower(), request.method.lower())
+    return cls.__name__, request.method.lower()
+
+
+class MetricsMiddleware:
+    """Records request metrics; place it after ``RequestInstrumentationMiddleware``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.directory = metrics_settings()['MULTIPROCESS_DIR']
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - started)
+        return response
+
+    def record(self, request, response, elapsed):
+        view, action = view_labels(request)
+        labels = (('view', view), ('action', action))
+        registry.inc('farmfresh_http_requests_total',
+                     labels + (('method', request.method), ('status', str(response.status_code))))
+        registry.observe('farmfresh_http_request_duration_seconds', labels, elapsed)
+        if response.status_code >= 500:
+            registry.inc('farmfresh_http_request_errors_total', labels)
+        request_metrics = current_metrics()
+        if request_metrics is not None and request_metrics.queries:
+            registry.inc('farmfresh_db_queries_total', labels, request_metrics.queries)
+        if self.directory:
+            registry.flush(self.directory)
+
+
+def _internal_address(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+
+def metrics_view(request):
+    token = metrics_settings()['TOKEN']
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponse(status=401)
+    elif not settings.DEBUG and not _internal_address(request.META.get('REMOTE_ADDR', '')):
+        return HttpResponse(status=403)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,78 @@
+"""
+Project middleware.
+
+``BrowserOnlyMiddleware`` runs the session, CSRF, authentication and message
+middleware (``BROWSER_MIDDLEWARE``) for browser routes such as ``/admin/`` only.
+Requests under ``API_PATH_PREFIXES`` are JWT-authenticated by DRF and skip that
+machinery entirely: no session lookup, no CSRF token handling, no message
+storage. Under ASGI the API path stays on the event loop; only browser routes
+pay for the wrapped middleware's sync hooks.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class BrowserOnlyMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.api_prefixes = tuple(settings.API_PATH_PREFIXES)
+        handler = get_response
+        self.view_hooks = []
+        self.exception_hooks = []
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            middleware = import_string(path)(handler)
+            # The handler only collects hooks from MIDDLEWARE itself, so the
+            # wrapped ones are dispatched from here (CSRF lives in process_view).
+            if hasattr(middleware, 'process_view'):
+                self.view_hooks.insert(0, middleware.process_view)
+            if hasattr(middleware, 'process_exception'):
+                self.exception_hooks.append(middleware.process_exception)
+            handler = middleware
+        self.browser_handler = handler
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Coroutine hooks so the handler doesn't push every API request
+            # through a thread to run process_view.
+            self.process_view = self.aprocess_view
+            self.process_exception = self.aprocess_exception
+
+    def is_api(self, request):
+        return request.path_info.startswith(self.api_prefixes)
+
+    def __call__(self, request):
+        if self.is_api(request):
+            return self.get_response(request)
+        return self.browser_handler(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        return await sync_to_async(type(self).process_view)(self, request, view_func, view_args, view_kwargs)
+
+    async def aprocess_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        return await sync_to_async(type(self).process_exception)(self, request, exception)
@@ -0,0 +1,130 @@
+"""
+EXPLAIN-based index audit.
+
+``hot_queries()`` records the query shapes the API and workers actually run,
+as querysets with placeholder arguments. ``audit()`` asks the database for
+each plan and flags full table scans (and sorts that an index could have
+avoided). ``logged_queries()`` replays the SQL fingerprints that
+``RequestInstrumentationMiddleware`` writes to its slow-request log, so
+patterns seen in production can be checked the same way. Run it through
+``manage.py audit_indexes``.
+
+Plans depend on table statistics: on PostgreSQL, run it against a database
+with production-like data (after ANALYZE), or tiny tables will always be
+scanned.
+"""
+import json
+import re
+import uuid
+from dataclasses import dataclass, field
+
+from django.db import connections
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (\S+)(.*)$', re.MULTILINE)
+_SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|GROUP BY|DISTINCT)')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\S+)')
+_POSTGRES_SORT = re.compile(r'^\s*(?:->\s+)?(?:Incremental )?Sort\b', re.MULTILINE)
+_FINGERPRINT_PLACEHOLDER = re.compile(r'\?|\bIN \(\.\.\.\)')
+
+
+@dataclass
+class PlanReport:
+    name: str
+    sql: str
+    plan: str
+    seq_scans: list = field(default_factory=list)
+    sorts: bool = False
+
+    @property
+    def flagged(self):
+        return bool(self.seq_scans)
+
+
+def _key(model, name):
+    """A placeholder value of the right type for ``model.name`` (a pk or foreign key)."""
+    target = model._meta.get_field(name)
+    target = getattr(target, 'target_field', target)
+    return uuid.uuid4() if target.get_internal_type() == 'UUIDField' else 1
+
+
+def hot_queries():
+    """Name -> queryset for every hot access pattern (arguments are placeholders)."""
+    from notifications.models import Notification
+    from notifications.retention import expired_notifications
+    from orders.models import Order, OrderItem
+    from products.models import Product
+    from reviews.models import Review
+
+    return {
+        'products.by_category': Product.objects.filter(category=_key(Product, 'category')).order_by('price'),
+        'products.by_seller': Product.objects.filter(seller=_key(Product, 'seller')).order_by('-created_at'),
+        'orders.history': Order.objects.filter(user=_key(Order, 'user')).order_by('-created_at'),
+        'orders.items_for_product': OrderItem.objects.filter(product=_key(OrderItem, 'product')),
+        'orders.items_for_order': OrderItem.objects.filter(order=_key(OrderItem, 'order')),
+        'reviews.for_product': Review.objects.filter(product=_key(Review, 'product')),
+        'notifications.inbox': Notification.objects.filter(user=_key(Notification, 'user')).order_by('-created_at'),
+        'notifications.unread': Notification.objects.filter(user=_key(Notification, 'user'), is_read=False),
+        'notifications.retention': expired_notifications(30, 90).order_by().values('id')[:1000],
+    }
+
+
+def logged_queries(lines):
+    """Distinct SELECT fingerprints (name -> SQL) from slow-request log lines."""
+    queries = {}
+    for line in lines:
+        start = line.find('{')
+        if start < 0:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except ValueError:
+            continue
+        if not isinstance(record, dict) or record.get('event') != 'slow_request':
+            continue
+        for entry in record.get('top_sql', ()):
+            sql = entry.get('sql', '')
+            if sql.lstrip().upper().startswith('SELECT') and sql not in queries.values():
+                queries[f"{record.get('view') or record.get('path')}#{len(queries) + 1}"] = sql
+    return queries
+
+
+# Backends whose plans analyse() can read.
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+
+def analyse(plan, vendor):
+    """Return (tables scanned in full, whether a separate sort step is needed)."""
+    if vendor == 'sqlite':
+        scans = [table for table, rest in _SQLITE_SCAN.findall(plan) if 'USING' not in rest]
+        return scans, bool(_SQLITE_SORT.search(plan))
+    if vendor == 'postgresql':
+        return _POSTGRES_SCAN.findall(plan), bool(_POSTGRES_SORT.search(plan))
+    raise ValueError(f'No plan analysis for {vendor}')
+
+
+def explain_sql(sql, using='default'):
+    """Plan for a fingerprint from the slow log; placeholders are bound as NULL."""
+    connection = connections[using]
+    sql = _FINGERPRINT_PLACEHOLDER.sub(lambda m: 'IN (NULL)' if m.group().startswith('IN') else 'NULL', sql)
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        rows = cursor.fetchall()
+    if connection.vendor == 'sqlite':
+        return '\n'.join(row[-1] for row in rows)
+    return '\n'.join(row[0] for row in rows)
+
+
+def audit(queries, using='default'):
+    """EXPLAIN every query (querysets or SQL strings) and return a PlanReport each."""
+    vendor = connections[using].vendor
+    reports = []
+    for name, query in queries.items():
+        if isinstance(query, str):
+            sql, plan = query, explain_sql(query, using)
+        else:
+            query = query.using(using)
+            sql, plan = str(query.query), query.explain()
+        scans, sorts = analyse(plan, vendor)
+        reports.append(PlanReport(name, sql, plan, scans, sorts))
+    return reports
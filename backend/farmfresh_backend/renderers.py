@@ -0,0 +1,58 @@
+"""
+Fast API renderers.
+
+``FastJSONRenderer`` encodes with orjson when it is installed (UUID and
+datetime natively, everything else DRF's ``JSONEncoder`` knows through the
+``default`` hook) and falls back to DRF's stdlib-based renderer otherwise, or
+when a client asks for indented output.
+
+``MessagePackRenderer`` serves ``application/msgpack`` to clients that send it
+in ``Accept``; it is only enabled in settings when msgpack is installed.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - exercised only without msgpack
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    """Handle the types orjson/msgpack don't (Decimal, lazy strings, querysets, ...)."""
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=encode_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+
+
+def _msgpack_default(obj):
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return encode_default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
@@ -0,0 +1,108 @@
+"""
+Read-replica routing.
+
+``ReplicaRouter`` sends ORM reads to a random alias from ``REPLICA_DATABASES``
+only while ``ReplicaRoutingMiddleware`` is handling a GET/HEAD/OPTIONS request.
+Everything else -- writes, unsafe requests, management commands, background
+workers -- stays on ``default``. After a user's successful write their reads
+are pinned to ``default`` for ``READ_YOUR_WRITES_SECONDS`` (tracked in the
+shared cache), so replica lag never hides a change they just made.
+
+To try it locally, copy ``db.sqlite3`` and point
+``DATABASE_REPLICA_URLS=sqlite:////path/to/replica.sqlite3`` at the copy (or at
+a second local PostgreSQL database).
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_current_request = ContextVar('db_routing_request', default=None)
+
+
+def _pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+def _resolved_user(request):
+    # Never force a lazy request.user here: loading it runs a query, which
+    # would route back through the router.
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        return None
+    return user
+
+
+def is_pinned(request):
+    pinned = getattr(request, '_db_pinned', None)
+    if pinned is not None:
+        return pinned
+    user = _resolved_user(request)
+    if user is None:
+        return False
+    request._db_pinned = bool(user.is_authenticated and cache.get(_pin_key(user.pk)))
+    return request._db_pinned
+
+
+def pin_to_primary(request):
+    user = _resolved_user(request)
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), True, getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5))
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'REPLICA_DATABASES', ())
+        request = _current_request.get()
+        if not replicas or request is None or request.method not in SAFE_METHODS or is_pinned(request):
+            return 'default'
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request)
+        return response
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_request.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            await sync_to_async(pin_to_primary)(request)
+        return response
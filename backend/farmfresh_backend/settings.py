@@ -1,6 +1,9 @@
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from .database import database_config, replica_configs
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'replace-this-with-a-secure-key'
@@ -10,7 +13,9 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # ModelAdmins are registered when the admin URLs are first resolved
+    # (see urls.py), not at startup.
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -23,16 +28,51 @@ INSTALLED_APPS = [
     'orders',
     'reviews',
     'notifications',
+    'cart',
+    'wishlist',
+    'authentication',
+    'farmfresh_backend',
 ]
 
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # orjson-backed JSON (stdlib fallback) plus MessagePack for clients that
+    # send Accept: application/msgpack, when msgpack is installed.
+    'DEFAULT_RENDERER_CLASSES': [
+        'farmfresh_backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ] + (['farmfresh_backend.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'farmfresh_backend.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ] + (['farmfresh_backend.parsers.MessagePackParser'] if find_spec('msgpack') else []),
+    # Sliding-window limits on atomic counters in the default cache, which has
+    # to be shared by all workers in production (check --deploy enforces it).
+    # Views opt into an endpoint limit with `throttle_scope`.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'farmfresh_backend.throttling.AnonRateThrottle',
+        'farmfresh_backend.throttling.UserRateThrottle',
+        'farmfresh_backend.throttling.IPRateThrottle',
+        'farmfresh_backend.throttling.ScopedRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': '120/min',
+        'user': '600/min',
+        'ip': '1200/min',
+        'products': '300/min',
+        'auth': '10/min',
+    },
+    # Number of trusted reverse proxies in front of the app. 0 identifies clients
+    # by REMOTE_ADDR only; X-Forwarded-For is client-controlled and never trusted
+    # beyond the entries those proxies added.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 # JWT Settings
@@ -48,16 +88,84 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# User lookup cache for authentication.backends.CachedJWTAuthentication.
+# STATELESS builds request.user from token claims and skips the lookup entirely;
+# such users are never staff, so keep it off where admin endpoints are served.
+JWT_AUTH_CACHE = {
+    'CACHE': 'default',
+    'TIMEOUT': 300,
+    'LOCAL_TTL': 5,
+    'LOCAL_MAXSIZE': 1024,
+    'STATELESS': False,
+}
+
+# Revoked refresh tokens (logout, BLACKLIST_AFTER_ROTATION) are checked through
+# an in-memory Bloom filter sized for CAPACITY live revocations. Each sync
+# re-reads the last SYNC_ID_OVERLAP ids in case they committed out of order.
+TOKEN_REVOCATION = {
+    'CAPACITY': 1_000_000,
+    'ERROR_RATE': 0.001,
+    'CACHE': 'default',
+    'CACHE_TIMEOUT': 300,
+    'SYNC_ID_OVERLAP': 1000,
+}
+
 MIDDLEWARE = [
+    'farmfresh_backend.instrumentation.RequestInstrumentationMiddleware',
+    'farmfresh_backend.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'farmfresh_backend.routers.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'farmfresh_backend.middleware.BrowserOnlyMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# Session-based middleware, run only outside API_PATH_PREFIXES (e.g. for /admin/).
+# JWT API clients have no use for sessions, CSRF tokens or messages.
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+API_PATH_PREFIXES = ['/api/']
+
+# Server-Timing header on every response; one structured 'farmfresh.requests'
+# log line for requests over either threshold.
+REQUEST_INSTRUMENTATION = {
+    'SERVER_TIMING': True,
+    'SLOW_QUERY_COUNT': 20,
+    'SLOW_REQUEST_MS': 500,
+    'TOP_FINGERPRINTS': 5,
+}
+
+# Prometheus text at /metrics. Set MULTIPROCESS_DIR (shared by all workers on
+# the host) when running several worker processes; TOKEN requires a bearer token.
+# Without a TOKEN only loopback and private addresses may scrape (unless DEBUG).
+METRICS = {
+    'MULTIPROCESS_DIR': os.environ.get('METRICS_DIR'),
+    'FLUSH_SECONDS': 5,
+    'TOKEN': os.environ.get('METRICS_TOKEN'),
+}
+
+# Cold-start budget checked by `manage.py profile_startup` and tests/test_startup.py:
+# seconds from `import django` to the first response in a fresh interpreter.
+STARTUP_PROFILE = {
+    'BUDGET_SECONDS': float(os.environ.get('STARTUP_BUDGET_SECONDS', 2.0)),
+    'PROBE_PATH': '/api/v1/products/products/',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'farmfresh_backend.cache.InstrumentedLocMemCache',
+    },
+}
+
+# The admin checks look for these middleware in MIDDLEWARE; they run for
+# /admin/ through BrowserOnlyMiddleware instead.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
 ROOT_URLCONF = 'farmfresh_backend.urls'
 
 TEMPLATES = [
@@ -77,14 +185,56 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'farmfresh_backend.wsgi.application'
+ASGI_APPLICATION = 'farmfresh_backend.asgi.application'
+
+# Push channel for notifications (served over ASGI at /api/v1/notifications/stream/).
+# Swap BACKEND for a shared broker when running more than one worker process.
+NOTIFICATION_BUS = {
+    'BACKEND': 'notifications.bus.InProcessBus',
+    'OPTIONS': {
+        'buffer_size': 100,
+        'buffer_ttl': 300,
+    },
+}
 
+NOTIFICATION_STREAM = {
+    'HEARTBEAT_SECONDS': 15,
+    'RETRY_MILLISECONDS': 3000,
+    # Lifetime of the single-use ?ticket= browsers open the stream with.
+    'TICKET_SECONDS': 30,
+}
+
+# Used by `manage.py purge_notifications`; schedule it from cron or the job runner.
+NOTIFICATION_RETENTION = {
+    'READ_DAYS': 30,
+    'UNREAD_DAYS': 90,
+    'BATCH_SIZE': 1000,
+    'PAUSE_SECONDS': 0.1,
+    'ARCHIVE': False,
+}
+
+# Types listed in WINDOWS (seconds) are coalesced into one notification and one
+# email per user per window; `manage.py flush_notification_digests --loop` flushes them.
+NOTIFICATION_DIGEST = {
+    'WINDOWS': {
+        'new_order': 60 * 60,
+    },
+    'EMAIL': True,
+    'EMAIL_SUBJECT': 'FarmFresh: {count} new {type} notifications',
+}
+
+# Configured from DATABASE_URL; see farmfresh_backend/database.py.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR / 'db.sqlite3'),
+    **replica_configs(),
 }
 
+# Reads from safe requests go to the replicas (DATABASE_REPLICA_URLS) and stick
+# to the primary for READ_YOUR_WRITES_SECONDS after the user's own write.
+DATABASE_ROUTERS = ['farmfresh_backend.routers.ReplicaRouter']
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+READ_YOUR_WRITES_SECONDS = 5
+
 AUTH_USER_MODEL = 'users.User'
 
 AUTH_PASSWORD_VALIDATORS = [
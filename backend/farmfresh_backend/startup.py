@@ -0,0 +1,131 @@
+"""
+Cold-start profiling.
+
+``profile_startup`` boots the project in a fresh interpreter, the way an
+autoscaled worker does, and reports how long ``django.setup()``, building the
+WSGI handler and serving a first request take, plus per-module import times
+from ``python -X importtime``. The ``profile_startup`` management command
+prints the report; ``tests/test_startup.py`` holds it to
+``STARTUP_PROFILE['BUDGET_SECONDS']``.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+DEFAULTS = {
+    'BUDGET_SECONDS': 2.0,
+    # Unauthenticated API read: exercises URL resolution, the middleware and
+    # DRF without touching the database.
+    'PROBE_PATH': '/api/v1/products/products/',
+}
+
+# Runs in the child interpreter; avoids django.test so that it isn't counted.
+PROBE = '''
+import io, json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+handler = WSGIHandler()
+ready = time.perf_counter()
+hosts = [host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')]
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+    'HTTP_HOST': hosts[0] if hosts else 'localhost', 'wsgi.input': io.BytesIO(),
+    'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+}
+statuses = []
+b''.join(handler(environ, lambda status, headers: statuses.append(status)))
+done = time.perf_counter()
+print(json.dumps({'setup': setup - started, 'handler': ready - setup,
+                  'first_request': done - ready, 'status': statuses[0], 'modules': sorted(sys.modules)}))
+'''
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def startup_settings():
+    return {**DEFAULTS, **getattr(settings, 'STARTUP_PROFILE', {})}
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    setup: float
+    handler: float
+    first_request: float
+    process: float
+    status: str
+    modules: frozenset = frozenset()
+    imports: list = field(default_factory=list)
+
+    @property
+    def total(self):
+        """Seconds from ``import django`` to the first response."""
+        return self.setup + self.handler + self.first_request
+
+    def slowest_imports(self, limit):
+        return sorted(self.imports, key=lambda item: item.cumulative_us, reverse=True)[:limit]
+
+    def by_package(self):
+        """Self import time per top-level package, slowest first (microseconds)."""
+        totals = defaultdict(int)
+        for item in self.imports:
+            totals[item.module.partition('.')[0]] += item.self_us
+        return sorted(totals.items(), key=lambda pair: pair[1], reverse=True)
+
+
+def parse_importtime(text):
+    # Modules loaded through importlib.import_module (settings, URLconfs,
+    # models, admin) are not reported by -X importtime; their own imports are.
+    imports = []
+    for line in text.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(ImportTime(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def profile_startup(path=None, imports=True):
+    path = path or startup_settings()['PROBE_PATH']
+    command = [sys.executable]
+    if imports:
+        command += ['-X', 'importtime']
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'farmfresh_backend.settings')}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+    started = time.perf_counter()
+    result = subprocess.run(
+        command + ['-c', PROBE, path],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    process = time.perf_counter() - started
+    if result.returncode:
+        raise RuntimeError(f'startup probe failed:\n{result.stderr[-2000:]}')
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        setup=timings['setup'],
+        handler=timings['handler'],
+        first_request=timings['first_request'],
+        process=process,
+        status=timings['status'],
+        modules=frozenset(timings['modules']),
+        imports=parse_importtime(result.stderr) if imports else [],
+    )
@@ -0,0 +1,133 @@
+"""
+Sliding-window API throttles backed by atomic counters in the shared cache.
+
+DRF's ``SimpleRateThrottle`` keeps a list of timestamps per client and rewrites
+it on every request: a read-modify-write that loses updates under concurrency
+and grows with the rate. These throttles keep two integer counters per client
+instead -- the current and the previous fixed window -- and estimate the
+sliding-window count as ``current + previous * (share of the previous window
+still inside the sliding window)``. The current counter is bumped with
+``cache.incr``, which is atomic on Redis, Memcached and LocMem, so concurrent
+requests can never admit more than the limit between them -- provided every
+worker uses the same cache. With the default per-process LocMem cache each
+worker keeps its own counters and the effective limit is multiplied by the
+number of workers; ``check --deploy`` reports that as farmfresh.E001.
+
+Clients are identified by ``REMOTE_ADDR``, or by the ``X-Forwarded-For``
+entry added by the outermost of ``NUM_PROXIES`` trusted proxies.
+
+Rates come from ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` as usual:
+
+* ``anon`` / ``user``: per client, for anonymous and authenticated requests;
+* ``ip``: per client address, whoever is logged in;
+* any ``throttle_scope`` set on a view: per client, for that endpoint.
+
+Denied requests get a 429 with ``Retry-After`` (set by DRF from ``wait()``).
+"""
+from contextlib import suppress
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def window_key(self, window):
+        return f'{self.key}:{window}'
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = self.now / self.duration - window
+        self.previous = self.cache.get(self.window_key(window - 1), 0)
+        self.current = self.increment(self.window_key(window))
+        if self.estimate(self.current) > self.num_requests:
+            # Give the slot back so rejected requests don't extend the block.
+            with suppress(ValueError):
+                self.cache.decr(self.window_key(window))
+            self.current -= 1
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def increment(self, key):
+        # Counters live for two windows: one as current, one as previous.
+        self.cache.add(key, 0, 2 * self.duration)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr().
+            self.cache.add(key, 1, 2 * self.duration)
+            return 1
+
+    def estimate(self, current):
+        return current + self.previous * (1 - self.elapsed)
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """Seconds until one more request fits in the sliding window."""
+        room = self.num_requests - 1
+        if self.previous and self.current <= room:
+            # The previous window's weight has to decay far enough.
+            needed = 1 - (room - self.current) / self.previous
+            return max(0.0, needed - self.elapsed) * self.duration
+        # Wait for the next window, where this one becomes the previous.
+        needed = 1 - room / self.current if self.current else 0.0
+        return (1 - self.elapsed + max(0.0, needed)) * self.duration
+
+
+class AnonRateThrottle(SlidingWindowRateThrottle):
+    scope = 'anon'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class UserRateThrottle(SlidingWindowRateThrottle):
+    scope = 'user'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class IPRateThrottle(SlidingWindowRateThrottle):
+    scope = 'ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class ScopedRateThrottle(SlidingWindowRateThrottle):
+    """Per-endpoint limits for views that set ``throttle_scope``; per user, else per IP."""
+
+    def __init__(self):
+        # The rate depends on the view, so it is resolved in allow_request.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, 'throttle_scope', None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -1,12 +1,33 @@
 from django.contrib import admin
 from django.urls import path, include
+from django.utils.functional import cached_property
+from .metrics import metrics_view
+
+
+class LazyAdminURLConf:
+    """
+    Admin URLconf that imports every app's ``admin`` module the first time an
+    ``/admin/`` path is resolved (or anything is reversed), instead of during
+    ``django.setup()`` on every API worker and management command.
+    """
+
+    @cached_property
+    def urlpatterns(self):
+        admin.autodiscover()
+        return admin.site.get_urls()
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # A (urlconf, app_name, namespace) tuple rather than include(), which
+    # would read urlpatterns straight away.
+    path('admin/', (LazyAdminURLConf(), 'admin', admin.site.name)),
     path('api/v1/auth/', include('authentication.urls')),
     path('api/v1/users/', include('users.urls')),
     path('api/v1/products/', include('products.urls')),
     path('api/v1/orders/', include('orders.urls')),
     path('api/v1/reviews/', include('reviews.urls')),
     path('api/v1/notifications/', include('notifications.urls')),
+    path('api/v1/cart/', include('cart.urls')),
+    path('api/v1/wishlist/', include('wishlist.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -4,3 +4,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'farmfresh_backend.settings')
 
 application = get_wsgi_application()
+
+# Load revoked refresh tokens before the first request needs them.
+from authentication.revocation import warm_up  # noqa: E402
+
+warm_up()
@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import ArchivedNotification, Notification
 
 admin.site.register(Notification)
+admin.site.register(ArchivedNotification)
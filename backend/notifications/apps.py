@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+
+
+class NotificationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notifications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from farmfresh_backend.metrics import register_gauge
+        register_gauge('farmfresh_queue_depth', 'Items waiting in background queues.', queue_depths)
+
+
+def queue_depths():
+    from .broadcast import queued_jobs
+    from .models import DigestBuffer
+    return {
+        (('queue', 'notification_broadcast'),): queued_jobs(),
+        (('queue', 'notification_digest'),): DigestBuffer.objects.count(),
+    }
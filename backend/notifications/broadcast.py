@@ -0,0 +1,146 @@
+"""
+Fan a single announcement out to many users.
+
+Target users are walked in primary-key order (keyset pagination), so memory is
+bounded by ``chunk_size`` no matter how many users match, and every chunk is
+inserted by one ``bulk_create`` in its own short transaction so writers never
+hold a lock for the whole run. ``bulk_create`` skips ``post_save``, so once a
+chunk commits its notifications are pushed to the event stream here, and only
+for users with a live subscriber: nobody else would read them, and buffering
+them would grow the bus with the whole audience.
+
+``start_broadcast`` runs the fan-out on a single background thread of the
+worker that received the request, and records the job's progress in the
+default cache. With several workers that cache must be shared (Redis,
+Memcached; see the ``farmfresh.E001`` deploy check), or a status request
+served by another worker reports the job as unknown. A job whose worker is
+restarted mid-run stays ``running`` until its cache entry expires.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from users.models import User
+from .bus import get_bus
+from .models import Notification
+
+AUDIENCES = {
+    'all': {},
+    'sellers': {'is_seller': True},
+    'customers': {'is_seller': False},
+}
+
+DEFAULT_CHUNK_SIZE = 1000
+JOB_TIMEOUT = 60 * 60 * 24
+
+# submit() is thread-safe; jobs run one at a time, in submission order.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notification-broadcast')
+# Jobs submitted but not started yet, for the queue-depth gauge.
+_queued = 0
+_queued_lock = threading.Lock()
+
+
+def _count_queued(delta):
+    global _queued
+    with _queued_lock:
+        _queued += delta
+
+
+def audience_queryset(audience):
+    return User.objects.filter(is_active=True, **AUDIENCES[audience])
+
+
+def iter_user_id_chunks(queryset, chunk_size):
+    last_id = None
+    queryset = queryset.order_by('id').values_list('id', flat=True)
+    while True:
+        page = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def fan_out(message, type, audience='all', chunk_size=DEFAULT_CHUNK_SIZE, pause=0, progress=None):
+    """Create one notification per targeted user and return how many were created."""
+    queryset = audience_queryset(audience)
+    total = queryset.count()
+    sent = 0
+    if progress:
+        progress(sent, total)
+    for user_ids in iter_user_id_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            notifications = Notification.objects.bulk_create(
+                [Notification(user_id=user_id, message=message, type=type) for user_id in user_ids]
+            )
+            transaction.on_commit(lambda notifications=notifications: publish_to_live_users(notifications))
+        sent += len(user_ids)
+        if progress:
+            progress(sent, total)
+        if pause:
+            time.sleep(pause)
+    return sent
+
+
+def publish_to_live_users(notifications):
+    bus = get_bus()
+    live = bus.live_channels({notification.user_id for notification in notifications})
+    if not live:
+        return
+    # Imported lazily, as in digest.publish_notification.
+    from .serializers import NotificationSerializer
+    for notification in notifications:
+        if str(notification.user_id) in live:
+            bus.publish(notification.user_id, 'notification', NotificationSerializer(notification).data)
+
+
+def _job_key(job_id):
+    return f'notifications:broadcast:{job_id}'
+
+
+def get_job(job_id):
+    return cache.get(_job_key(job_id))
+
+
+def _set_job(job_id, **state):
+    cache.set(_job_key(job_id), {'id': job_id, **state}, JOB_TIMEOUT)
+
+
+def _run_job(job_id, kwargs):
+    _count_queued(-1)
+    started = time.monotonic()
+
+    def progress(sent, total):
+        _set_job(job_id, status='running', sent=sent, total=total,
+                 elapsed=round(time.monotonic() - started, 3))
+
+    try:
+        sent = fan_out(progress=progress, **kwargs)
+    except Exception as exc:
+        _set_job(job_id, status='failed', error=str(exc))
+        raise
+    else:
+        _set_job(job_id, status='done', sent=sent, total=sent,
+                 elapsed=round(time.monotonic() - started, 3))
+    finally:
+        connections.close_all()
+
+
+def queued_jobs():
+    return _queued
+
+
+def start_broadcast(message, type, audience='all', chunk_size=DEFAULT_CHUNK_SIZE, pause=0):
+    """Queue a fan-out on the background worker and return its job id."""
+    job_id = uuid.uuid4().hex
+    _set_job(job_id, status='queued', sent=0, total=None)
+    kwargs = {'message': message, 'type': type, 'audience': audience,
+              'chunk_size': chunk_size, 'pause': pause}
+    _count_queued(1)
+    _executor.submit(_run_job, job_id, kwargs)
+    return job_id
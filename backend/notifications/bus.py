@@ -0,0 +1,160 @@
+"""
+Publish/subscribe bus feeding the notification event stream.
+
+Producers call ``get_bus().publish(user_id, event, data)`` from ordinary sync
+code; the SSE view consumes ``subscribe(user_id, last_event_id)`` as an async
+iterator. The default ``InProcessBus`` only reaches clients connected to the
+same process. Point ``NOTIFICATION_BUS['BACKEND']`` at another ``BaseBus``
+subclass (Redis, Postgres LISTEN/NOTIFY, ...) to share events between workers.
+
+Event ids are microsecond timestamps, forced to increase within a process, so
+a client's ``Last-Event-ID`` stays meaningful after a restart or when it
+reconnects to another worker.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    event: str
+    data: dict
+
+
+class BaseBus:
+    def publish(self, channel, event, data):
+        raise NotImplementedError
+
+    def subscribe(self, channel, last_event_id=None):
+        """Return an async iterator of ``Event`` for ``channel``."""
+        raise NotImplementedError
+
+    def live_channels(self, channels):
+        """
+        Return the subset of ``channels`` someone is subscribed to. Buses that
+        can't tell return them all.
+        """
+        return {str(channel) for channel in channels}
+
+
+class InProcessBus(BaseBus):
+    """
+    Fan events out to asyncio queues living on the subscribers' event loops.
+
+    The last ``buffer_size`` events of each channel are kept so a client that
+    reconnects with ``Last-Event-ID`` gets whatever it missed in between. A
+    channel's buffer is dropped once nobody is subscribed to it and its newest
+    event is more than ``buffer_ttl`` seconds old.
+    """
+
+    def __init__(self, buffer_size=100, queue_size=1000, buffer_ttl=300):
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.buffer_ttl = buffer_ttl
+        self._last_id = 0
+        self._last_sweep = 0
+        self._lock = threading.Lock()
+        self._buffers = {}
+        self._subscribers = {}
+
+    def _next_id(self):
+        self._last_id = max(time.time_ns() // 1000, self._last_id + 1)
+        return self._last_id
+
+    def _evict_idle_buffers(self, now):
+        # Called with _lock held, at most once per buffer_ttl.
+        if now - self._last_sweep < self.buffer_ttl * 1_000_000:
+            return
+        self._last_sweep = now
+        cutoff = now - self.buffer_ttl * 1_000_000
+        for channel in [
+            channel for channel, buffer in self._buffers.items()
+            if channel not in self._subscribers and buffer[-1].id < cutoff
+        ]:
+            del self._buffers[channel]
+
+    def publish(self, channel, event, data):
+        channel = str(channel)
+        with self._lock:
+            item = Event(self._next_id(), event, data)
+            self._evict_idle_buffers(item.id)
+            self._buffers.setdefault(channel, deque(maxlen=self.buffer_size)).append(item)
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, item)
+            except RuntimeError:
+                # The subscriber's loop has shut down; it will unregister itself.
+                pass
+        return item
+
+    def live_channels(self, channels):
+        with self._lock:
+            return {str(channel) for channel in channels if str(channel) in self._subscribers}
+
+    def _replay(self, channel, last_event_id):
+        if last_event_id is None:
+            return []
+        return [item for item in self._buffers.get(channel, ()) if item.id > last_event_id]
+
+    async def subscribe(self, channel, last_event_id=None):
+        channel = str(channel)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            backlog = self._replay(channel, last_event_id)
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            last_seen = last_event_id or 0
+            for item in backlog:
+                last_seen = item.id
+                yield item
+            while True:
+                item = await queue.get()
+                # Events published while the backlog was being replayed are
+                # queued as well; skip anything the client already has.
+                if item.id > last_seen:
+                    last_seen = item.id
+                    yield item
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+
+def _offer(queue, item):
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        # Slow consumer: drop the event, the client can resume from its last id.
+        pass
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                config = getattr(settings, 'NOTIFICATION_BUS', {})
+                backend = import_string(config.get('BACKEND', 'notifications.bus.InProcessBus'))
+                _bus = backend(**config.get('OPTIONS', {}))
+    return _bus
+
+
+def publish_on_commit(channel, event, data):
+    transaction.on_commit(lambda: get_bus().publish(channel, event, data))
@@ -0,0 +1,180 @@
+"""
+Digest mode: coalesce bursts of same-type notifications into one row.
+
+``notify`` is the single entry point for producers. Types listed in
+``NOTIFICATION_DIGEST['WINDOWS']`` are not written to the inbox straight away;
+each event bumps a per-user, per-type ``DigestBuffer`` row instead, and
+``flush_due_digests`` (run by the ``flush_notification_digests`` worker) turns
+every buffer whose window has elapsed into a single notification and a single
+email. Emails for notifications written straight away are sent from a
+background thread once the transaction commits, never on the request path.
+"""
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from orders.models import OrderItem
+from users.models import User
+from .bus import publish_on_commit
+from .models import DigestBuffer, Notification
+
+DEFAULTS = {
+    'WINDOWS': {},
+    'EMAIL': False,
+    'EMAIL_SUBJECT': 'FarmFresh: {count} new {type} notifications',
+}
+
+_email_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notification-email')
+
+
+def publish_notification(notification):
+    """Push a new notification to the user's connected clients once committed."""
+    # DRF serializers are only needed once something is published; importing
+    # them here keeps them off the startup path of workers and commands.
+    from .serializers import NotificationSerializer
+    publish_on_commit(notification.user_id, 'notification', NotificationSerializer(notification).data)
+
+
+def digest_settings():
+    return {**DEFAULTS, **getattr(settings, 'NOTIFICATION_DIGEST', {})}
+
+
+def notify(user_id, type, message):
+    """Record a notification for ``user_id``, buffering it if ``type`` is digested."""
+    options = digest_settings()
+    if type in options['WINDOWS']:
+        buffer_event(user_id, type, message)
+        return None
+    notification = Notification.objects.create(user_id=user_id, type=type, message=message)
+    if options['EMAIL']:
+        digests = [(user_id, type, message, 1)]
+        transaction.on_commit(lambda: _email_executor.submit(_send_emails_in_background, digests, options))
+    return notification
+
+
+def buffer_event(user_id, type, message):
+    buffers = DigestBuffer.objects.filter(user_id=user_id, type=type)
+    if buffers.update(count=F('count') + 1, last_message=message):
+        return
+    try:
+        with transaction.atomic():
+            DigestBuffer.objects.create(user_id=user_id, type=type, count=1, last_message=message)
+    except IntegrityError:
+        # Another worker opened the window first.
+        buffers.update(count=F('count') + 1, last_message=message)
+
+
+def digest_message(count, message):
+    if count == 1:
+        return message
+    return f'{message} (+{count - 1} more)'
+
+
+def flush_due_digests(now=None, force=False):
+    """Turn every elapsed digest window into one notification. Returns the number flushed."""
+    options = digest_settings()
+    windows = options['WINDOWS']
+    if not windows:
+        return 0
+    now = now or timezone.now()
+    due = Q()
+    for type, seconds in windows.items():
+        if force:
+            due |= Q(type=type)
+        else:
+            due |= Q(type=type, opened_at__lte=now - timedelta(seconds=seconds))
+    with transaction.atomic():
+        buffers = list(DigestBuffer.objects.select_for_update().filter(due))
+        if not buffers:
+            return 0
+        notifications = Notification.objects.bulk_create([
+            Notification(user_id=buffer.user_id, type=buffer.type,
+                         message=digest_message(buffer.count, buffer.last_message))
+            for buffer in buffers
+        ])
+        DigestBuffer.objects.filter(pk__in=[buffer.pk for buffer in buffers]).delete()
+        # bulk_create skips post_save, so push to connected clients here.
+        for notification in notifications:
+            publish_notification(notification)
+    if options['EMAIL']:
+        _send_emails([(buffer.user_id, buffer.type, buffer.last_message, buffer.count) for buffer in buffers], options)
+    return len(buffers)
+
+
+class OrderNotification:
+    """
+    Tells sellers about the items of an order once its transaction commits:
+    the signal handler collects item ids per order, and the first commit
+    callback reads them all with their sellers in one query and sends each
+    seller one notification per order, however many items it has. Items
+    rolled back in the meantime are simply not found.
+
+    The pending ids live on a thread-local per database alias rather than on
+    the callback, and every item registers its own callback: one registered
+    inside a savepoint that is later rolled back is dropped by Django, and the
+    items added after it must still be flushed. Callbacks that find nothing
+    pending return straight away. Ids left over by a rolled-back transaction
+    are dropped by the next flush on the thread, which finds no such rows.
+    """
+
+    @classmethod
+    def add(cls, item):
+        alias = transaction.get_connection().alias
+        orders = _pending_order_items.__dict__.setdefault(alias, defaultdict(list))
+        orders[item.order_id].append(item.pk)
+        # Outside a transaction this runs straight away.
+        transaction.on_commit(partial(cls.flush, alias), using=alias)
+
+    @staticmethod
+    def flush(alias):
+        orders = _pending_order_items.__dict__.pop(alias, None)
+        if not orders:
+            return
+        lines = defaultdict(list)
+        for order_id, seller_user_id, quantity, name in (
+            OrderItem.objects.filter(pk__in=[pk for item_ids in orders.values() for pk in item_ids],
+                                     product__isnull=False)
+            .order_by('pk').values_list('order_id', 'product__seller__user_id', 'quantity', 'product_name')
+        ):
+            lines[order_id, seller_user_id].append(f'{quantity} x {name}')
+        for (_, seller_user_id), items in lines.items():
+            notify(seller_user_id, 'new_order', f"New order for {', '.join(items)}")
+
+
+_pending_order_items = threading.local()
+
+
+def _send_emails_in_background(digests, options):
+    try:
+        _send_emails(digests, options)
+    finally:
+        # Runs on the executor thread, which has its own connections.
+        connections.close_all()
+
+
+def _send_emails(digests, options):
+    emails = dict(
+        User.objects.filter(pk__in={user_id for user_id, *_ in digests})
+        .exclude(email='')
+        .values_list('pk', 'email')
+    )
+    messages = [
+        EmailMessage(
+            subject=options['EMAIL_SUBJECT'].format(count=count, type=type),
+            body=digest_message(count, message),
+            to=[emails[user_id]],
+        )
+        for user_id, type, message, count in digests
+        if user_id in emails
+    ]
+    if messages:
+        # One SMTP connection for the whole batch.
+        get_connection(fail_silently=True).send_messages(messages)
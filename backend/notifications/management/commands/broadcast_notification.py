@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.broadcast import AUDIENCES, DEFAULT_CHUNK_SIZE, fan_out
+
+class Command(BaseCommand):
+    help = 'Send one notification to every user in an audience, in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('message')
+        parser.add_argument('--type', default='announcement')
+        parser.add_argument('--audience', choices=sorted(AUDIENCES), default='all')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between chunks to let other writers in.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(sent, total):
+            self.stdout.write(f'{sent}/{total} notifications created')
+
+        sent = fan_out(
+            options['message'],
+            options['type'],
+            audience=options['audience'],
+            chunk_size=options['chunk_size'],
+            pause=options['pause'],
+            progress=progress,
+        )
+        elapsed = time.monotonic() - started
+        rate = sent / elapsed if elapsed else sent
+        self.stdout.write(self.style.SUCCESS(
+            f'Broadcast sent to {sent} users in {elapsed:.2f}s ({rate:.0f}/s)'
+        ))
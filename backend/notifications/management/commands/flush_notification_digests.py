@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications.digest import flush_due_digests
+
+class Command(BaseCommand):
+    help = 'Flush elapsed notification digest windows into single notifications.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running as a worker.')
+        parser.add_argument('--interval', type=float, default=60, help='Seconds between flushes with --loop.')
+        parser.add_argument('--force', action='store_true', help='Flush every open window, due or not.')
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = flush_due_digests(force=options['force'])
+            self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} digests'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from notifications.retention import expired_notifications, purge_notifications, retention_settings
+
+class Command(BaseCommand):
+    help = 'Delete (or archive) notifications past the retention policy, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--read-days', type=int, help='Keep read notifications for this many days.')
+        parser.add_argument('--unread-days', type=int, help='Keep unread notifications for this many days.')
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--pause', type=float, help='Seconds to sleep between batches.')
+        parser.add_argument('--archive', action='store_true', default=None,
+                            help='Copy rows to ArchivedNotification before deleting them.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be purged.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            policy = retention_settings(READ_DAYS=options['read_days'], UNREAD_DAYS=options['unread_days'])
+            count = expired_notifications(policy['READ_DAYS'], policy['UNREAD_DAYS']).count()
+            self.stdout.write(f'{count} notifications would be purged')
+            return
+
+        def progress(result):
+            self.stdout.write(f'batch {result.batches}: {result.purged} purged so far')
+
+        result = purge_notifications(
+            read_days=options['read_days'],
+            unread_days=options['unread_days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            archive=options['archive'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {result.purged} notifications ({result.archived} archived) in '
+            f'{result.batches} batches, {result.elapsed:.2f}s ({result.rate:.0f} rows/s)'
+        ))
@@ -1,11 +1,42 @@
 from django.db import models
 from users.models import User
-import uuid
+from farmfresh_backend.ids import uuid7
 
 class Notification(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications', db_index=False)
     message = models.TextField()
     type = models.CharField(max_length=50)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Inbox pages (newest first) and unread counts / mark-all-read.
+            models.Index(fields=['user', '-created_at'], name='notification_user_created_idx'),
+            models.Index(fields=['user', 'is_read'], name='notification_user_read_idx'),
+            # Retention purge batches: a range on created_at per read state.
+            models.Index(fields=['created_at', 'is_read'], name='notification_created_read_idx'),
+        ]
+
+class ArchivedNotification(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    message = models.TextField()
+    type = models.CharField(max_length=50)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+class DigestBuffer(models.Model):
+    """Open digest window for one user and notification type."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='digest_buffers')
+    type = models.CharField(max_length=50)
+    count = models.PositiveIntegerField(default=0)
+    last_message = models.TextField()
+    opened_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'type'], name='unique_digest_buffer_per_user_type'),
+        ]
@@ -0,0 +1,88 @@
+"""
+Retention policy for the notifications table.
+
+Read notifications older than ``READ_DAYS`` and unread ones older than
+``UNREAD_DAYS`` are removed in batches of ``BATCH_SIZE`` primary keys, one short
+DELETE (plus an INSERT into ``ArchivedNotification`` when archiving) per batch,
+with ``PAUSE_SECONDS`` between batches so inbox reads and new writes are not
+starved while a large backlog is purged.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedNotification, Notification
+
+DEFAULTS = {
+    'READ_DAYS': 30,
+    'UNREAD_DAYS': 90,
+    'BATCH_SIZE': 1000,
+    'PAUSE_SECONDS': 0.1,
+    'ARCHIVE': False,
+}
+
+ARCHIVED_FIELDS = ('id', 'user_id', 'message', 'type', 'is_read', 'created_at')
+
+
+def retention_settings(**overrides):
+    options = {**DEFAULTS, **getattr(settings, 'NOTIFICATION_RETENTION', {})}
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    return options
+
+
+@dataclass
+class PurgeResult:
+    purged: int = 0
+    archived: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self):
+        return self.purged / self.elapsed if self.elapsed else float(self.purged)
+
+
+def expired_notifications(read_days, unread_days, now=None):
+    now = now or timezone.now()
+    return Notification.objects.filter(
+        Q(is_read=True, created_at__lt=now - timedelta(days=read_days))
+        | Q(is_read=False, created_at__lt=now - timedelta(days=unread_days))
+    )
+
+
+def purge_notifications(read_days=None, unread_days=None, batch_size=None, pause=None,
+                        archive=None, now=None, progress=None):
+    options = retention_settings(READ_DAYS=read_days, UNREAD_DAYS=unread_days,
+                                 BATCH_SIZE=batch_size, PAUSE_SECONDS=pause, ARCHIVE=archive)
+    expired = expired_notifications(options['READ_DAYS'], options['UNREAD_DAYS'], now=now)
+    result = PurgeResult()
+    started = time.monotonic()
+    while True:
+        with transaction.atomic():
+            if options['ARCHIVE']:
+                rows = list(expired.order_by().values(*ARCHIVED_FIELDS)[:options['BATCH_SIZE']])
+                ids = [row['id'] for row in rows]
+                ArchivedNotification.objects.bulk_create(
+                    [ArchivedNotification(**row) for row in rows], ignore_conflicts=True
+                )
+                result.archived += len(rows)
+            else:
+                ids = list(expired.order_by().values_list('id', flat=True)[:options['BATCH_SIZE']])
+            if not ids:
+                break
+            deleted, _ = Notification.objects.filter(id__in=ids).delete()
+        result.purged += deleted
+        result.batches += 1
+        if progress:
+            progress(result)
+        if len(ids) < options['BATCH_SIZE']:
+            break
+        if options['PAUSE_SECONDS']:
+            time.sleep(options['PAUSE_SECONDS'])
+    result.elapsed = time.monotonic() - started
+    return result
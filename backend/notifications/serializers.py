@@ -1,7 +1,15 @@
 from rest_framework import serializers
+from farmfresh_backend.dynamic_fields import DynamicFieldsMixin
+from .broadcast import AUDIENCES, DEFAULT_CHUNK_SIZE
 from .models import Notification
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['id', 'user', 'message', 'type', 'is_read', 'created_at']
+
+class BroadcastSerializer(serializers.Serializer):
+    message = serializers.CharField()
+    type = serializers.CharField(max_length=50, default='announcement')
+    audience = serializers.ChoiceField(choices=sorted(AUDIENCES), default='all')
+    chunk_size = serializers.IntegerField(min_value=1, max_value=10000, default=DEFAULT_CHUNK_SIZE)
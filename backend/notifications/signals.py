@@ -0,0 +1,35 @@
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from orders.models import Order, OrderItem
+from .bus import publish_on_commit
+from .digest import OrderNotification, publish_notification
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    if created:
+        publish_notification(instance)
+
+
+@receiver(post_init, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    instance._pushed_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=Order)
+def push_order_status(sender, instance, created, **kwargs):
+    if created or instance.status == instance._pushed_status:
+        return
+    instance._pushed_status = instance.status
+    publish_on_commit(instance.user_id, 'order_status', {
+        'order': str(instance.id),
+        'status': instance.status,
+        'updated_at': instance.updated_at.isoformat(),
+    })
+
+
+@receiver(post_save, sender=OrderItem)
+def notify_seller_of_order(sender, instance, created, **kwargs):
+    if created and instance.product_id is not None:
+        OrderNotification.add(instance)
@@ -1,7 +1,13 @@
 from rest_framework.routers import DefaultRouter
-from .views import NotificationViewSet
+from django.urls import path
+from .views import BroadcastStatusView, BroadcastView, NotificationViewSet, StreamTicketView, notification_stream
 
 router = DefaultRouter()
 router.register(r'notifications', NotificationViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('stream/', notification_stream, name='notification-stream'),
+    path('stream/ticket/', StreamTicketView.as_view(), name='notification-stream-ticket'),
+    path('broadcast/', BroadcastView.as_view(), name='notification-broadcast'),
+    path('broadcast/<str:job_id>/', BroadcastStatusView.as_view(), name='notification-broadcast-status'),
+] + router.urls
@@ -1,7 +1,153 @@
-from rest_framework import viewsets
+import asyncio
+import json
+import secrets
+from contextlib import suppress
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from authentication.backends import CachedJWTAuthentication
+from farmfresh_backend.dynamic_fields import DynamicFieldsViewMixin
+from .broadcast import get_job, start_broadcast
+from .bus import get_bus
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import BroadcastSerializer, NotificationSerializer
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class NotificationViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationSerializer
+    pagination_class = NotificationPagination
+
+    def get_queryset(self):
+        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+
+    @action(detail=False, methods=['post'])
+    def mark_all_read(self, request):
+        # One UPDATE for the whole inbox, regardless of its size
+        updated = self.get_queryset().filter(is_read=False).update(is_read=True)
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'ids': ['A non-empty list of notification ids is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            updated = self.get_queryset().filter(id__in=ids, is_read=False).update(is_read=True)
+        except ValidationError:
+            return Response({'ids': ['One or more ids are not valid.']}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+class BroadcastView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = BroadcastSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job_id = start_broadcast(**serializer.validated_data)
+        return Response({'job': job_id, 'status': 'queued'}, status=status.HTTP_202_ACCEPTED)
+
+class BroadcastStatusView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        job = get_job(job_id)
+        if job is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
+
+
+def _stream_options():
+    return {'HEARTBEAT_SECONDS': 15, 'RETRY_MILLISECONDS': 3000, 'TICKET_SECONDS': 30,
+            **getattr(settings, 'NOTIFICATION_STREAM', {})}
+
+def _ticket_key(ticket):
+    return f'notifications:stream-ticket:{ticket}'
+
+class StreamTicketView(APIView):
+    """
+    EventSource cannot set headers, so browsers open the stream with
+    ``?ticket=``: a random, single-use value that expires after
+    ``TICKET_SECONDS``, rather than their bearer token, which would end up in
+    access logs. Tickets live in the default cache, which must be shared
+    between workers.
+    """
+
+    def post(self, request):
+        ticket = secrets.token_urlsafe(32)
+        timeout = _stream_options()['TICKET_SECONDS']
+        cache.set(_ticket_key(ticket), request.user.id, timeout)
+        return Response({'ticket': ticket, 'expires_in': timeout}, status=status.HTTP_201_CREATED)
+
+def _authenticate_stream(request):
+    """The id of the user opening the stream, from a ticket or the Authorization header."""
+    ticket = request.GET.get('ticket')
+    if ticket:
+        key = _ticket_key(ticket)
+        user_id = cache.get(key)
+        # Only the request that manages to delete the ticket may use it.
+        return user_id if user_id is not None and cache.delete(key) else None
+    auth = CachedJWTAuthentication()
+    try:
+        result = auth.authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0].id if result else None
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+async def _event_stream(channel, last_event_id):
+    options = _stream_options()
+    heartbeat = options['HEARTBEAT_SECONDS']
+    yield f"retry: {options['RETRY_MILLISECONDS']}\n\n"
+    events = get_bus().subscribe(channel, last_event_id)
+    pending = asyncio.ensure_future(anext(events))
+    try:
+        while True:
+            done, _ = await asyncio.wait({pending}, timeout=heartbeat)
+            if not done:
+                yield ': keepalive\n\n'
+                continue
+            item = pending.result()
+            pending = asyncio.ensure_future(anext(events))
+            yield f'id: {item.id}\nevent: {item.event}\ndata: {json.dumps(item.data, cls=JSONEncoder)}\n\n'
+    finally:
+        pending.cancel()
+        with suppress(asyncio.CancelledError, StopAsyncIteration):
+            await pending
+        await events.aclose()
+
+async def notification_stream(request):
+    """
+    Server-sent events feed of the user's new notifications and order status
+    changes. Needs to be served through ASGI; clients resume with Last-Event-ID.
+    """
+    user_id = await sync_to_async(_authenticate_stream)(request)
+    if user_id is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    response = StreamingHttpResponse(
+        _event_stream(user_id, _last_event_id(request)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,13 +1,20 @@
 from rest_framework import serializers
+from farmfresh_backend.dynamic_fields import DynamicFieldsMixin
 from .models import Order, OrderItem
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['id', 'order', 'product', 'product_name', 'product_price', 'quantity']
+        expandable_fields = {
+            'product': ('products.serializers.ProductSerializer', {}),
+        }
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     class Meta:
         model = Order
         fields = ['id', 'user', 'status', 'shipping_address', 'created_at', 'updated_at', 'items']
+        expandable_fields = {
+            'user': ('users.serializers.UserSerializer', {}),
+        }
@@ -1,11 +1,12 @@
 from rest_framework import viewsets
+from farmfresh_backend.dynamic_fields import DynamicFieldsViewMixin
 from .models import Order, OrderItem
 from .serializers import OrderSerializer, OrderItemSerializer
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
 
-class OrderItemViewSet(viewsets.ModelViewSet):
+class OrderItemViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-18 23:27
+
+import farmfresh_backend.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_hot_query_indexes'),
+    ]
+
+    # The default is applied by Django, not stored in the schema: only the
+    # migration state changes. Existing rows keep their version 4 keys.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='product',
+                    name='id',
+                    field=models.UUIDField(default=farmfresh_backend.ids.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+            database_operations=[],
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from users.models import SellerProfile
 import uuid
+from farmfresh_backend.ids import uuid7
 
 class Category(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -8,9 +9,10 @@ class Category(models.Model):
     description = models.TextField(blank=True)
 
 class Product(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    seller = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='products')
-    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # Lookups by seller or category are served by the composite indexes below.
+    seller = models.ForeignKey(SellerProfile, on_delete=models.CASCADE, related_name='products', db_index=False)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, db_index=False)
     name = models.CharField(max_length=255)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -20,3 +22,10 @@ class Product(models.Model):
     region = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Category pages sorted by price; a seller's catalog, newest first.
+            models.Index(fields=['category', 'price'], name='product_category_price_idx'),
+            models.Index(fields=['seller', '-created_at'], name='product_seller_created_idx'),
+        ]
@@ -1,12 +1,17 @@
 from rest_framework import serializers
+from farmfresh_backend.dynamic_fields import DynamicFieldsMixin
 from .models import Category, Product
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'description']
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'seller', 'category', 'name', 'description', 'price', 'quantity', 'image', 'certification', 'region', 'created_at', 'updated_at']
+        expandable_fields = {
+            'seller': ('users.serializers.SellerProfileSerializer', {}),
+            'category': (CategorySerializer, {}),
+        }
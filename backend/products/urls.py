@@ -1,8 +1,16 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, ProductViewSet
+from .views import (
+    CategoryViewSet, ProductViewSet,
+    async_category_list, async_product_detail, async_product_list,
+)
 
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet)
 router.register(r'products', ProductViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('async/categories/', async_category_list, name='category-list-async'),
+    path('async/products/', async_product_list, name='product-list-async'),
+    path('async/products/<uuid:pk>/', async_product_detail, name='product-detail-async'),
+] + router.urls
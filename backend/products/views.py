@@ -1,11 +1,47 @@
+from django.views.decorators.http import require_safe
 from rest_framework import viewsets
+from farmfresh_backend import async_views
+from farmfresh_backend.dynamic_fields import DynamicFieldsViewMixin
 from .models import Category, Product
 from .serializers import CategorySerializer, ProductSerializer
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    throttle_scope = 'products'
+
+
+# Async read-only counterparts of the list/retrieve actions above, for ASGI.
+
+@require_safe
+async def async_category_list(request):
+    if await async_views.authenticate(request) is None:
+        return async_views.not_authenticated(request)
+    if throttled := await async_views.throttle(request):
+        return throttled
+    data = await async_views.serialize_list(request, CategorySerializer, Category.objects.all())
+    return async_views.api_response(request, data)
+
+@require_safe
+async def async_product_list(request):
+    if await async_views.authenticate(request) is None:
+        return async_views.not_authenticated(request)
+    if throttled := await async_views.throttle(request, ProductViewSet.throttle_scope):
+        return throttled
+    data = await async_views.serialize_list(request, ProductSerializer, Product.objects.all())
+    return async_views.api_response(request, data)
+
+@require_safe
+async def async_product_detail(request, pk):
+    if await async_views.authenticate(request) is None:
+        return async_views.not_authenticated(request)
+    if throttled := await async_views.throttle(request, ProductViewSet.throttle_scope):
+        return throttled
+    data = await async_views.serialize_object(request, ProductSerializer, Product.objects.filter(pk=pk))
+    if data is None:
+        return async_views.not_found(request)
+    return async_views.api_response(request, data)
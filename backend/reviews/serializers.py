@@ -1,7 +1,11 @@
 from rest_framework import serializers
+from farmfresh_backend.dynamic_fields import DynamicFieldsMixin
 from .models import Review
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ['id', 'product', 'user', 'rating', 'comment', 'created_at']
+        expandable_fields = {
+            'product': ('products.serializers.ProductSerializer', {}),
+        }
@@ -1,7 +1,8 @@
 from rest_framework import viewsets
+from farmfresh_backend.dynamic_fields import DynamicFieldsViewMixin
 from .models import Review
 from .serializers import ReviewSerializer
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
@@ -0,0 +1,8 @@
+import pytest
+from django.core.cache import cache
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    # Throttle counters live in the default cache; don't let one test's
+    # requests count against the next.
+    cache.clear()
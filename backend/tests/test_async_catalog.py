@@ -0,0 +1,85 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from products.models import Category, Product
+from users.models import SellerProfile, User
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear()
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+
+@pytest.fixture
+def catalog():
+    seller_user = User.objects.create_user(username='farmer', password='testpassword', is_seller=True)
+    seller = SellerProfile.objects.create(user=seller_user, farm_name='Green Acres', region='Pune')
+    category = Category.objects.create(name='Fruit')
+    products = [
+        Product.objects.create(seller=seller, category=category, name=f'Mango {i}', description='', price='5.50', quantity=i)
+        for i in range(3)
+    ]
+    return seller, category, products
+
+def _get(path, user=None):
+    headers = {}
+    if user is not None:
+        headers['Authorization'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+    return async_to_sync(AsyncClient().get)(path, headers=headers)
+
+@pytest.mark.django_db
+class TestAsyncCatalog:
+
+    def test_product_list_matches_sync_endpoint(self, user, catalog):
+        response = _get('/api/v1/products/async/products/', user)
+        assert response.status_code == 200
+        sync_client = APIClient()
+        sync_client.force_authenticate(user=user)
+        expected = sync_client.get('/api/v1/products/products/').content
+        assert sorted(json.loads(response.content), key=lambda p: p['id']) == \
+            sorted(json.loads(expected), key=lambda p: p['id'])
+
+    def test_requires_authentication(self, catalog):
+        assert _get('/api/v1/products/async/products/').status_code == 401
+        assert _get('/api/v1/products/async/categories/').status_code == 401
+
+    def test_product_detail_with_expansion(self, user, catalog):
+        seller, category, products = catalog
+        response = _get(f'/api/v1/products/async/products/{products[0].id}/?expand=seller,category', user)
+        assert response.status_code == 200
+        data = json.loads(response.content)
+        assert data['seller']['farm_name'] == 'Green Acres'
+        assert data['seller']['user']['username'] == 'farmer'
+        assert data['category']['name'] == 'Fruit'
+
+    def test_product_detail_not_found(self, user, catalog):
+        seller, category, products = catalog
+        response = _get(f'/api/v1/products/async/products/{category.id}/', user)
+        assert response.status_code == 404
+
+    def test_category_list_sparse_fields(self, user, catalog):
+        response = _get('/api/v1/products/async/categories/?fields=name', user)
+        assert json.loads(response.content) == [{'name': 'Fruit'}]
+
+    def test_seller_directory_is_cached(self, catalog):
+        first = _get('/api/v1/users/async/directory/')
+        assert json.loads(first.content)[0]['product_count'] == 3
+        Product.objects.all().update(name='Renamed')  # queryset update: no signal
+        assert _get('/api/v1/users/async/directory/').content == first.content
+
+    def test_middleware_instruments_async_requests(self, user, catalog):
+        response = _get('/api/v1/products/async/products/', user)
+        assert 'queries"' in response['Server-Timing']
+        assert 'desc="0 queries"' not in response['Server-Timing']
+
+    def test_only_safe_methods(self, user):
+        response = async_to_sync(AsyncClient().post)('/api/v1/products/async/products/')
+        assert response.status_code == 405
@@ -0,0 +1,55 @@
+import csv
+
+import pytest
+from django.core.management import call_command
+
+from users.bulk_import import import_rows
+from users.models import SellerProfile, User
+
+@pytest.fixture(autouse=True)
+def fast_hasher(settings):
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+def rows(count, start=0):
+    return [
+        {
+            'username': f'farmer{i}',
+            'email': f'farmer{i}@example.com',
+            'password': f'secret-{i}',
+            'is_seller': 'yes' if i % 2 == 0 else 'no',
+            'farm_name': f'Farm {i}',
+            'region': 'Pune',
+        }
+        for i in range(start, start + count)
+    ]
+
+@pytest.mark.django_db
+class TestBulkImport:
+
+    def test_creates_users_and_seller_profiles_in_batches(self):
+        batches = []
+        result = import_rows(rows(25), batch_size=10, workers=2, progress=lambda r: batches.append(r.created))
+        assert result.created == 25
+        assert result.sellers == 13
+        assert batches == [10, 20, 25]
+        user = User.objects.get(username='farmer3')
+        assert user.check_password('secret-3')
+        assert not user.is_seller
+        assert SellerProfile.objects.get(user__username='farmer4').farm_name == 'Farm 4'
+
+    def test_existing_and_duplicate_usernames_are_skipped(self):
+        User.objects.create_user(username='farmer0', password='old')
+        result = import_rows(rows(3) + rows(1, start=1), workers=1)
+        assert result.created == 2
+        assert result.skipped == 2
+        assert User.objects.get(username='farmer0').check_password('old')
+
+    def test_command_reads_csv(self, tmp_path, capsys):
+        path = tmp_path / 'village.csv'
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows(1)[0]))
+            writer.writeheader()
+            writer.writerows(rows(4))
+        call_command('import_users', str(path), '--workers', '1')
+        assert 'Imported 4 users (2 sellers), skipped 0' in capsys.readouterr().out
+        assert User.objects.count() == 4
@@ -1,241 +1,228 @@
-import json
+import threading
+from decimal import Decimal
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-# Import your models here
-# from users.models import User
-# from products.models import Product
+from cart.models import MAX_LINE_QUANTITY, CartItem
+from cart.upsert import add_to_cart
+from products.models import Product
+from users.models import SellerProfile, User
 
 @pytest.fixture
 def api_client():
     return APIClient()
 
 @pytest.fixture
-def authenticated_client(api_client):
-    # Create a test user and authenticate
-    # user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
-    # api_client.force_authenticate(user=user)
-    # For now, we'll just return the unauthenticated client
-    # This should be updated once we have access to the User model
+def user():
+    return User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+
+@pytest.fixture
+def authenticated_client(api_client, user):
+    api_client.force_authenticate(user=user)
     return api_client
 
+@pytest.fixture
+def seller():
+    farmer = User.objects.create_user(username='farmer', password='testpassword', is_seller=True)
+    return SellerProfile.objects.create(user=farmer, farm_name='Green Acres')
+
+@pytest.fixture
+def product(seller):
+    return Product.objects.create(seller=seller, name='Test Product', description='', price='9.99', quantity=10)
+
+@pytest.fixture
+def product2(seller):
+    return Product.objects.create(seller=seller, name='Other Product', description='', price='2.50', quantity=10)
+
+def _add(client, product, quantity=1):
+    return client.post(reverse('cart-add'), {'product_id': str(product.id), 'quantity': quantity}, format='json')
+
 @pytest.mark.django_db
 class TestCartAPI:
-    
-    def test_get_cart_items_authenticated(self, authenticated_client):
-        # Test getting cart items when authenticated
-        # url = reverse('cart-list')
-        # response = authenticated_client.get(url)
-        # assert response.status_code == status.HTTP_200_OK
-        # assert isinstance(response.data, list)
-        pass
-    
+
+    def test_get_cart_items_authenticated(self, authenticated_client, product, product2):
+        _add(authenticated_client, product, 2)
+        _add(authenticated_client, product2, 1)
+        response = authenticated_client.get(reverse('cart-list'))
+        assert response.status_code == status.HTTP_200_OK
+        lines = response.data['lines']
+        assert [line['product']['name'] for line in lines] == ['Test Product', 'Other Product']
+        assert lines[0]['line_total'] == '19.98'
+        assert response.data['totals'] == {'lines': 2, 'count': 3, 'total': '22.48'}
+
     def test_get_cart_items_unauthenticated(self, api_client):
-        # Test getting cart items when not authenticated
-        # url = reverse('cart-list')
-        # response = api_client.get(url)
-        # assert response.status_code == status.HTTP_401_UNAUTHORIZED
-        pass
-    
-    def test_add_to_cart_authenticated(self, authenticated_client):
-        # Test adding an item to the cart when authenticated
-        # First create a test product
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # url = reverse('cart-add')
-        # data = {
-        #     'product_id': product.id,
-        #     'quantity': 1
-        # }
-        # response = authenticated_client.post(url, data, format='json')
-        # assert response.status_code == status.HTTP_201_CREATED
-        # assert response.data['product_id'] == str(product.id)
-        # assert response.data['quantity'] == 1
-        pass
-    
-    def test_add_to_cart_unauthenticated(self, api_client):
-        # Test adding an item to the cart when not authenticated
-        # url = reverse('cart-add')
-        # data = {
-        #     'product_id': 'some-id',
-        #     'quantity': 1
-        # }
-        # response = api_client.post(url, data, format='json')
-        # assert response.status_code == status.HTTP_401_UNAUTHORIZED
-        pass
-    
-    def test_update_cart_item_quantity(self, authenticated_client):
-        # Test updating the quantity of a cart item
-        # First create a test product and add it to the cart
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to cart
-        # add_url = reverse('cart-add')
-        # add_data = {
-        #     'product_id': product.id,
-        #     'quantity': 1
-        # }
-        # authenticated_client.post(add_url, add_data, format='json')
-        # 
-        # # Update quantity
-        # update_url = reverse('cart-update')
-        # update_data = {
-        #     'product_id': product.id,
-        #     'quantity': 3
-        # }
-        # response = authenticated_client.put(update_url, update_data, format='json')
-        # assert response.status_code == status.HTTP_200_OK
-        # assert response.data['quantity'] == 3
-        pass
-    
-    def test_remove_from_cart(self, authenticated_client):
-        # Test removing an item from the cart
-        # First create a test product and add it to the cart
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to cart
-        # add_url = reverse('cart-add')
-        # add_data = {
-        #     'product_id': product.id,
-        #     'quantity': 1
-        # }
-        # authenticated_client.post(add_url, add_data, format='json')
-        # 
-        # # Remove from cart
-        # remove_url = reverse('cart-remove', args=[product.id])
-        # response = authenticated_client.delete(remove_url)
-        # assert response.status_code == status.HTTP_204_NO_CONTENT
-        # 
-        # # Verify it's gone
-        # list_url = reverse('cart-list')
-        # list_response = authenticated_client.get(list_url)
-        # assert len(list_response.data) == 0
-        pass
-    
-    def test_clear_cart(self, authenticated_client):
-        # Test clearing the entire cart
-        # First create test products and add them to the cart
-        # product1 = Product.objects.create(
-        #     name='Test Product 1',
-        #     price=9.99,
-        #     description='Test description 1',
-        #     category='test',
-        #     image='test1.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # product2 = Product.objects.create(
-        #     name='Test Product 2',
-        #     price=19.99,
-        #     description='Test description 2',
-        #     category='test',
-        #     image='test2.jpg',
-        #     is_organic=True,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to cart
-        # add_url = reverse('cart-add')
-        # authenticated_client.post(add_url, {'product_id': product1.id, 'quantity': 1}, format='json')
-        # authenticated_client.post(add_url, {'product_id': product2.id, 'quantity': 2}, format='json')
-        # 
-        # # Clear cart
-        # clear_url = reverse('cart-clear')
-        # response = authenticated_client.delete(clear_url)
-        # assert response.status_code == status.HTTP_204_NO_CONTENT
-        # 
-        # # Verify it's empty
-        # list_url = reverse('cart-list')
-        # list_response = authenticated_client.get(list_url)
-        # assert len(list_response.data) == 0
-        pass
-    
-    def test_add_existing_product_increases_quantity(self, authenticated_client):
-        # Test that adding a product that's already in the cart increases its quantity
-        # First create a test product
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to cart first time
-        # add_url = reverse('cart-add')
-        # add_data = {
-        #     'product_id': product.id,
-        #     'quantity': 1
-        # }
-        # authenticated_client.post(add_url, add_data, format='json')
-        # 
-        # # Add same product again
-        # response = authenticated_client.post(add_url, add_data, format='json')
-        # assert response.status_code == status.HTTP_200_OK
-        # assert response.data['quantity'] == 2  # Quantity should be increased
-        pass
-    
-    def test_update_quantity_to_zero_removes_item(self, authenticated_client):
-        # Test that updating quantity to zero removes the item from the cart
-        # First create a test product and add it to the cart
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to cart
-        # add_url = reverse('cart-add')
-        # add_data = {
-        #     'product_id': product.id,
-        #     'quantity': 1
-        # }
-        # authenticated_client.post(add_url, add_data, format='json')
-        # 
-        # # Update quantity to zero
-        # update_url = reverse('cart-update')
-        # update_data = {
-        #     'product_id': product.id,
-        #     'quantity': 0
-        # }
-        # response = authenticated_client.put(update_url, update_data, format='json')
-        # assert response.status_code == status.HTTP_204_NO_CONTENT
-        # 
-        # # Verify it's gone
-        # list_url = reverse('cart-list')
-        # list_response = authenticated_client.get(list_url)
-        # assert len(list_response.data) == 0
-        pass
\ No newline at end of file
+        response = api_client.get(reverse('cart-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_add_to_cart_authenticated(self, authenticated_client, product):
+        response = _add(authenticated_client, product)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['product_id'] == str(product.id)
+        assert response.data['quantity'] == 1
+        assert response.data['id'] == str(CartItem.objects.get().id)
+
+    def test_add_to_cart_unauthenticated(self, api_client, product):
+        response = _add(api_client, product)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_update_cart_item_quantity(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = authenticated_client.put(
+            reverse('cart-update'), {'product_id': str(product.id), 'quantity': 3}, format='json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['quantity'] == 3
+        assert CartItem.objects.get().quantity == 3
+
+    def test_update_existing_line_returns_stored_id(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        for method in (authenticated_client.put, authenticated_client.patch):
+            response = method(reverse('cart-update'), {'product_id': str(product.id), 'quantity': 4}, format='json')
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data['id'] == str(CartItem.objects.get(product=product).id)
+            assert response.data['product']['name'] == 'Test Product'
+
+    def test_remove_from_cart(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = authenticated_client.delete(reverse('cart-remove', args=[product.id]))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert authenticated_client.get(reverse('cart-list')).data['lines'] == []
+        response = authenticated_client.delete(reverse('cart-remove', args=[product.id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_clear_cart(self, authenticated_client, product, product2):
+        _add(authenticated_client, product, 1)
+        _add(authenticated_client, product2, 2)
+        response = authenticated_client.delete(reverse('cart-clear'))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert authenticated_client.get(reverse('cart-list')).data['lines'] == []
+
+    def test_add_existing_product_increases_quantity(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = _add(authenticated_client, product)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['quantity'] == 2  # Quantity should be increased
+        assert CartItem.objects.count() == 1
+
+    def test_update_quantity_to_zero_removes_item(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = authenticated_client.put(
+            reverse('cart-update'), {'product_id': str(product.id), 'quantity': 0}, format='json'
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert authenticated_client.get(reverse('cart-list')).data['lines'] == []
+
+    def test_invalid_input_is_rejected(self, authenticated_client, product):
+        url = reverse('cart-add')
+        for data in (
+            {'product_id': 'invalid-id', 'quantity': 1},
+            {'product_id': str(product.id), 'quantity': 0},
+            {'product_id': str(product.id), 'quantity': 'many'},
+            {'product_id': str(product.id), 'quantity': 10 ** 10},
+            {'product_id': str(product.id), 'quantity': 10 ** 19},
+            {'quantity': 1},
+        ):
+            assert authenticated_client.post(url, data, format='json').status_code == status.HTTP_400_BAD_REQUEST
+        product.quantity = 0
+        product.save()
+        response = _add(authenticated_client, product)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'Product is not available.' in response.data['product_id']
+
+    def test_quantity_is_capped(self, authenticated_client, product):
+        response = authenticated_client.put(
+            reverse('cart-update'), {'product_id': str(product.id), 'quantity': MAX_LINE_QUANTITY + 1}, format='json'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        _add(authenticated_client, product, MAX_LINE_QUANTITY)
+        response = _add(authenticated_client, product, MAX_LINE_QUANTITY)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['quantity'] == MAX_LINE_QUANTITY
+        assert authenticated_client.get(reverse('cart-list')).status_code == status.HTTP_200_OK
+        assert authenticated_client.get(reverse('cart-total')).data['count'] == MAX_LINE_QUANTITY
+
+    def test_line_count_is_capped(self, authenticated_client, product, product2, monkeypatch):
+        monkeypatch.setattr('cart.views.MAX_CHECKOUT_LINES', 1)
+        _add(authenticated_client, product)
+        response = _add(authenticated_client, product2)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'detail': 'Cart is full.'}
+        response = authenticated_client.put(
+            reverse('cart-update'), {'product_id': str(product2.id), 'quantity': 2}, format='json'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert _add(authenticated_client, product).status_code == status.HTTP_200_OK
+        assert list(CartItem.objects.values_list('product_id', 'quantity')) == [(product.id, 2)]
+
+    def test_cart_isolation_between_users(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username='other', password='testpassword'))
+        assert other.get(reverse('cart-list')).data == {'lines': [], 'totals': {'lines': 0, 'count': 0, 'total': '0.00'}}
+        assert other.delete(reverse('cart-remove', args=[product.id])).status_code == status.HTTP_404_NOT_FOUND
+        assert CartItem.objects.count() == 1
+
+    def test_total(self, authenticated_client, product, product2):
+        _add(authenticated_client, product, 3)
+        _add(authenticated_client, product2, 2)
+        response = authenticated_client.get(reverse('cart-total'))
+        assert response.data == {'lines': 2, 'count': 5, 'total': '34.97'}
+
+@pytest.mark.django_db
+class TestCartQueries:
+
+    def test_add_is_a_single_upsert(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        with CaptureQueriesContext(connection) as ctx:
+            _add(authenticated_client, product, 4)
+        writes = [q['sql'] for q in ctx.captured_queries if not q['sql'].startswith('SELECT')]
+        assert len(writes) == 1
+        assert 'ON CONFLICT' in writes[0]
+        assert CartItem.objects.get().quantity == 5
+
+    def test_list_is_one_query(self, authenticated_client, user, seller):
+        products = Product.objects.bulk_create(
+            [Product(seller=seller, name=f'p{i}', description='', price='1.00', quantity=5) for i in range(30)]
+        )
+        add_to_cart(user.id, {p.id: 1 for p in products})
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(reverse('cart-list'))
+        assert len(response.data['lines']) == 30
+        assert response.data['totals']['count'] == 30
+        assert len(ctx.captured_queries) == 1
+
+    def test_add_to_cart_creates_and_increments_in_bulk(self, user, product, product2):
+        add_to_cart(user.id, {product.id: 2})
+        result = add_to_cart(user.id, {product.id: 1, str(product2.id): 4})
+        assert result[product.id][0].quantity == 3
+        assert result[product.id][1] is False
+        assert result[product2.id][0].quantity == 4
+        assert result[product2.id][1] is True
+        assert result[product2.id][0].id == CartItem.objects.get(product=product2).id
+        result = add_to_cart(user.id, {product.id: 10 ** 19})
+        assert result[product.id][0].quantity == MAX_LINE_QUANTITY
+        assert result[product.id][1] is False
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_adds_are_not_lost(user, product):
+    barrier = threading.Barrier(4)
+
+    def add():
+        barrier.wait()
+        for _ in range(5):
+            add_to_cart(user.id, {product.id: 1})
+        connection.close()
+
+    threads = [threading.Thread(target=add) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    item = CartItem.objects.get(user=user, product=product)
+    assert item.quantity == 20
+    assert item.line_total == Decimal('199.80')
@@ -0,0 +1,126 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cart.models import CartItem
+from cart.upsert import add_to_cart
+from products.models import Product
+from users.models import SellerProfile, User
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='buyer', password='testpassword')
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+@pytest.fixture
+def products():
+    farmer = User.objects.create_user(username='farmer', password='testpassword', is_seller=True)
+    seller = SellerProfile.objects.create(user=farmer, farm_name='Green Acres')
+    return Product.objects.bulk_create(
+        [Product(seller=seller, name=f'p{i}', description='', price='2.00', quantity=10) for i in range(3)]
+    )
+
+def _preview(client, lines=None):
+    if lines is None:
+        return client.get(reverse('cart-checkout-preview'))
+    return client.post(reverse('cart-checkout-preview'), {'lines': lines}, format='json')
+
+@pytest.mark.django_db
+class TestCheckoutPreview:
+
+    def test_clean_cart(self, client, user, products):
+        add_to_cart(user.id, {products[0].id: 2, products[1].id: 1})
+        response = _preview(client)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['ok'] is True
+        assert response.data['count'] == 3
+        assert response.data['total'] == '6.00'
+        assert [line['issues'] for line in response.data['lines']] == [[], []]
+
+    def test_server_cart_reports_price_and_stock_changes(self, client, user, products):
+        add_to_cart(user.id, {products[0].id: 2, products[1].id: 5})
+        Product.objects.filter(id=products[0].id).update(price='2.50')
+        Product.objects.filter(id=products[1].id).update(quantity=3)
+        response = _preview(client)
+        first, second = response.data['lines']
+        assert first['issues'] == ['price_changed']
+        assert (first['unit_price'], first['price'], first['line_total']) == ('2.00', '2.50', '5.00')
+        assert second['issues'] == ['insufficient_stock']
+        assert second['available'] == 3
+        assert response.data['ok'] is False
+        assert response.data['total'] == '15.00'
+
+    def test_re_adding_refreshes_the_seen_price(self, client, user, products):
+        add_to_cart(user.id, {products[0].id: 1})
+        Product.objects.filter(id=products[0].id).update(price='3.00')
+        add_to_cart(user.id, {products[0].id: 1})
+        assert CartItem.objects.get().unit_price == 3
+        assert _preview(client).data['ok'] is True
+
+    def test_client_lines_with_removed_product(self, client, products):
+        gone = str(uuid.uuid4())
+        response = _preview(client, [
+            {'product_id': str(products[0].id), 'quantity': 1, 'price': '1.50'},
+            {'product_id': str(products[1].id), 'quantity': 11},
+            {'product_id': gone, 'quantity': 1, 'price': '4.00'},
+        ])
+        assert response.status_code == status.HTTP_200_OK
+        issues = {line['product_id']: line['issues'] for line in response.data['lines']}
+        assert issues == {
+            str(products[0].id): ['price_changed'],
+            str(products[1].id): ['insufficient_stock'],
+            gone: ['product_removed'],
+        }
+        removed = response.data['lines'][2]
+        assert removed['price'] is None
+        assert removed['line_total'] == '0.00'
+        assert response.data['count'] == 12
+        assert response.data['total'] == '24.00'
+
+    def test_deleted_product_leaves_the_server_cart(self, client, user, products):
+        add_to_cart(user.id, {products[0].id: 1, products[1].id: 1})
+        Product.objects.filter(id=products[1].id).delete()
+        assert list(CartItem.objects.values_list('product_id', flat=True)) == [products[0].id]
+        response = _preview(client)
+        assert [line['product_id'] for line in response.data['lines']] == [str(products[0].id)]
+        assert response.data['ok'] is True
+        assert response.data['total'] == '2.00'
+        cart = client.get(reverse('cart-list')).data
+        assert [line['product_id'] for line in cart['lines']] == [str(products[0].id)]
+        assert cart['totals']['total'] == '2.00'
+
+    def test_duplicate_lines_share_the_stock(self, client, products):
+        line = {'product_id': str(products[0].id), 'quantity': 6}
+        response = _preview(client, [line, line])
+        assert [line['issues'] for line in response.data['lines']] == [['insufficient_stock']] * 2
+        assert response.data['count'] == 12
+
+    def test_products_are_checked_in_one_query(self, client, products):
+        lines = [{'product_id': str(p.id), 'quantity': 1, 'price': '2.00'} for p in products]
+        lines += [{'product_id': str(uuid.uuid4()), 'quantity': 1} for _ in range(20)]
+        with CaptureQueriesContext(connection) as ctx:
+            _preview(client, lines)
+        assert len(ctx.captured_queries) == 1
+        assert ' IN (' in ctx.captured_queries[0]['sql']
+
+    def test_empty_cart_is_not_ok(self, client):
+        response = _preview(client)
+        assert response.data == {'lines': [], 'count': 0, 'total': '0.00', 'ok': False}
+
+    def test_invalid_lines(self, client, products):
+        product_id = str(products[0].id)
+        for lines in (
+            [], [{'product_id': 'x', 'quantity': 1}],
+            [{'product_id': product_id, 'quantity': 0}], [{'product_id': product_id, 'quantity': 10 ** 19}],
+        ):
+            assert _preview(client, lines).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import SellerProfile, User
+from products.models import Category, Product
+from orders.models import Order, OrderItem
+
+PRODUCTS_URL = '/api/v1/products/products/'
+ORDERS_URL = '/api/v1/orders/orders/'
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='farmer', password='testpassword')
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+@pytest.fixture
+def products(user):
+    seller = SellerProfile.objects.create(user=user, farm_name='Green Acres', region='Pune')
+    category = Category.objects.create(name='Fruit')
+    return [
+        Product.objects.create(seller=seller, category=category, name=f'Mango {i}',
+                               description='Long description ' * 50, price='5.00', quantity=10)
+        for i in range(5)
+    ]
+
+def product_select(ctx):
+    return next(q['sql'] for q in ctx.captured_queries if 'FROM "products_product"' in q['sql'])
+
+@pytest.mark.django_db
+class TestDynamicFields:
+
+    def test_fields_limits_payload_and_columns(self, client, products):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(PRODUCTS_URL, {'fields': 'id,name,price,image'})
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data[0]) == {'id', 'name', 'price', 'image'}
+        assert '"description"' not in product_select(ctx)
+
+    def test_full_payload_by_default(self, client, products):
+        response = client.get(PRODUCTS_URL)
+        assert 'description' in response.data[0]
+        assert response.data[0]['seller'] == products[0].seller_id
+
+    def test_expand_nests_and_joins_in_one_query(self, client, products):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(PRODUCTS_URL, {'expand': 'seller,category', 'fields': 'id,seller,category'})
+        assert response.data[0]['seller']['farm_name'] == 'Green Acres'
+        assert response.data[0]['seller']['user']['username'] == 'farmer'
+        assert response.data[0]['category']['name'] == 'Fruit'
+        assert len([q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]) == 1
+
+    def test_nested_order_items_are_prefetched(self, client, user, products):
+        for _ in range(3):
+            order = Order.objects.create(user=user, shipping_address='Farm road')
+            OrderItem.objects.create(order=order, product=products[0], product_name='Mango', product_price='5.00', quantity=1)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(ORDERS_URL)
+        assert len(response.data) == 3
+        assert len([q for q in ctx.captured_queries if 'FROM "orders_orderitem"' in q['sql']]) == 1
+
+    def test_fields_are_ignored_on_writes(self, client, products):
+        response = client.patch(f'{PRODUCTS_URL}{products[0].id}/?fields=id', {'name': 'Alphonso'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['name'] == 'Alphonso'
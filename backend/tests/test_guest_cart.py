@@ -0,0 +1,162 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cart.guest import guest_lines, guest_session, merge_guest_cart, save_guest_lines
+from cart.models import MAX_LINE_QUANTITY, CartItem
+from cart.upsert import add_to_cart
+from products.models import Product
+from users.models import SellerProfile, User
+
+TOKEN_URL = '/api/v1/auth/token/'
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='buyer', password='testpassword')
+
+@pytest.fixture
+def products():
+    farmer = User.objects.create_user(username='farmer', password='testpassword', is_seller=True)
+    seller = SellerProfile.objects.create(user=farmer, farm_name='Green Acres')
+    return Product.objects.bulk_create(
+        [Product(seller=seller, name=f'p{i}', description='', price='2.00', quantity=10) for i in range(30)]
+    )
+
+def _add(client, product, quantity=1, token=None):
+    headers = {'X-Guest-Cart': token} if token else {}
+    return client.post(
+        reverse('cart-guest'), {'product_id': str(product.id), 'quantity': quantity}, format='json', headers=headers,
+    )
+
+def _guest_cart(products, quantity=1):
+    return save_guest_lines(guest_session(None), {str(product.id): quantity for product in products})
+
+@pytest.mark.django_db
+class TestGuestCart:
+
+    def test_add_issues_a_token_and_keeps_the_cart(self, products):
+        client = APIClient()
+        response = _add(client, products[0], 2)
+        assert response.status_code == status.HTTP_201_CREATED
+        token = response.data['token']
+        assert response['X-Guest-Cart'] == token
+        response = _add(client, products[0], 1, token)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['token'] == token
+        response = client.get(reverse('cart-guest'), headers={'X-Guest-Cart': token})
+        assert [(line['product_id'], line['quantity']) for line in response.data['lines']] == [(str(products[0].id), 3)]
+        assert response.data['lines'][0]['line_total'] == '6.00'
+
+    def test_update_and_clear(self, products):
+        client = APIClient()
+        token = _add(client, products[0]).data['token']
+        _add(client, products[1], 1, token)
+        headers = {'X-Guest-Cart': token}
+        url = reverse('cart-guest')
+        response = client.put(url, {'product_id': str(products[0].id), 'quantity': 0}, format='json', headers=headers)
+        assert [line['product_id'] for line in response.data['lines']] == [str(products[1].id)]
+        assert client.delete(url, headers=headers).status_code == status.HTTP_204_NO_CONTENT
+        assert client.get(url, headers=headers).data == {'token': None, 'lines': []}
+
+    def test_unknown_token_starts_a_new_cart(self, products):
+        response = _add(APIClient(), products[0], 1, 'not-a-real-session-key')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['token'] != 'not-a-real-session-key'
+
+    def test_merge_adds_to_existing_lines(self, user, products):
+        add_to_cart(user.id, {products[0].id: 2})
+        token = _guest_cart(products[:3])
+        Product.objects.filter(id=products[2].id).delete()
+        assert merge_guest_cart(user.id, token) == 2
+        quantities = dict(CartItem.objects.filter(user=user).values_list('product_id', 'quantity'))
+        assert quantities == {products[0].id: 3, products[1].id: 1}
+        assert guest_lines(guest_session(token)) == {}
+
+    def test_guest_cart_is_capped(self, products, monkeypatch):
+        monkeypatch.setattr('cart.views.MAX_CHECKOUT_LINES', 1)
+        client = APIClient()
+        token = _add(client, products[0]).data['token']
+        response = _add(client, products[1], 1, token)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'detail': 'Cart is full.'}
+        response = client.put(
+            reverse('cart-guest'), {'product_id': str(products[1].id), 'quantity': 1}, format='json',
+            headers={'X-Guest-Cart': token},
+        )
+        assert response.data == {'detail': 'Cart is full.'}
+
+    def test_merge_skips_sold_out_products(self, user, products):
+        token = _guest_cart(products[:2])
+        Product.objects.filter(id=products[1].id).update(quantity=0)
+        assert merge_guest_cart(user.id, token) == 1
+        assert list(CartItem.objects.filter(user=user).values_list('product_id', flat=True)) == [products[0].id]
+
+    def test_merge_respects_the_line_cap(self, user, products, monkeypatch):
+        monkeypatch.setattr('cart.guest.MAX_CHECKOUT_LINES', 3)
+        add_to_cart(user.id, {products[0].id: 1, products[1].id: 1})
+        token = _guest_cart(products[:4])
+        assert merge_guest_cart(user.id, token) == 3
+        quantities = dict(CartItem.objects.filter(user=user).values_list('product_id', 'quantity'))
+        assert quantities == {products[0].id: 2, products[1].id: 2, products[2].id: 1}
+
+    def test_login_merges_in_constant_queries(self, user, products):
+        client = APIClient()
+        small, large = _guest_cart(products[:1]), _guest_cart(products)
+        counts = []
+        for token in (small, large):
+            CartItem.objects.all().delete()
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.post(
+                    TOKEN_URL, {'username': 'buyer', 'password': 'testpassword'}, format='json',
+                    headers={'X-Guest-Cart': token},
+                )
+            assert response.status_code == status.HTTP_200_OK
+            counts.append(len(ctx.captured_queries))
+        assert counts[0] == counts[1]
+        assert CartItem.objects.filter(user=user).count() == 30
+
+    def test_failed_login_keeps_the_guest_cart(self, user, products):
+        token = _guest_cart(products[:2])
+        response = APIClient().post(
+            TOKEN_URL, {'username': 'buyer', 'password': 'wrong'}, format='json', headers={'X-Guest-Cart': token},
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert len(guest_lines(guest_session(token))) == 2
+        assert not CartItem.objects.exists()
+
+    def test_quantities_are_bounded(self, products):
+        client = APIClient()
+        response = _add(client, products[0], 10 ** 19)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        token = _add(client, products[0], MAX_LINE_QUANTITY).data['token']
+        response = _add(client, products[0], 5, token)
+        assert response.data['lines'][0]['quantity'] == MAX_LINE_QUANTITY
+
+    def test_tampered_session_is_sanitised(self, user, products):
+        session = guest_session(None)
+        session['cart'] = {str(products[0].id): 10 ** 19, str(products[1].id): -3, 'nope': 1, str(products[2].id): '2'}
+        session.save()
+        token = session.session_key
+        response = APIClient().get(reverse('cart-guest'), headers={'X-Guest-Cart': token})
+        assert response.status_code == status.HTTP_200_OK
+        assert [(line['product_id'], line['quantity']) for line in response.data['lines']] == [
+            (str(products[0].id), MAX_LINE_QUANTITY),
+        ]
+        assert merge_guest_cart(user.id, token) == 1
+        assert CartItem.objects.get(user=user).quantity == MAX_LINE_QUANTITY
+
+    def test_login_survives_a_failed_merge(self, user, products):
+        token = _guest_cart(products[:2])
+        with mock.patch('authentication.views.merge_guest_cart', side_effect=RuntimeError):
+            response = APIClient().post(
+                TOKEN_URL, {'username': 'buyer', 'password': 'testpassword'}, format='json',
+                headers={'X-Guest-Cart': token},
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['access']
+        assert len(guest_lines(guest_session(token))) == 2
@@ -0,0 +1,59 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from farmfresh_backend.instrumentation import fingerprint
+from farmfresh_backend.query_audit import analyse, audit, hot_queries, logged_queries
+
+def _log_line(*sqls):
+    record = {'event': 'slow_request', 'view': 'product-list', 'path': '/api/v1/products/products/',
+              'top_sql': [{'sql': fingerprint(sql), 'count': 3} for sql in sqls]}
+    return 'WARNING farmfresh.requests ' + json.dumps(record)
+
+def test_analyse_sqlite_and_postgres_plans():
+    assert analyse('2 0 0 SCAN orders_order\n10 0 0 USE TEMP B-TREE FOR ORDER BY', 'sqlite') == (['orders_order'], True)
+    assert analyse('3 0 0 SEARCH orders_order USING INDEX order_user_created_idx (user_id=?)', 'sqlite') == ([], False)
+    plan = 'Sort  (cost=1.01..1.02 rows=1)\n  ->  Seq Scan on orders_order  (cost=0.00..1.00 rows=1)'
+    assert analyse(plan, 'postgresql') == (['orders_order'], True)
+    assert analyse('Index Scan using order_user_created_idx on orders_order', 'postgresql') == ([], False)
+    with pytest.raises(ValueError):
+        analyse('1 SIMPLE orders_order ALL', 'mysql')
+
+def test_logged_queries_keeps_distinct_selects():
+    lines = [
+        _log_line("SELECT id FROM products_product WHERE name = 'x'", 'UPDATE products_product SET quantity = 1'),
+        _log_line("SELECT id FROM products_product WHERE name = 'y'"),
+        'not json',
+    ]
+    assert list(logged_queries(lines).values()) == ['SELECT id FROM products_product WHERE name = ?']
+
+@pytest.mark.django_db
+class TestIndexAudit:
+
+    def test_hot_queries_use_indexes(self):
+        reports = audit(hot_queries())
+        assert {report.name for report in reports if report.flagged} == set()
+        inbox = next(report for report in reports if report.name == 'notifications.inbox')
+        assert 'notification_user_created_idx' in inbox.plan
+        assert not inbox.sorts
+
+    def test_logged_scan_is_flagged(self, tmp_path):
+        log = tmp_path / 'requests.log'
+        log.write_text('\n'.join([
+            _log_line("SELECT id FROM products_product WHERE name = 'Mango'"),
+            _log_line('SELECT id FROM orders_order WHERE user_id IN (%s, %s) ORDER BY created_at DESC'),
+        ]))
+        out = io.StringIO()
+        with pytest.raises(CommandError, match='product-list#1'):
+            call_command('audit_indexes', log=str(log), only_logged=True, fail_on_scan=True, stdout=out)
+        assert 'SEQ SCAN products_product' in out.getvalue()
+        assert '2 queries, 1 with full table scans' in out.getvalue()
+
+    def test_unsupported_backend_is_rejected(self, monkeypatch):
+        monkeypatch.setattr(connection, 'vendor', 'mysql')
+        with pytest.raises(CommandError, match='No plan analysis for mysql'):
+            call_command('audit_indexes', stdout=io.StringIO())
@@ -0,0 +1,51 @@
+import json
+import logging
+import re
+
+import pytest
+from rest_framework.test import APIClient
+
+from users.models import SellerProfile, User
+from products.models import Product
+from farmfresh_backend.instrumentation import fingerprint
+
+PRODUCTS_URL = '/api/v1/products/products/'
+
+@pytest.fixture
+def client():
+    user = User.objects.create_user(username='farmer', password='testpassword')
+    seller = SellerProfile.objects.create(user=user, farm_name='Green Acres', region='Pune')
+    for i in range(3):
+        Product.objects.create(seller=seller, name=f'Mango {i}', description='', price='5.00', quantity=1)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'  AND n = 3") == \
+        'SELECT * FROM t WHERE id IN (...) AND name = ? AND n = ?'
+
+@pytest.mark.django_db
+class TestRequestInstrumentation:
+
+    def test_server_timing_header(self, client):
+        response = client.get(PRODUCTS_URL)
+        header = response['Server-Timing']
+        match = re.match(r'db;dur=[\d.]+;desc="(\d+) queries", ser;dur=[\d.]+, total;dur=[\d.]+$', header)
+        assert match
+        assert int(match.group(1)) == 1
+
+    def test_slow_requests_are_logged_with_fingerprints(self, client, settings, caplog):
+        settings.REQUEST_INSTRUMENTATION = {'SLOW_QUERY_COUNT': 0}
+        with caplog.at_level(logging.WARNING, logger='farmfresh.requests'):
+            client.get(PRODUCTS_URL)
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['event'] == 'slow_request'
+        assert record['view'] == 'product-list'
+        assert record['queries'] == 1
+        assert 'FROM "products_product"' in record['top_sql'][0]['sql']
+
+    def test_fast_requests_are_not_logged(self, client, caplog):
+        with caplog.at_level(logging.WARNING, logger='farmfresh.requests'):
+            client.get(PRODUCTS_URL)
+        assert not caplog.records
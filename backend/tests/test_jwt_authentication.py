@@ -0,0 +1,85 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from authentication.backends import CachedJWTAuthentication, get_user_cache, invalidate_cached_users
+from authentication.serializers import CustomTokenObtainPairSerializer
+
+LIST_URL = '/api/v1/notifications/notifications/'
+
+@pytest.fixture(autouse=True)
+def empty_user_cache():
+    cache.clear()
+    get_user_cache().local.clear()
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='farmer', email='farmer@example.com', password='testpassword', is_seller=True)
+
+def client_for(user):
+    client = APIClient()
+    token = CustomTokenObtainPairSerializer.get_token(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+def user_queries(ctx):
+    return [q for q in ctx.captured_queries if 'FROM "users_user"' in q['sql']]
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_user_lookup_is_cached_between_requests(self, user):
+        client = client_for(user)
+        with CaptureQueriesContext(connection) as first:
+            assert client.get(LIST_URL).status_code == status.HTTP_200_OK
+        with CaptureQueriesContext(connection) as second:
+            assert client.get(LIST_URL).status_code == status.HTTP_200_OK
+        assert len(user_queries(first)) == 1
+        assert len(user_queries(second)) == 0
+
+    def test_deactivation_invalidates_cache(self, user):
+        client = client_for(user)
+        assert client.get(LIST_URL).status_code == status.HTTP_200_OK
+        user.is_active = False
+        user.save()
+        assert client.get(LIST_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_stateless_mode_builds_user_from_claims(self, user, settings):
+        settings.JWT_AUTH_CACHE = {'STATELESS': True}
+        client = client_for(user)
+        with CaptureQueriesContext(connection) as ctx:
+            assert client.get(LIST_URL).status_code == status.HTTP_200_OK
+        assert user_queries(ctx) == []
+
+    def test_cache_holds_only_auth_fields(self, user):
+        client_for(user).get(LIST_URL)
+        entry = cache.get(get_user_cache().key(user.pk))
+        assert set(entry) == {'id', 'is_active', 'is_staff', 'is_superuser', 'is_seller', 'password_digest'}
+        assert user.password not in entry.values()
+        cached = get_user_cache().get(user.pk)
+        assert cached.is_seller is True
+        assert cached.email == 'farmer@example.com'
+
+    def test_queryset_update_needs_explicit_invalidation(self, user):
+        client = client_for(user)
+        assert client.get(LIST_URL).status_code == status.HTTP_200_OK
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        invalidate_cached_users([user.pk])
+        assert client.get(LIST_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_tokens_carry_no_personal_or_privilege_claims(self, user):
+        user.is_staff = user.is_superuser = True
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        assert not {'username', 'email', 'is_staff', 'is_superuser'} & set(token.payload)
+        assert token['is_seller'] is True
+
+    def test_stateless_user_is_never_staff(self, user, settings):
+        settings.JWT_AUTH_CACHE = {'STATELESS': True}
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        token['is_staff'] = token['is_superuser'] = True
+        request_user = CachedJWTAuthentication().get_user(token)
+        assert (request_user.is_staff, request_user.is_superuser, request_user.is_seller) == (False, False, True)
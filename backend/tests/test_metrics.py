@@ -0,0 +1,84 @@
+import os
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from rest_framework.test import APIClient
+
+from users.models import User
+from farmfresh_backend.metrics import Registry
+
+def sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+class TestRegistry:
+
+    def test_histogram_exposition(self):
+        registry = Registry(buckets=(0.1, 1.0))
+        labels = (('view', 'ProductViewSet'), ('action', 'list'))
+        for value in (0.05, 0.5, 5):
+            registry.observe('farmfresh_http_request_duration_seconds', labels, value)
+        text = registry.render()
+        assert '# TYPE farmfresh_http_request_duration_seconds histogram' in text
+        assert 'farmfresh_http_request_duration_seconds_bucket{view="ProductViewSet",action="list",le="0.1"} 1' in text
+        assert 'farmfresh_http_request_duration_seconds_bucket{view="ProductViewSet",action="list",le="1"} 2' in text
+        assert 'farmfresh_http_request_duration_seconds_bucket{view="ProductViewSet",action="list",le="+Inf"} 3' in text
+        assert 'farmfresh_http_request_duration_seconds_count{view="ProductViewSet",action="list"} 3' in text
+
+    def test_processes_are_aggregated_through_directory(self, tmp_path, settings):
+        settings.METRICS = {'MULTIPROCESS_DIR': str(tmp_path)}
+        worker = Registry()
+        worker.inc('farmfresh_http_requests_total', (('view', 'OrderViewSet'),), 2)
+        worker.flush(str(tmp_path), force=True)
+        # Pretend the file came from another worker process.
+        next(tmp_path.glob('metrics_*.json')).rename(tmp_path / 'metrics_1.json')
+        scraper = Registry()
+        scraper.inc('farmfresh_http_requests_total', (('view', 'OrderViewSet'),), 1)
+        assert 'farmfresh_http_requests_total{view="OrderViewSet"} 3' in scraper.render()
+
+    def test_exited_threads_are_folded_into_the_base_shard(self):
+        registry = Registry()
+        labels = (('view', 'ProductViewSet'),)
+        for _ in range(5):
+            thread = threading.Thread(target=registry.inc, args=('farmfresh_http_requests_total', labels))
+            thread.start()
+            thread.join()
+        registry.inc('farmfresh_http_requests_total', labels)
+        assert registry.snapshot()['counters'] == {('farmfresh_http_requests_total', labels): 6}
+        assert len(registry._shards) == 1
+
+    def test_files_of_dead_processes_are_pruned(self, tmp_path, settings):
+        settings.METRICS = {'MULTIPROCESS_DIR': str(tmp_path)}
+        (tmp_path / 'metrics_999999999.json').write_text('{"counters": [["farmfresh_x", [], 5]], "histograms": []}')
+        registry = Registry()
+        assert 'farmfresh_x' not in registry.render()
+        assert [p.name for p in tmp_path.glob('metrics_*.json')] == [f'metrics_{os.getpid()}.json']
+
+@pytest.mark.django_db
+def test_metrics_endpoint_access(settings):
+    settings.DEBUG = False
+    assert Client(REMOTE_ADDR='8.8.8.8').get('/metrics').status_code == 403
+    assert Client().get('/metrics').status_code == 200
+    settings.METRICS = {'TOKEN': 's3cret'}
+    assert Client().get('/metrics').status_code == 401
+    assert Client().get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code == 200
+
+@pytest.mark.django_db
+def test_metrics_endpoint_reports_viewset_actions():
+    user = User.objects.create_user(username='farmer', password='testpassword')
+    client = APIClient()
+    client.force_authenticate(user=user)
+    prefix = 'farmfresh_http_requests_total{view="ProductViewSet",action="list",method="GET",status="200"}'
+    before = sample(Client().get('/metrics').content.decode(), prefix) or 0
+    client.get('/api/v1/products/products/')
+    client.get('/api/v1/products/products/')
+    cache.get('missing-key')
+    text = Client().get('/metrics').content.decode()
+    assert sample(text, prefix) == before + 2
+    assert 'farmfresh_db_queries_total{view="ProductViewSet",action="list"}' in text
+    assert 'farmfresh_cache_requests_total{cache="default",result="miss"}' in text
+    assert 'farmfresh_queue_depth{queue="notification_digest"} 0' in text
@@ -0,0 +1,29 @@
+import pytest
+from django.test import Client
+
+from users.models import User
+
+@pytest.mark.django_db
+class TestBrowserOnlyMiddleware:
+
+    def test_api_requests_skip_session_and_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.get('/api/v1/users/directory/')
+        assert response.status_code == 200
+        assert 'sessionid' not in response.cookies
+        assert 'csrftoken' not in response.cookies
+        assert not hasattr(response.wsgi_request, 'session')
+
+    def test_admin_keeps_session_auth_and_csrf(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'adminpass')
+        client = Client(enforce_csrf_checks=True)
+        response = client.post('/admin/login/', {'username': 'admin', 'password': 'adminpass'})
+        assert response.status_code == 403
+
+        client.get('/admin/login/')
+        token = client.cookies['csrftoken'].value
+        response = client.post('/admin/login/?next=/admin/', {
+            'username': 'admin', 'password': 'adminpass', 'csrfmiddlewaretoken': token,
+        })
+        assert response.status_code == 302
+        assert client.get('/admin/').status_code == 200
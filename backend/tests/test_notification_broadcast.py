@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from notifications import broadcast
+from notifications.bus import InProcessBus
+from notifications.models import Notification
+
+BROADCAST_URL = '/api/v1/notifications/broadcast/'
+
+@pytest.fixture
+def audience():
+    users = [User(username=f'user{i}', is_seller=i % 2 == 0) for i in range(7)]
+    User.objects.bulk_create(users)
+    User.objects.create(username='inactive', is_active=False)
+    return users
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+class DeferredExecutor:
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, fn, *args):
+        self.pending.append((fn, args))
+
+    def run_next(self):
+        fn, args = self.pending.pop(0)
+        fn(*args)
+
+@pytest.mark.django_db
+class TestBroadcast:
+
+    def test_fan_out_creates_one_row_per_user_in_chunks(self, audience):
+        calls = []
+        sent = broadcast.fan_out('Mango season is here', 'announcement', chunk_size=3,
+                                 progress=lambda sent, total: calls.append((sent, total)))
+        assert sent == 7
+        assert calls == [(0, 7), (3, 7), (6, 7), (7, 7)]
+        assert Notification.objects.filter(message='Mango season is here').count() == 7
+        assert not Notification.objects.filter(user__username='inactive').exists()
+
+    def test_fan_out_publishes_to_live_subscribers(self, audience, monkeypatch, django_capture_on_commit_callbacks):
+        bus = InProcessBus()
+        monkeypatch.setattr(broadcast, 'get_bus', lambda: bus)
+        listener = audience[3]
+        loop = asyncio.new_event_loop()
+        try:
+            events = bus.subscribe(listener.id)
+            received = loop.create_task(events.__anext__())
+            # Run the subscriber up to its first wait so it is registered.
+            loop.run_until_complete(asyncio.sleep(0))
+            with django_capture_on_commit_callbacks(execute=True):
+                broadcast.fan_out('Mango season is here', 'announcement', chunk_size=3)
+            event = loop.run_until_complete(asyncio.wait_for(received, 1))
+            loop.run_until_complete(events.aclose())
+        finally:
+            loop.close()
+        assert event.event == 'notification'
+        assert event.data['message'] == 'Mango season is here'
+        assert event.data['id'] == str(Notification.objects.get(user=listener).id)
+        # Users without a subscriber get nothing buffered.
+        assert list(bus._buffers) == [str(listener.id)]
+
+    def test_fan_out_to_sellers_only(self, audience):
+        sent = broadcast.fan_out('Low stock', 'low_stock', audience='sellers', chunk_size=2)
+        assert sent == 4
+        assert set(Notification.objects.values_list('user__is_seller', flat=True)) == {True}
+
+    def test_management_command_reports_progress(self, audience, capsys):
+        call_command('broadcast_notification', 'Hello farmers', '--audience', 'sellers', '--chunk-size', '10')
+        output = capsys.readouterr().out
+        assert '4/4 notifications created' in output
+        assert 'Broadcast sent to 4 users' in output
+
+    def test_api_requires_admin(self, audience):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get(username='user0'))
+        response = client.post(BROADCAST_URL, {'message': 'hi'}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_api_queues_job_and_reports_status(self, audience, monkeypatch):
+        monkeypatch.setattr(broadcast, '_executor', InlineExecutor())
+        monkeypatch.setattr(broadcast.connections, 'close_all', lambda: None)
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass')
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        response = client.post(BROADCAST_URL, {'message': 'hi', 'chunk_size': 2}, format='json')
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = client.get(f"{BROADCAST_URL}{response.data['job']}/").data
+        assert job['status'] == 'done'
+        assert job['sent'] == 8
+
+    def test_queued_jobs_counts_jobs_not_yet_started(self, audience, monkeypatch):
+        executor = DeferredExecutor()
+        monkeypatch.setattr(broadcast, '_executor', executor)
+        monkeypatch.setattr(broadcast.connections, 'close_all', lambda: None)
+        broadcast.start_broadcast('hi', 'announcement')
+        broadcast.start_broadcast('again', 'announcement')
+        assert broadcast.queued_jobs() == 2
+        executor.run_next()
+        assert broadcast.queued_jobs() == 1
+        executor.run_next()
+        assert broadcast.queued_jobs() == 0
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from users.models import SellerProfile, User
+from products.models import Product
+from orders.models import Order, OrderItem
+from notifications import digest
+from notifications.digest import flush_due_digests, notify
+from notifications.models import DigestBuffer, Notification
+
+@pytest.fixture(autouse=True)
+def digest_settings(settings):
+    settings.NOTIFICATION_DIGEST = {'WINDOWS': {'new_order': 3600}, 'EMAIL': True}
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+@pytest.fixture(autouse=True)
+def inline_email(monkeypatch):
+    monkeypatch.setattr(digest, '_email_executor', InlineExecutor())
+    monkeypatch.setattr(digest.connections, 'close_all', lambda: None)
+
+@pytest.fixture
+def farmer():
+    return User.objects.create_user(username='farmer', email='farmer@example.com', password='testpassword')
+
+@pytest.mark.django_db
+class TestNotificationDigest:
+
+    def test_burst_is_coalesced_into_one_notification_and_email(self, farmer):
+        for i in range(200):
+            notify(farmer.id, 'new_order', f'Order {i}')
+        assert Notification.objects.count() == 0
+        assert DigestBuffer.objects.get().count == 200
+
+        assert flush_due_digests() == 0
+        flushed = flush_due_digests(now=timezone.now() + timedelta(hours=1))
+        assert flushed == 1
+        notification = Notification.objects.get()
+        assert notification.message == 'Order 199 (+199 more)'
+        assert not DigestBuffer.objects.exists()
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].subject == 'FarmFresh: 200 new new_order notifications'
+
+    def test_other_types_are_written_immediately(self, farmer, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            notify(farmer.id, 'info', 'Welcome')
+        assert Notification.objects.filter(type='info').count() == 1
+        # The email goes out after commit, off the request path.
+        assert len(mail.outbox) == 0
+        for callback in callbacks:
+            callback()
+        assert len(mail.outbox) == 1
+
+    def test_new_order_item_notifies_seller_in_digest(self, farmer, django_capture_on_commit_callbacks):
+        seller = SellerProfile.objects.create(user=farmer, farm_name='Green Acres', region='Pune')
+        product = Product.objects.create(seller=seller, name='Mangoes', description='Alphonso', price='5.00', quantity=10)
+        buyer = User.objects.create_user(username='buyer', password='testpassword')
+        for _ in range(2):
+            order = Order.objects.create(user=buyer, shipping_address='Farm road')
+            with django_capture_on_commit_callbacks(execute=True):
+                for quantity in (1, 2, 3):
+                    OrderItem.objects.create(
+                        order=order, product=product, product_name='Mangoes', product_price='5.00', quantity=quantity,
+                    )
+        buffer = DigestBuffer.objects.get(user=farmer)
+        assert buffer.count == 2
+        assert buffer.last_message == 'New order for 1 x Mangoes, 2 x Mangoes, 3 x Mangoes'
+        flush_due_digests(force=True)
+        assert Notification.objects.filter(user=farmer).count() == 1
+
+    def test_order_items_after_a_rolled_back_savepoint_are_still_sent(self, farmer, django_capture_on_commit_callbacks):
+        seller = SellerProfile.objects.create(user=farmer, farm_name='Green Acres', region='Pune')
+        product = Product.objects.create(seller=seller, name='Mangoes', description='', price='5.00', quantity=10)
+        order = Order.objects.create(user=User.objects.create_user(username='buyer'), shipping_address='Farm road')
+
+        def add(quantity):
+            OrderItem.objects.create(
+                order=order, product=product, product_name='Mangoes', product_price='5.00', quantity=quantity,
+            )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    add(1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            add(2)
+        assert DigestBuffer.objects.get(user=farmer).last_message == 'New order for 2 x Mangoes'
+
+    def test_order_notification_queries_do_not_grow_with_items(self, farmer, django_capture_on_commit_callbacks):
+        seller = SellerProfile.objects.create(user=farmer, farm_name='Green Acres', region='Pune')
+        products = Product.objects.bulk_create([
+            Product(seller=seller, name=f'p{i}', description='', price='1.00', quantity=10) for i in range(20)
+        ])
+        buyer = User.objects.create_user(username='buyer', password='testpassword')
+        counts = []
+        for size in (1, 20):
+            DigestBuffer.objects.all().delete()
+            order = Order.objects.create(user=buyer, shipping_address='Farm road')
+            with django_capture_on_commit_callbacks() as callbacks:
+                for product in products[:size]:
+                    OrderItem.objects.create(
+                        order=order, product=product, product_name=product.name, product_price='1.00', quantity=1,
+                    )
+            with CaptureQueriesContext(connection) as ctx:
+                for callback in callbacks:
+                    callback()
+            counts.append(len(ctx.captured_queries))
+        assert counts[0] == counts[1]
+        assert DigestBuffer.objects.get(user=farmer).count == 1
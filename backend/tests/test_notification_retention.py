@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import User
+from notifications.models import ArchivedNotification, Notification
+from notifications.retention import purge_notifications
+
+@pytest.fixture
+def inbox():
+    user = User.objects.create_user(username='farmer', password='testpassword')
+    now = timezone.now()
+    rows = {
+        'old_read': (True, 40),
+        'recent_read': (True, 10),
+        'old_unread': (False, 100),
+        'recent_unread': (False, 40),
+    }
+    for message, (is_read, age) in rows.items():
+        notification = Notification.objects.create(user=user, message=message, type='info', is_read=is_read)
+        Notification.objects.filter(pk=notification.pk).update(created_at=now - timedelta(days=age))
+    return user
+
+@pytest.mark.django_db
+class TestNotificationRetention:
+
+    def test_purges_expired_rows_in_batches(self, inbox):
+        extra = [Notification(user=inbox, message='bulk', type='info', is_read=True) for _ in range(5)]
+        Notification.objects.bulk_create(extra)
+        Notification.objects.filter(message='bulk').update(created_at=timezone.now() - timedelta(days=60))
+        result = purge_notifications(read_days=30, unread_days=90, batch_size=2, pause=0)
+        assert result.purged == 7
+        assert result.batches == 4
+        assert set(Notification.objects.values_list('message', flat=True)) == {'recent_read', 'recent_unread'}
+
+    def test_archive_copies_rows_before_deleting(self, inbox):
+        result = purge_notifications(read_days=30, unread_days=90, pause=0, archive=True)
+        assert result.purged == result.archived == 2
+        assert set(ArchivedNotification.objects.values_list('message', flat=True)) == {'old_read', 'old_unread'}
+
+    def test_command_reports_counts(self, inbox, capsys):
+        call_command('purge_notifications', '--dry-run')
+        assert '2 notifications would be purged' in capsys.readouterr().out
+        call_command('purge_notifications', '--pause', '0')
+        assert 'Purged 2 notifications (0 archived) in 1 batches' in capsys.readouterr().out
+        assert Notification.objects.count() == 2
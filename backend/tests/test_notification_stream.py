@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+from django.test import Client
+from rest_framework.test import APIClient
+
+from users.models import User
+from orders.models import Order
+from notifications.bus import InProcessBus
+from notifications.models import Notification
+from notifications.views import _authenticate_stream, _event_stream
+
+async def _take(iterator, count):
+    items = []
+    async for item in iterator:
+        items.append(item)
+        if len(items) == count:
+            break
+    await iterator.aclose()
+    return items
+
+class TestInProcessBus:
+
+    def test_subscriber_receives_published_events(self):
+        bus = InProcessBus()
+
+        async def run():
+            events = bus.subscribe('user-1')
+            consumer = asyncio.ensure_future(_take(events, 2))
+            await asyncio.sleep(0)
+            bus.publish('user-1', 'notification', {'n': 1})
+            bus.publish('user-2', 'notification', {'n': 'other'})
+            bus.publish('user-1', 'notification', {'n': 2})
+            return await consumer
+
+        items = asyncio.run(run())
+        assert [item.data['n'] for item in items] == [1, 2]
+
+    def test_resume_from_last_event_id(self):
+        bus = InProcessBus(buffer_size=10)
+        first = bus.publish('user-1', 'notification', {'n': 1})
+        bus.publish('user-1', 'notification', {'n': 2})
+        bus.publish('user-1', 'notification', {'n': 3})
+        items = asyncio.run(_take(bus.subscribe('user-1', last_event_id=first.id), 2))
+        assert [item.data['n'] for item in items] == [2, 3]
+
+    def test_subscriber_is_removed_on_close(self):
+        bus = InProcessBus()
+        bus.publish('user-1', 'notification', {'n': 1})
+        asyncio.run(_take(bus.subscribe('user-1', last_event_id=0), 1))
+        assert bus._subscribers == {}
+
+    def test_event_ids_are_increasing_timestamps(self):
+        before = time.time_ns() // 1000
+        ids = [InProcessBus().publish('user-1', 'notification', {}).id for _ in range(3)]
+        bus = InProcessBus()
+        ids += [bus.publish('user-1', 'notification', {}).id for _ in range(100)]
+        assert ids == sorted(set(ids))
+        assert ids[0] >= before
+
+    def test_idle_buffers_are_evicted(self, monkeypatch):
+        bus = InProcessBus(buffer_ttl=60)
+        bus.publish('user-1', 'notification', {})
+        bus.publish('user-2', 'notification', {})
+        later = time.time_ns() + 61 * 10 ** 9
+        monkeypatch.setattr(time, 'time_ns', lambda: later)
+        bus.publish('user-2', 'notification', {})
+        assert list(bus._buffers) == ['user-2']
+
+    def test_stream_formats_events_and_heartbeats(self, settings, monkeypatch):
+        settings.NOTIFICATION_STREAM = {'HEARTBEAT_SECONDS': 0.01, 'RETRY_MILLISECONDS': 1000}
+        bus = InProcessBus()
+        monkeypatch.setattr('notifications.views.get_bus', lambda: bus)
+        event = bus.publish('user-1', 'notification', {'message': 'hi'})
+        chunks = asyncio.run(_take(_event_stream('user-1', 0), 3))
+        assert chunks[0] == 'retry: 1000\n\n'
+        assert chunks[1] == f'id: {event.id}\nevent: notification\ndata: {{"message": "hi"}}\n\n'
+        assert chunks[2] == ': keepalive\n\n'
+
+@pytest.mark.django_db
+class TestNotificationSignals:
+
+    def test_new_notification_and_order_status_are_published(self, monkeypatch, django_capture_on_commit_callbacks):
+        bus = InProcessBus()
+        monkeypatch.setattr('notifications.bus.get_bus', lambda: bus)
+        user = User.objects.create_user(username='buyer', password='testpassword')
+        with django_capture_on_commit_callbacks(execute=True):
+            Notification.objects.create(user=user, message='hello', type='info')
+            order = Order.objects.create(user=user, shipping_address='Farm road')
+            order.save()
+            order.status = 'shipped'
+            order.save()
+        published = list(bus._buffers[str(user.id)])
+        assert [item.event for item in published] == ['notification', 'order_status']
+        assert published[1].data['status'] == 'shipped'
+
+@pytest.mark.django_db
+class TestStreamTickets:
+
+    def test_ticket_is_single_use(self, rf):
+        user = User.objects.create_user(username='buyer', password='testpassword')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.post('/api/v1/notifications/stream/ticket/')
+        assert response.status_code == 201
+        ticket = response.data['ticket']
+        request = rf.get('/api/v1/notifications/stream/', {'ticket': ticket})
+        assert _authenticate_stream(request) == user.id
+        assert _authenticate_stream(request) is None
+
+    def test_bearer_token_in_query_string_is_not_accepted(self):
+        response = Client().get('/api/v1/notifications/stream/', {'token': 'anything'})
+        assert response.status_code == 401
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from notifications.models import Notification
+
+LIST_URL = '/api/v1/notifications/notifications/'
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='farmer', email='farmer@example.com', password='testpassword')
+
+@pytest.fixture
+def other_user():
+    return User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+
+@pytest.fixture
+def authenticated_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+@pytest.mark.django_db
+class TestNotificationAPI:
+
+    def test_list_is_scoped_to_user(self, authenticated_client, user, other_user):
+        Notification.objects.create(user=user, message='mine', type='order')
+        Notification.objects.create(user=other_user, message='theirs', type='order')
+        response = authenticated_client.get(LIST_URL)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+        assert response.data['results'][0]['message'] == 'mine'
+
+    def test_list_is_newest_first(self, authenticated_client, user):
+        first = Notification.objects.create(user=user, message='first', type='order')
+        second = Notification.objects.create(user=user, message='second', type='order')
+        response = authenticated_client.get(LIST_URL)
+        ids = [row['id'] for row in response.data['results']]
+        assert ids == [str(second.id), str(first.id)]
+
+    def test_mark_all_read_is_single_update(self, authenticated_client, user, other_user):
+        Notification.objects.bulk_create(
+            [Notification(user=user, message=f'n{i}', type='order') for i in range(50)]
+        )
+        Notification.objects.create(user=other_user, message='theirs', type='order')
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.post(LIST_URL + 'mark_all_read/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['updated'] == 50
+        assert len([q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]) == 1
+        assert not Notification.objects.filter(user=user, is_read=False).exists()
+        assert Notification.objects.filter(user=other_user, is_read=False).count() == 1
+
+    def test_mark_read_ignores_other_users_ids(self, authenticated_client, user, other_user):
+        mine = Notification.objects.create(user=user, message='mine', type='order')
+        theirs = Notification.objects.create(user=other_user, message='theirs', type='order')
+        response = authenticated_client.post(
+            LIST_URL + 'mark_read/', {'ids': [str(mine.id), str(theirs.id)]}, format='json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['updated'] == 1
+        theirs.refresh_from_db()
+        assert theirs.is_read is False
+
+    def test_mark_read_requires_ids(self, authenticated_client):
+        response = authenticated_client.post(LIST_URL + 'mark_read/', {}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = authenticated_client.post(LIST_URL + 'mark_read/', {'ids': ['not-a-uuid']}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
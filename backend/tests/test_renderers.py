@@ -0,0 +1,87 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from farmfresh_backend import renderers
+from farmfresh_backend.parsers import FastJSONParser
+from farmfresh_backend.renderers import FastJSONRenderer
+from users.models import User
+
+msgpack = pytest.importorskip('msgpack')
+
+LIST_URL = '/api/v1/notifications/notifications/'
+
+PAYLOAD = {
+    'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'price': Decimal('12.50'),
+    'created_at': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+    'day': datetime.date(2024, 5, 1),
+    'tags': ('fresh', 'organic'),
+    'name': 'Tomates cerises',
+}
+
+
+class BytesStream:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def test_fast_renderer_matches_stdlib_output():
+    fast = json.loads(FastJSONRenderer().render(PAYLOAD))
+    stdlib = json.loads(JSONRenderer().render(PAYLOAD))
+    assert fast == stdlib
+
+
+def test_fast_renderer_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, 'orjson', None)
+    assert json.loads(FastJSONRenderer().render(PAYLOAD))['price'] == 12.5
+
+
+def test_fast_renderer_honours_indent():
+    output = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+    assert output == b'{\n  "a": 1\n}'
+
+
+def test_fast_parser_rejects_malformed_json():
+    assert FastJSONParser().parse(BytesStream(b'{"ids": [1]}')) == {'ids': [1]}
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(BytesStream(b'{"ids": '))
+
+
+@pytest.mark.django_db
+class TestContentNegotiation:
+
+    @pytest.fixture
+    def client(self):
+        user = User.objects.create_user(username='farmer', email='farmer@example.com', password='testpassword')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def test_json_is_default(self, client):
+        response = client.get(LIST_URL)
+        assert response['Content-Type'] == 'application/json'
+        assert json.loads(response.content)['count'] == 0
+
+    def test_msgpack_negotiated_by_accept(self, client):
+        response = client.get(LIST_URL, HTTP_ACCEPT='application/msgpack')
+        assert response['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(response.content)['count'] == 0
+
+    def test_msgpack_request_body(self, client):
+        response = client.post(
+            LIST_URL + 'mark_read/',
+            msgpack.packb({'ids': [str(uuid.uuid4())]}),
+            content_type='application/msgpack',
+        )
+        assert response.status_code == 200
+        assert response.data['updated'] == 0
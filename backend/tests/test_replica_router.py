@@ -0,0 +1,65 @@
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from users.models import User
+from products.models import Product
+from farmfresh_backend.routers import ReplicaRouter, ReplicaRoutingMiddleware
+
+router = ReplicaRouter()
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.REPLICA_DATABASES = ['replica_0']
+    cache.clear()
+
+def route(request, status=200):
+    seen = {}
+
+    def view(request):
+        seen['db'] = router.db_for_read(Product)
+        return HttpResponse(status=status)
+
+    ReplicaRoutingMiddleware(view)(request)
+    return seen['db']
+
+def test_reads_outside_requests_use_primary():
+    assert router.db_for_read(Product) == 'default'
+    assert router.db_for_write(Product) == 'default'
+
+def test_safe_requests_read_from_replica():
+    assert route(RequestFactory().get('/api/v1/products/products/')) == 'replica_0'
+
+def test_unsafe_requests_read_from_primary():
+    assert route(RequestFactory().post('/api/v1/orders/orders/')) == 'default'
+
+def test_migrations_only_on_primary():
+    assert router.allow_migrate('default', 'products')
+    assert not router.allow_migrate('replica_0', 'products')
+
+@pytest.mark.django_db
+def test_reads_stick_to_primary_after_own_write():
+    user = User.objects.create_user(username='farmer', password='testpassword')
+    other = User.objects.create_user(username='other', password='testpassword')
+    write = RequestFactory().post('/api/v1/orders/orders/')
+    write.user = user
+    route(write, status=201)
+
+    read = RequestFactory().get('/api/v1/orders/orders/')
+    read.user = user
+    assert route(read) == 'default'
+
+    read = RequestFactory().get('/api/v1/orders/orders/')
+    read.user = other
+    assert route(read) == 'replica_0'
+
+@pytest.mark.django_db
+def test_failed_writes_do_not_pin():
+    user = User.objects.create_user(username='farmer', password='testpassword')
+    write = RequestFactory().post('/api/v1/orders/orders/')
+    write.user = user
+    route(write, status=400)
+    read = RequestFactory().get('/api/v1/orders/orders/')
+    read.user = user
+    assert route(read) == 'replica_0'
@@ -0,0 +1,98 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import SellerProfile, User
+from products.models import Product
+from reviews.models import Review
+
+DIRECTORY_URL = '/api/v1/users/directory/'
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.clear()
+
+@pytest.fixture
+def sellers():
+    profiles = []
+    for i, region in enumerate(['Pune', 'Nashik']):
+        user = User.objects.create_user(username=f'farmer{i}', password='testpassword', is_seller=True)
+        profiles.append(SellerProfile.objects.create(user=user, farm_name=f'Farm {i}', region=region))
+    buyer = User.objects.create_user(username='buyer', password='testpassword')
+    for rating in (4, 5):
+        product = Product.objects.create(seller=profiles[0], name='Mango', description='', price='5.00', quantity=1)
+        Review.objects.create(product=product, user=buyer, rating=rating)
+    return profiles
+
+@pytest.mark.django_db
+class TestSellerDirectory:
+
+    def test_cards_are_built_in_one_query(self, sellers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().get(DIRECTORY_URL)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(ctx.captured_queries) == 1
+        card = response.data[0]
+        assert card['farm_name'] == 'Farm 0'
+        assert card['product_count'] == 2
+        assert card['rating'] == 4.5
+        assert response.data[1]['product_count'] == 0
+        assert response.data[1]['rating'] is None
+
+    def test_cached_until_a_product_changes(self, sellers):
+        client = APIClient()
+        client.get(DIRECTORY_URL)
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(DIRECTORY_URL)
+        assert len(ctx.captured_queries) == 0
+        Product.objects.create(seller=sellers[1], name='Grapes', description='', price='3.00', quantity=1)
+        response = client.get(DIRECTORY_URL)
+        assert response.data[1]['product_count'] == 1
+
+    def test_region_filter(self, sellers):
+        response = APIClient().get(DIRECTORY_URL, {'region': 'nashik'})
+        assert [card['farm_name'] for card in response.data] == ['Farm 1']
+
+    def test_customer_login_does_not_invalidate(self, sellers):
+        client = APIClient()
+        client.get(DIRECTORY_URL)
+        buyer = User.objects.get(username='buyer')
+        buyer.save()
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(DIRECTORY_URL)
+        assert len(ctx.captured_queries) == 0
+
+    def test_seller_login_does_not_invalidate(self, sellers):
+        client = APIClient()
+        client.get(DIRECTORY_URL)
+        farmer = User.objects.get(username='farmer1')
+        farmer.last_login = timezone.now()
+        farmer.save(update_fields=['last_login'])
+        farmer.first_name = 'Asha'
+        farmer.save()
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(DIRECTORY_URL)
+        assert len(ctx.captured_queries) == 0
+        farmer.is_active = False
+        farmer.save(update_fields=['is_active'])
+        response = client.get(DIRECTORY_URL)
+        assert [card['farm_name'] for card in response.data] == ['Farm 0']
+
+    def test_stock_updates_do_not_invalidate(self, sellers):
+        client = APIClient()
+        client.get(DIRECTORY_URL)
+        product = Product.objects.filter(seller=sellers[0]).first()
+        product.quantity = 0
+        product.save()
+        Product.objects.only('id', 'quantity').get(pk=product.pk).save(update_fields=['quantity'])
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(DIRECTORY_URL)
+        assert len(ctx.captured_queries) == 0
+        product.seller = sellers[1]
+        product.save()
+        response = client.get(DIRECTORY_URL)
+        assert [card['product_count'] for card in response.data] == [1, 1]
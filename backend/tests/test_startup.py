@@ -0,0 +1,44 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import resolve
+
+from farmfresh_backend.startup import parse_importtime, profile_startup, startup_settings
+
+@pytest.fixture(scope='module')
+def profile():
+    return profile_startup()
+
+def test_first_request_within_budget(profile):
+    budget = startup_settings()['BUDGET_SECONDS']
+    assert profile.status.startswith('401')
+    assert profile.total < budget, (
+        f'time to first request {profile.total:.2f}s exceeds {budget:.2f}s; '
+        f'run `manage.py profile_startup` to see what got slower'
+    )
+
+def test_admin_registrations_stay_off_the_api_path(profile):
+    assert 'farmfresh_backend.urls' in profile.modules
+    assert not {f'{app}.admin' for app in ('users', 'products', 'orders', 'notifications')} & profile.modules
+    assert any(item.module == 'products.views' for item in profile.imports)
+
+def test_admin_registers_on_first_admin_url():
+    match = resolve('/admin/products/product/')
+    assert match.url_name == 'products_product_changelist'
+
+def test_parse_importtime():
+    stderr = (
+        'import time: self [us] | cumulative | imported package\n'
+        'import time:       120 |        120 |   orjson\n'
+        'import time:       300 |        420 | farmfresh_backend.renderers\n'
+    )
+    items = parse_importtime(stderr)
+    assert [(i.module, i.self_us, i.cumulative_us, i.depth) for i in items] == [
+        ('orjson', 120, 120, 1), ('farmfresh_backend.renderers', 300, 420, 0),
+    ]
+
+def test_command_fails_over_budget():
+    with pytest.raises(CommandError, match='exceeds'):
+        call_command('profile_startup', budget=0.001, top=1, stdout=io.StringIO())
@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncClient, RequestFactory
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from farmfresh_backend.checks import check_shared_cache
+from farmfresh_backend.throttling import IPRateThrottle
+from users.models import User
+
+TOKEN_URL = '/api/v1/auth/token/'
+REFRESH_URL = '/api/v1/auth/token/refresh/'
+PRODUCTS_URL = '/api/v1/products/products/'
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def _request(ip='10.0.0.1', **extra):
+    request = Request(RequestFactory().get('/', REMOTE_ADDR=ip, **extra))
+    request.user = AnonymousUser()
+    return request
+
+def _throttle(rate, clock):
+    throttle = IPRateThrottle()
+    throttle.rate = rate
+    throttle.num_requests, throttle.duration = throttle.parse_rate(rate)
+    throttle.timer = clock
+    return throttle
+
+class TestSlidingWindow:
+
+    def test_limit_and_retry_after(self):
+        clock = Clock(60 * 1000 + 30)
+        results = [_throttle('5/min', clock).allow_request(_request(), None) for _ in range(6)]
+        assert results == [True] * 5 + [False]
+        throttle = _throttle('5/min', clock)
+        assert throttle.allow_request(_request(), None) is False
+        # Nothing fits until the window rolls over and this one's weight decays.
+        assert 30 < throttle.wait() <= 90
+
+    def test_previous_window_is_weighted(self):
+        clock = Clock(60 * 2000 + 59)
+        for _ in range(10):
+            assert _throttle('10/min', clock).allow_request(_request(), None)
+        clock.now += 31  # half way through the next window: 10 * 0.5 still count
+        allowed = [_throttle('10/min', clock).allow_request(_request(), None) for _ in range(10)]
+        assert allowed.count(True) == 5
+        clock.now += 60
+        assert _throttle('10/min', clock).allow_request(_request(), None)
+
+    def test_rejected_requests_do_not_count(self):
+        clock = Clock(60 * 3000)
+        for _ in range(50):
+            _throttle('3/min', clock).allow_request(_request(), None)
+        clock.now += 60  # previous window holds only the 3 admitted requests
+        throttle = _throttle('3/min', clock)
+        assert throttle.allow_request(_request(), None) is False
+        assert throttle.previous == 3
+
+    def test_clients_are_counted_separately(self):
+        clock = Clock(60 * 4000)
+        assert _throttle('1/min', clock).allow_request(_request('10.0.0.1'), None)
+        assert _throttle('1/min', clock).allow_request(_request('10.0.0.2'), None)
+        assert not _throttle('1/min', clock).allow_request(_request('10.0.0.1'), None)
+
+    def test_spoofed_forwarded_for_does_not_change_the_key(self):
+        throttle = _throttle('1/min', Clock(60 * 4500))
+        keys = {
+            throttle.get_cache_key(_request(HTTP_X_FORWARDED_FOR=f'203.0.113.{i}'), None)
+            for i in range(5)
+        }
+        assert keys == {throttle.get_cache_key(_request(), None)}
+
+    def test_never_admits_more_than_the_limit_under_concurrency(self):
+        clock = Clock(60 * 5000 + 10)
+        admitted = []
+        barrier = threading.Barrier(16)
+
+        def client():
+            barrier.wait()
+            admitted.append(sum(
+                _throttle('100/min', clock).allow_request(_request(), None) for _ in range(25)
+            ))
+
+        threads = [threading.Thread(target=client) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(admitted) == 100
+
+@pytest.mark.django_db
+class TestThrottledEndpoints:
+
+    def test_token_endpoint_returns_429_with_retry_after(self, monkeypatch):
+        monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, 'auth', '3/min')
+        client = APIClient()
+        for _ in range(3):
+            response = client.post(TOKEN_URL, {'username': 'nobody', 'password': 'wrong'}, format='json')
+            assert response.status_code == 401
+        response = client.post(TOKEN_URL, {'username': 'nobody', 'password': 'wrong'}, format='json')
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+
+    def test_refresh_endpoint_shares_the_auth_limit(self, monkeypatch):
+        monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, 'auth', '3/min')
+        refresh = str(RefreshToken.for_user(User.objects.create_user(username='farmer', password='testpassword')))
+        client = APIClient()
+        codes = [client.post(REFRESH_URL, {'refresh': refresh}, format='json').status_code for _ in range(4)]
+        assert codes == [200, 200, 200, 429]
+
+    def test_rotating_forwarded_for_does_not_bypass_the_auth_limit(self, monkeypatch):
+        monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, 'auth', '3/min')
+        client = APIClient()
+        codes = [
+            client.post(
+                TOKEN_URL, {'username': 'nobody', 'password': 'wrong'}, format='json',
+                HTTP_X_FORWARDED_FOR=f'198.51.100.{i}',
+            ).status_code
+            for i in range(5)
+        ]
+        assert codes == [401, 401, 401, 429, 429]
+
+    def test_product_list_is_limited_per_user(self, monkeypatch):
+        monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, 'products', '2/min')
+        first = APIClient()
+        first.force_authenticate(User.objects.create_user(username='first', password='testpassword'))
+        second = APIClient()
+        second.force_authenticate(User.objects.create_user(username='second', password='testpassword'))
+        assert [first.get(PRODUCTS_URL).status_code for _ in range(3)] == [200, 200, 429]
+        assert second.get(PRODUCTS_URL).status_code == 200
+
+    def test_async_product_list_shares_the_limit(self, monkeypatch):
+        monkeypatch.setitem(SimpleRateThrottle.THROTTLE_RATES, 'products', '2/min')
+        user = User.objects.create_user(username='buyer', password='testpassword')
+        client = APIClient()
+        client.force_authenticate(user)
+        client.get(PRODUCTS_URL)
+        client.get(PRODUCTS_URL)
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        response = async_to_sync(AsyncClient().get)('/api/v1/products/async/products/', headers=headers)
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+
+def test_deploy_check_rejects_process_local_cache(settings, tmp_path):
+    assert [error.id for error in check_shared_cache(None)] == ['farmfresh.E001']
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path)},
+    }
+    assert check_shared_cache(None) == []
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from users.models import User
+from authentication.models import RevokedToken
+from authentication.revocation import BloomFilter, RevocationStore, warm_up
+from authentication.serializers import CustomTokenObtainPairSerializer
+
+REFRESH_URL = '/api/v1/auth/token/refresh/'
+LOGOUT_URL = '/api/v1/auth/logout/'
+
+@pytest.fixture
+def store(monkeypatch):
+    cache.clear()
+    store = RevocationStore()
+    monkeypatch.setattr('authentication.revocation._store', store)
+    return store
+
+@pytest.fixture
+def refresh():
+    user = User.objects.create_user(username='farmer', password='testpassword')
+    return CustomTokenObtainPairSerializer.get_token(user)
+
+def test_bloom_filter_membership():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f'jti-{i}')
+    assert all(f'jti-{i}' in bloom for i in range(1000))
+    false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+    assert false_positives < 300
+
+@pytest.mark.django_db
+class TestTokenRevocation:
+
+    def test_logout_revokes_refresh_token(self, store, refresh):
+        client = APIClient()
+        assert client.post(REFRESH_URL, {'refresh': str(refresh)}, format='json').status_code == status.HTTP_200_OK
+        assert client.post(LOGOUT_URL, {'refresh': str(refresh)}, format='json').status_code == status.HTTP_205_RESET_CONTENT
+        response = client.post(REFRESH_URL, {'refresh': str(refresh)}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert RevokedToken.objects.filter(jti=refresh['jti']).exists()
+
+    def test_unrevoked_check_does_not_touch_table(self, store, refresh):
+        store.rebuild()
+        with CaptureQueriesContext(connection) as ctx:
+            assert store.is_token_revoked(refresh) is False
+        assert not [q for q in ctx.captured_queries if 'authentication_revokedtoken' in q['sql']]
+
+    def test_other_processes_pick_up_revocations(self, store, refresh):
+        other = RevocationStore()
+        other.rebuild()
+        store.revoke_token(refresh)
+        assert other.is_token_revoked(refresh) is True
+
+    def test_sync_picks_up_rows_committed_out_of_order(self, store, refresh):
+        other = RevocationStore()
+        other.rebuild()
+        expires_at = timezone.now() + timedelta(days=1)
+        store.revoke('first', expires_at)
+        store.revoke('second', expires_at)
+        assert other.is_revoked('second') is True
+        # A transaction that allocated a lower id commits late.
+        RevokedToken.objects.filter(jti='first').update(jti='late')
+        store.revoke('third', expires_at)
+        assert other.is_revoked('late') is True
+
+    def test_warm_up_builds_the_filter(self, store, refresh, monkeypatch):
+        monkeypatch.setattr('authentication.revocation.connections.close_all', lambda: None)
+        RevokedToken.objects.create(jti=refresh['jti'], expires_at=timezone.now() + timedelta(days=1))
+        warm_up()
+        assert refresh['jti'] in store._filter
+
+    def test_rotation_revokes_old_refresh_token(self, store, refresh, monkeypatch):
+        from rest_framework_simplejwt.serializers import api_settings
+        monkeypatch.setattr(api_settings, 'ROTATE_REFRESH_TOKENS', True)
+        client = APIClient()
+        response = client.post(REFRESH_URL, {'refresh': str(refresh)}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert client.post(REFRESH_URL, {'refresh': str(refresh)}, format='json').status_code == status.HTTP_401_UNAUTHORIZED
+        assert client.post(REFRESH_URL, {'refresh': response.data['refresh']}, format='json').status_code == status.HTTP_200_OK
@@ -0,0 +1,55 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from farmfresh_backend.ids import uuid7
+from notifications.models import Notification
+from orders.models import Order
+from users.models import User
+
+
+def test_uuid7_version_and_variant():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+def test_uuid7_embeds_current_millisecond():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+    # A counter overflow may borrow the next millisecond
+    assert before <= value.int >> 80 <= after + 1
+
+def test_uuid7_is_strictly_increasing():
+    values = [uuid7() for _ in range(10000)]
+    assert values == sorted(values)
+    assert len(set(values)) == len(values)
+    # The hex form Django stores on SQLite sorts the same way
+    assert [v.hex for v in values] == sorted(v.hex for v in values)
+
+def test_uuid7_is_unique_across_threads():
+    results = []
+
+    def generate():
+        results.append([uuid7() for _ in range(2000)])
+
+    threads = [threading.Thread(target=generate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({value for chunk in results for value in chunk}) == 8 * 2000
+    for chunk in results:
+        assert chunk == sorted(chunk)
+
+@pytest.mark.django_db
+def test_new_rows_get_time_ordered_keys():
+    user = User.objects.create_user(username='buyer', email='buyer@example.com', password='testpassword')
+    first = Order.objects.create(user=user, shipping_address='1 Farm Lane')
+    second = Order.objects.create(user=user, shipping_address='1 Farm Lane')
+    notification = Notification.objects.create(user=user, message='hello', type='order')
+    assert first.id.version == second.id.version == notification.id.version == 7
+    assert first.id < second.id < notification.id
+    assert Order.objects.get(pk=str(first.id)) == first
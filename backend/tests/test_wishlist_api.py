@@ -1,215 +1,175 @@
-import json
+import uuid
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-# Import your models here
-# from users.models import User
-# from products.models import Product
+from cart.models import CartItem
+from cart.upsert import add_to_cart
+from products.models import Product
+from users.models import SellerProfile, User
+from wishlist.models import WishlistItem
 
 @pytest.fixture
 def api_client():
     return APIClient()
 
 @pytest.fixture
-def authenticated_client(api_client):
-    # Create a test user and authenticate
-    # user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
-    # api_client.force_authenticate(user=user)
-    # For now, we'll just return the unauthenticated client
-    # This should be updated once we have access to the User model
+def user():
+    return User.objects.create_user(username='testuser', email='test@example.com', password='testpassword')
+
+@pytest.fixture
+def authenticated_client(api_client, user):
+    api_client.force_authenticate(user=user)
     return api_client
 
+@pytest.fixture
+def seller():
+    farmer = User.objects.create_user(username='farmer', password='testpassword', is_seller=True)
+    return SellerProfile.objects.create(user=farmer, farm_name='Green Acres')
+
+@pytest.fixture
+def product(seller):
+    return Product.objects.create(seller=seller, name='Test Product', description='', price='9.99', quantity=10)
+
+@pytest.fixture
+def products(seller):
+    return Product.objects.bulk_create(
+        [Product(seller=seller, name=f'p{i}', description='', price='1.00', quantity=5) for i in range(20)]
+    )
+
+def _add(client, product):
+    return client.post(reverse('wishlist-add'), {'product_id': str(product.id)}, format='json')
+
+def _ids(products):
+    return [str(p.id) for p in products]
+
 @pytest.mark.django_db
 class TestWishlistAPI:
-    
-    def test_get_wishlist_items_authenticated(self, authenticated_client):
-        # Test getting wishlist items when authenticated
-        # url = reverse('wishlist-list')
-        # response = authenticated_client.get(url)
-        # assert response.status_code == status.HTTP_200_OK
-        # assert isinstance(response.data, list)
-        pass
-    
+
+    def test_get_wishlist_items_authenticated(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = authenticated_client.get(reverse('wishlist-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert isinstance(response.data, list)
+        assert response.data[0]['product']['name'] == 'Test Product'
+
     def test_get_wishlist_items_unauthenticated(self, api_client):
-        # Test getting wishlist items when not authenticated
-        # url = reverse('wishlist-list')
-        # response = api_client.get(url)
-        # assert response.status_code == status.HTTP_401_UNAUTHORIZED
-        pass
-    
-    def test_add_to_wishlist_authenticated(self, authenticated_client):
-        # Test adding an item to the wishlist when authenticated
-        # First create a test product
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # url = reverse('wishlist-add')
-        # data = {
-        #     'product_id': product.id
-        # }
-        # response = authenticated_client.post(url, data, format='json')
-        # assert response.status_code == status.HTTP_201_CREATED
-        # assert response.data['product_id'] == str(product.id)
-        pass
-    
-    def test_add_to_wishlist_unauthenticated(self, api_client):
-        # Test adding an item to the wishlist when not authenticated
-        # url = reverse('wishlist-add')
-        # data = {
-        #     'product_id': 'some-id'
-        # }
-        # response = api_client.post(url, data, format='json')
-        # assert response.status_code == status.HTTP_401_UNAUTHORIZED
-        pass
-    
-    def test_add_duplicate_to_wishlist(self, authenticated_client):
-        # Test adding a product that's already in the wishlist
-        # First create a test product
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to wishlist first time
-        # add_url = reverse('wishlist-add')
-        # add_data = {
-        #     'product_id': product.id
-        # }
-        # authenticated_client.post(add_url, add_data, format='json')
-        # 
-        # # Try to add same product again
-        # response = authenticated_client.post(add_url, add_data, format='json')
-        # assert response.status_code == status.HTTP_400_BAD_REQUEST
-        # assert 'already in wishlist' in response.data['error'].lower()
-        pass
-    
-    def test_remove_from_wishlist(self, authenticated_client):
-        # Test removing an item from the wishlist
-        # First create a test product and add it to the wishlist
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to wishlist
-        # add_url = reverse('wishlist-add')
-        # add_data = {
-        #     'product_id': product.id
-        # }
-        # authenticated_client.post(add_url, add_data, format='json')
-        # 
-        # # Remove from wishlist
-        # remove_url = reverse('wishlist-remove', args=[product.id])
-        # response = authenticated_client.delete(remove_url)
-        # assert response.status_code == status.HTTP_204_NO_CONTENT
-        # 
-        # # Verify it's gone
-        # list_url = reverse('wishlist-list')
-        # list_response = authenticated_client.get(list_url)
-        # assert len(list_response.data) == 0
-        pass
-    
+        response = api_client.get(reverse('wishlist-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_add_to_wishlist_authenticated(self, authenticated_client, product):
+        response = _add(authenticated_client, product)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['product_id'] == str(product.id)
+
+    def test_add_to_wishlist_unauthenticated(self, api_client, product):
+        response = _add(api_client, product)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_add_duplicate_to_wishlist(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = _add(authenticated_client, product)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'already in wishlist' in response.data['error'].lower()
+
+    def test_remove_from_wishlist(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = authenticated_client.delete(reverse('wishlist-remove', args=[product.id]))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert len(authenticated_client.get(reverse('wishlist-list')).data) == 0
+
     def test_remove_nonexistent_item_from_wishlist(self, authenticated_client):
-        # Test removing an item that's not in the wishlist
-        # remove_url = reverse('wishlist-remove', args=['nonexistent-id'])
-        # response = authenticated_client.delete(remove_url)
-        # assert response.status_code == status.HTTP_404_NOT_FOUND
-        pass
-    
-    def test_clear_wishlist(self, authenticated_client):
-        # Test clearing the entire wishlist
-        # First create test products and add them to the wishlist
-        # product1 = Product.objects.create(
-        #     name='Test Product 1',
-        #     price=9.99,
-        #     description='Test description 1',
-        #     category='test',
-        #     image='test1.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # product2 = Product.objects.create(
-        #     name='Test Product 2',
-        #     price=19.99,
-        #     description='Test description 2',
-        #     category='test',
-        #     image='test2.jpg',
-        #     is_organic=True,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to wishlist
-        # add_url = reverse('wishlist-add')
-        # authenticated_client.post(add_url, {'product_id': product1.id}, format='json')
-        # authenticated_client.post(add_url, {'product_id': product2.id}, format='json')
-        # 
-        # # Clear wishlist
-        # clear_url = reverse('wishlist-clear')
-        # response = authenticated_client.delete(clear_url)
-        # assert response.status_code == status.HTTP_204_NO_CONTENT
-        # 
-        # # Verify it's empty
-        # list_url = reverse('wishlist-list')
-        # list_response = authenticated_client.get(list_url)
-        # assert len(list_response.data) == 0
-        pass
-    
-    def test_move_from_wishlist_to_cart(self, authenticated_client):
-        # Test moving an item from wishlist to cart
-        # First create a test product and add it to the wishlist
-        # product = Product.objects.create(
-        #     name='Test Product',
-        #     price=9.99,
-        #     description='Test description',
-        #     category='test',
-        #     image='test.jpg',
-        #     is_organic=False,
-        #     in_stock=True
-        # )
-        # 
-        # # Add to wishlist
-        # add_url = reverse('wishlist-add')
-        # add_data = {
-        #     'product_id': product.id
-        # }
-        # authenticated_client.post(add_url, add_data, format='json')
-        # 
-        # # Move to cart
-        # move_url = reverse('wishlist-move-to-cart', args=[product.id])
-        # move_data = {
-        #     'quantity': 1
-        # }
-        # response = authenticated_client.post(move_url, move_data, format='json')
-        # assert response.status_code == status.HTTP_201_CREATED
-        # 
-        # # Verify it's in cart
-        # cart_url = reverse('cart-list')
-        # cart_response = authenticated_client.get(cart_url)
-        # assert len(cart_response.data) == 1
-        # assert cart_response.data[0]['product_id'] == str(product.id)
-        # 
-        # # Verify it's not in wishlist
-        # wishlist_url = reverse('wishlist-list')
-        # wishlist_response = authenticated_client.get(wishlist_url)
-        # assert len(wishlist_response.data) == 0
-        pass
\ No newline at end of file
+        response = authenticated_client.delete(reverse('wishlist-remove', args=['nonexistent-id']))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = authenticated_client.delete(reverse('wishlist-remove', args=[uuid.uuid4()]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_clear_wishlist(self, authenticated_client, products):
+        authenticated_client.post(reverse('wishlist-add-many'), {'product_ids': _ids(products)}, format='json')
+        response = authenticated_client.delete(reverse('wishlist-clear'))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert len(authenticated_client.get(reverse('wishlist-list')).data) == 0
+
+    def test_move_from_wishlist_to_cart(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        response = authenticated_client.post(
+            reverse('wishlist-move-to-cart', args=[product.id]), {'quantity': 1}, format='json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        cart_response = authenticated_client.get(reverse('cart-list'))
+        assert len(cart_response.data['lines']) == 1
+        assert cart_response.data['lines'][0]['product_id'] == str(product.id)
+        assert len(authenticated_client.get(reverse('wishlist-list')).data) == 0
+
+    def test_move_quantity_is_capped(self, authenticated_client, product):
+        _add(authenticated_client, product)
+        for url in (reverse('wishlist-move-to-cart', args=[product.id]), reverse('wishlist-move-all-to-cart')):
+            response = authenticated_client.post(url, {'quantity': 10 ** 19}, format='json')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not CartItem.objects.exists()
+        assert authenticated_client.get(reverse('cart-list')).status_code == status.HTTP_200_OK
+
+    def test_move_unsaved_or_unavailable_product(self, authenticated_client, product):
+        url = reverse('wishlist-move-to-cart', args=[product.id])
+        assert authenticated_client.post(url, format='json').status_code == status.HTTP_404_NOT_FOUND
+        _add(authenticated_client, product)
+        Product.objects.filter(id=product.id).update(quantity=0)
+        response = authenticated_client.post(url, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {'detail': 'Product is not available.'}
+        assert WishlistItem.objects.filter(product=product).exists()
+        assert not CartItem.objects.exists()
+
+@pytest.mark.django_db
+class TestWishlistBulk:
+
+    def test_add_many_is_idempotent_and_reports_unknown_ids(self, authenticated_client, products):
+        url = reverse('wishlist-add-many')
+        unknown = str(uuid.uuid4())
+        authenticated_client.post(url, {'product_ids': _ids(products[:5])}, format='json')
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.post(url, {'product_ids': _ids(products) + [unknown]}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['missing'] == [uuid.UUID(unknown)]
+        assert WishlistItem.objects.count() == 20
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        assert len(inserts) == 1
+
+    def test_remove_many(self, authenticated_client, products):
+        authenticated_client.post(reverse('wishlist-add-many'), {'product_ids': _ids(products)}, format='json')
+        response = authenticated_client.post(
+            reverse('wishlist-remove-many'), {'product_ids': _ids(products[:15])}, format='json'
+        )
+        assert response.data == {'removed': 15}
+        assert WishlistItem.objects.count() == 5
+
+    def test_bulk_input_is_validated(self, authenticated_client):
+        for url in (reverse('wishlist-add-many'), reverse('wishlist-remove-many')):
+            for data in ({}, {'product_ids': []}, {'product_ids': ['nope']}):
+                assert authenticated_client.post(url, data, format='json').status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_move_all_to_cart_in_constant_queries(self, authenticated_client, user, products):
+        authenticated_client.post(reverse('wishlist-add-many'), {'product_ids': _ids(products)}, format='json')
+        add_to_cart(user.id, {products[0].id: 2})
+        Product.objects.filter(id=products[1].id).update(quantity=0)
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.post(reverse('wishlist-move-all-to-cart'), {}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data['moved']) == 19
+        assert response.data['unavailable'] == [products[1].id]
+        # Savepoint + select + upsert + delete, independent of wishlist size
+        assert len(ctx.captured_queries) <= 6
+        assert CartItem.objects.count() == 19
+        assert CartItem.objects.get(product=products[0]).quantity == 3
+        assert list(WishlistItem.objects.values_list('product_id', flat=True)) == [products[1].id]
+
+    def test_list_is_one_query(self, authenticated_client, products):
+        authenticated_client.post(reverse('wishlist-add-many'), {'product_ids': _ids(products)}, format='json')
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(reverse('wishlist-list'))
+        assert len(response.data) == 20
+        assert len(ctx.captured_queries) == 1
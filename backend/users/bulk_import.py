@@ -0,0 +1,112 @@
+"""
+Bulk onboarding of users from a CSV export of a spreadsheet.
+
+PBKDF2 hashing dominates the cost of creating a user, so passwords are hashed
+across a process pool while the parent process inserts ``User`` and
+``SellerProfile`` rows with ``bulk_create``, one transaction per batch.
+Usernames that already exist are skipped, which makes re-running an import safe.
+"""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .directory import invalidate_directory
+from .models import SellerProfile, User
+
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name', 'address', 'phone')
+PROFILE_FIELDS = ('farm_name', 'description', 'region', 'certification')
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    sellers: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self):
+        return self.created / self.elapsed if self.elapsed else float(self.created)
+
+
+def _init_worker():
+    # Spawned (non-forked) workers start without Django configured.
+    if not apps.ready:
+        django.setup()
+
+
+def hash_password(raw_password):
+    return make_password(raw_password or None)
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _build(row, password_hash):
+    user = User(
+        password=password_hash,
+        is_seller=row.get('is_seller', '').strip().lower() in TRUE_VALUES,
+        **{field: (row.get(field) or '').strip() for field in USER_FIELDS},
+    )
+    profile = None
+    if user.is_seller and (row.get('farm_name') or '').strip():
+        profile = SellerProfile(user=user, **{field: (row.get(field) or '').strip() for field in PROFILE_FIELDS})
+    return user, profile
+
+
+def import_rows(rows, batch_size=1000, workers=None, progress=None):
+    workers = os.cpu_count() if workers is None else workers
+    result = ImportResult()
+    started = time.monotonic()
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) if workers > 1 else None
+    try:
+        for batch in _batches(rows, batch_size):
+            usernames = [(row.get('username') or '').strip() for row in batch]
+            existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+            seen = set()
+            fresh = []
+            for username, row in zip(usernames, batch):
+                if not username or username in existing or username in seen:
+                    result.skipped += 1
+                    continue
+                seen.add(username)
+                fresh.append(row)
+            passwords = [row.get('password', '') for row in fresh]
+            if pool is not None:
+                hashes = list(pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+            else:
+                hashes = [hash_password(password) for password in passwords]
+            built = [_build(row, password_hash) for row, password_hash in zip(fresh, hashes)]
+            profiles = [profile for _, profile in built if profile is not None]
+            with transaction.atomic():
+                User.objects.bulk_create([user for user, _ in built])
+                SellerProfile.objects.bulk_create(profiles)
+            result.created += len(built)
+            result.sellers += len(profiles)
+            result.elapsed = time.monotonic() - started
+            if progress:
+                progress(result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if result.sellers:
+        invalidate_directory()
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def import_csv(path, **kwargs):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return import_rows(csv.DictReader(f), **kwargs)
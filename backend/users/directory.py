@@ -0,0 +1,79 @@
+"""
+Cached public seller directory.
+
+The whole directory is one annotated query over ``SellerProfile``. Results are
+cached under a version number that is bumped whenever a seller profile or a
+review changes, a seller is created, deleted, activated or deactivated, a
+user's seller flag changes, or a product is created, deleted or moved to
+another seller or category, which invalidates every cached variant (per
+region filter) at once.
+"""
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count
+
+from .models import SellerProfile
+
+VERSION_KEY = 'sellers:directory:version'
+
+
+def directory_queryset():
+    return (
+        SellerProfile.objects.filter(user__is_active=True)
+        .annotate(
+            product_count=Count('products', distinct=True),
+            rating=Avg('products__reviews__rating'),
+        )
+        .only('id', 'farm_name', 'region', 'certification')
+        .order_by('farm_name')
+    )
+
+
+def _version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_directory(*args, **kwargs):
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def _key(version, region):
+    return f'sellers:directory:{version}:{quote(region.lower())}'
+
+
+def _filtered_queryset(region):
+    queryset = directory_queryset()
+    if region:
+        queryset = queryset.filter(region__iexact=region)
+    return queryset
+
+
+def _timeout():
+    return getattr(settings, 'SELLER_DIRECTORY_CACHE_TIMEOUT', 300)
+
+
+def get_directory(region=None, build=None):
+    """Return the serialized directory, building it with ``build(queryset)`` on a miss."""
+    region = (region or '').strip()
+    key = _key(_version(), region)
+    data = cache.get(key)
+    if data is None:
+        data = build(_filtered_queryset(region))
+        cache.set(key, data, _timeout())
+    return data
+
+
+async def aget_directory(region=None, build=None):
+    """Async ``get_directory``; ``build`` is a coroutine function."""
+    region = (region or '').strip()
+    key = _key(await cache.aget_or_set(VERSION_KEY, 1, None), region)
+    data = await cache.aget(key)
+    if data is None:
+        data = await build(_filtered_queryset(region))
+        await cache.aset(key, data, _timeout())
+    return data
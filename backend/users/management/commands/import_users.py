@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from users.bulk_import import import_csv
+
+class Command(BaseCommand):
+    help = 'Bulk-create users (and seller profiles) from a CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV with username, email, password, is_seller, farm_name, region, ... columns.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Password hashing processes (default: one per CPU, 1 hashes in-process).')
+
+    def handle(self, *args, **options):
+        def progress(result):
+            self.stdout.write(f'{result.created} users created ({result.rate:.0f}/s)')
+
+        result = import_csv(
+            options['csv_path'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} users ({result.sellers} sellers), skipped {result.skipped}, '
+            f'in {result.elapsed:.2f}s ({result.rate:.0f} users/s)'
+        ))
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from farmfresh_backend.dynamic_fields import DynamicFieldsMixin
 from .models import User, SellerProfile
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
     is_seller = serializers.BooleanField(required=False)
     address = serializers.CharField(required=False, allow_blank=True)
@@ -22,8 +23,16 @@ class UserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
-class SellerProfileSerializer(serializers.ModelSerializer):
+class SellerProfileSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     class Meta:
         model = SellerProfile
         fields = ['id', 'user', 'farm_name', 'description', 'region', 'certification']
+
+class SellerCardSerializer(serializers.ModelSerializer):
+    product_count = serializers.IntegerField(read_only=True)
+    rating = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = SellerProfile
+        fields = ['id', 'farm_name', 'region', 'certification', 'product_count', 'rating']
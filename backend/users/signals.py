@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from products.models import Product
+from reviews.models import Review
+from .directory import invalidate_directory
+from .models import SellerProfile, User
+
+for model in (SellerProfile, Review):
+    post_save.connect(invalidate_directory, sender=model, dispatch_uid=f'seller_directory_save_{model.__name__}')
+for model in (SellerProfile, Product, Review):
+    post_delete.connect(invalidate_directory, sender=model, dispatch_uid=f'seller_directory_delete_{model.__name__}')
+
+# The fields a directory card depends on; stock and price updates (every order
+# touches quantity) and logins (last_login) leave the cached directory alone.
+# Farm details live on SellerProfile, whose saves always invalidate.
+DIRECTORY_FIELDS = {
+    Product: ('seller_id', 'category_id'),
+    User: ('is_seller', 'is_active'),
+}
+
+
+def _directory_state(instance):
+    # __dict__ rather than attribute access: deferred fields must not be loaded.
+    return tuple(instance.__dict__.get(field) for field in DIRECTORY_FIELDS[type(instance)])
+
+
+@receiver(post_init, sender=Product)
+@receiver(post_init, sender=User)
+def remember_directory_state(sender, instance, **kwargs):
+    instance._directory_state = _directory_state(instance)
+
+
+def _directory_state_changed(instance, created):
+    state = _directory_state(instance)
+    if created or state != instance._directory_state:
+        instance._directory_state = state
+        return True
+    return False
+
+
+@receiver(post_save, sender=Product)
+def invalidate_directory_for_product(sender, instance, created, **kwargs):
+    if _directory_state_changed(instance, created):
+        invalidate_directory()
+
+
+@receiver(post_save, sender=User)
+def invalidate_directory_for_seller(sender, instance, created, **kwargs):
+    if _directory_state_changed(instance, created and instance.is_seller):
+        invalidate_directory()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_directory_for_deleted_seller(sender, instance, **kwargs):
+    # Only sellers appear in the directory.
+    if instance.is_seller:
+        invalidate_directory()
@@ -1,6 +1,6 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path
-from .views import UserViewSet, SellerProfileViewSet, RegisterView
+from .views import UserViewSet, SellerProfileViewSet, SellerDirectoryView, RegisterView, async_seller_directory
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -8,4 +8,6 @@ router.register(r'sellers', SellerProfileViewSet)
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
+    path('directory/', SellerDirectoryView.as_view(), name='seller-directory'),
+    path('async/directory/', async_seller_directory, name='seller-directory-async'),
 ] + router.urls
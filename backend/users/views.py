@@ -1,11 +1,16 @@
 
+from django.views.decorators.http import require_safe
 from rest_framework import viewsets, status
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from farmfresh_backend import async_views
+from farmfresh_backend.dynamic_fields import DynamicFieldsViewMixin
+from .directory import aget_directory, get_directory
 from .models import User, SellerProfile
-from .serializers import UserSerializer, SellerProfileSerializer
+from .serializers import SellerCardSerializer, UserSerializer, SellerProfileSerializer
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
@@ -18,6 +23,27 @@ class RegisterView(APIView):
             return Response({'message': 'User registered successfully'}, status=status.HTTP_201_CREATED)
         return Response({'message': 'Signup failed', 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
-class SellerProfileViewSet(viewsets.ModelViewSet):
-    queryset = SellerProfile.objects.all()
+class SellerProfileViewSet(DynamicFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = SellerProfile.objects.select_related('user')
     serializer_class = SellerProfileSerializer
+
+class SellerDirectoryView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        data = get_directory(
+            region=request.query_params.get('region'),
+            build=lambda queryset: SellerCardSerializer(queryset, many=True).data,
+        )
+        return Response(data)
+
+async def _build_directory(queryset):
+    return SellerCardSerializer([seller async for seller in queryset], many=True).data
+
+@require_safe
+async def async_seller_directory(request):
+    """Async counterpart of ``SellerDirectoryView`` for ASGI deployments."""
+    if throttled := await async_views.throttle(request):
+        return throttled
+    data = await aget_directory(region=request.GET.get('region'), build=_build_directory)
+    return async_views.api_response(request, data)
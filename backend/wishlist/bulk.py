@@ -0,0 +1,65 @@
+"""
+Set-based bulk operations on a user's wishlist.
+
+Each operation runs in one transaction and costs a fixed number of statements
+however many products it touches: an ``IN (...)`` lookup, then one
+``INSERT ... ON CONFLICT DO NOTHING``, ``DELETE`` or cart upsert. Saving an
+item that is already saved is not an error here; the single-item ``add``
+endpoint is the one that reports duplicates.
+"""
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from cart.upsert import add_to_cart
+from products.models import Product
+
+from .models import WishlistItem
+
+
+@dataclass
+class MoveResult:
+    moved: list = field(default_factory=list)
+    unavailable: list = field(default_factory=list)
+    lines: dict = field(default_factory=dict)
+
+
+def save_products(user_id, product_ids):
+    """Save the existing products among ``product_ids``; return the unknown ids."""
+    product_ids = set(product_ids)
+    with transaction.atomic():
+        found = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+        WishlistItem.objects.bulk_create(
+            [WishlistItem(user_id=user_id, product_id=product_id) for product_id in found],
+            ignore_conflicts=True,
+        )
+    return sorted(product_ids - found, key=str)
+
+
+def remove_products(user_id, product_ids):
+    deleted, _ = WishlistItem.objects.filter(user_id=user_id, product_id__in=product_ids).delete()
+    return deleted
+
+
+def clear(user_id):
+    deleted, _ = WishlistItem.objects.filter(user_id=user_id).delete()
+    return deleted
+
+
+def move_to_cart(user_id, product_ids=None, quantity=1):
+    """
+    Add saved products to the cart (``quantity`` each, on top of any existing
+    line) and drop them from the wishlist. ``None`` moves the whole wishlist.
+    Products that are out of stock stay saved and come back as ``unavailable``.
+    """
+    result = MoveResult()
+    with transaction.atomic():
+        items = WishlistItem.objects.filter(user_id=user_id)
+        if product_ids is not None:
+            items = items.filter(product_id__in=product_ids)
+        for product_id, stock in items.values_list('product_id', 'product__quantity'):
+            (result.moved if stock > 0 else result.unavailable).append(product_id)
+        if result.moved:
+            result.lines = add_to_cart(user_id, dict.fromkeys(result.moved, quantity))
+            WishlistItem.objects.filter(user_id=user_id, product_id__in=result.moved).delete()
+    return result
@@ -0,0 +1,16 @@
+from django.db import models
+from users.models import User
+from products.models import Product
+from farmfresh_backend.ids import uuid7
+
+class WishlistItem(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # Lookups by user are served by the unique constraint below.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wishlist_items', db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'product'], name='unique_wishlist_item_per_user_product'),
+        ]
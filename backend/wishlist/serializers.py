@@ -0,0 +1,31 @@
+from rest_framework import serializers
+from cart.models import MAX_LINE_QUANTITY
+from cart.serializers import CartProductSerializer
+from products.models import Product
+from .models import WishlistItem
+
+# Keeps bulk IN (...) lists under SQLite's bound-parameter limit.
+MAX_BULK_PRODUCTS = 500
+
+class WishlistItemSerializer(serializers.ModelSerializer):
+    product_id = serializers.UUIDField(read_only=True)
+    product = CartProductSerializer(read_only=True)
+
+    class Meta:
+        model = WishlistItem
+        fields = ['id', 'product_id', 'product', 'added_at']
+
+class WishlistAddSerializer(serializers.Serializer):
+    product_id = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+
+class ProductIdsSerializer(serializers.Serializer):
+    product_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=MAX_BULK_PRODUCTS,
+    )
+
+class MoveToCartSerializer(serializers.Serializer):
+    # Omitted: move the whole wishlist.
+    product_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=MAX_BULK_PRODUCTS, required=False,
+    )
+    quantity = serializers.IntegerField(min_value=1, max_value=MAX_LINE_QUANTITY, default=1)
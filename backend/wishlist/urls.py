@@ -0,0 +1,8 @@
+from rest_framework.routers import SimpleRouter
+from .views import WishlistViewSet
+
+# One wishlist per user, mounted at the prefix root like the cart.
+router = SimpleRouter()
+router.register(r'', WishlistViewSet, basename='wishlist')
+
+urlpatterns = router.urls
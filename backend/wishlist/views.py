@@ -0,0 +1,97 @@
+import uuid
+from django.db import IntegrityError, transaction
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from cart.serializers import CartItemSerializer
+from products.models import Product
+from . import bulk
+from .models import WishlistItem
+from .serializers import MoveToCartSerializer, ProductIdsSerializer, WishlistAddSerializer, WishlistItemSerializer
+
+def _product_id(value):
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+def _not_found():
+    return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+class WishlistViewSet(viewsets.GenericViewSet):
+    """
+    The signed-in user's saved products, addressed by product id. Bulk actions
+    take ``product_ids`` and run as one transaction each (see ``bulk``).
+    """
+    serializer_class = WishlistItemSerializer
+
+    def get_queryset(self):
+        return WishlistItem.objects.filter(user=self.request.user).select_related('product').order_by('-added_at')
+
+    def list(self, request):
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def add(self, request):
+        serializer = WishlistAddSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product = serializer.validated_data['product_id']
+        try:
+            with transaction.atomic():
+                item = WishlistItem.objects.create(user=request.user, product=product)
+        except IntegrityError:
+            return Response({'error': 'Product is already in wishlist.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(item).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='add-many', url_name='add-many')
+    def add_many(self, request):
+        serializer = ProductIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        missing = bulk.save_products(request.user.id, serializer.validated_data['product_ids'])
+        return Response({'missing': missing}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['delete'], url_path=r'remove/(?P<product_id>[^/.]+)', url_name='remove')
+    def remove(self, request, product_id):
+        product_id = _product_id(product_id)
+        if product_id is None or not bulk.remove_products(request.user.id, [product_id]):
+            return _not_found()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], url_path='remove-many', url_name='remove-many')
+    def remove_many(self, request):
+        serializer = ProductIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        removed = bulk.remove_products(request.user.id, serializer.validated_data['product_ids'])
+        return Response({'removed': removed})
+
+    @action(detail=False, methods=['delete'])
+    def clear(self, request):
+        bulk.clear(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], url_path='move-to-cart', url_name='move-all-to-cart')
+    def move_all_to_cart(self, request):
+        serializer = MoveToCartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk.move_to_cart(request.user.id, **serializer.validated_data)
+        return Response(
+            {'moved': result.moved, 'unavailable': result.unavailable},
+            status=status.HTTP_201_CREATED if result.moved else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=['post'], url_path=r'move-to-cart/(?P<product_id>[^/.]+)', url_name='move-to-cart')
+    def move_one_to_cart(self, request, product_id):
+        product_id = _product_id(product_id)
+        if product_id is None:
+            return _not_found()
+        serializer = MoveToCartSerializer(data={'quantity': request.data.get('quantity', 1)})
+        serializer.is_valid(raise_exception=True)
+        result = bulk.move_to_cart(request.user.id, [product_id], serializer.validated_data['quantity'])
+        if result.unavailable:
+            return Response({'detail': 'Product is not available.'}, status=status.HTTP_400_BAD_REQUEST)
+        if not result.moved:
+            return _not_found()
+        item, _ = result.lines[product_id]
+        item.product = Product.objects.get(id=product_id)
+        return Response(CartItemSerializer(item).data, status=status.HTTP_201_CREATED)